@@ -19,87 +19,275 @@
 
 from tkinter import *
 from tkinter import messagebox
+from tkinter import ttk
+from tkinter import font as tkfont
 from functools import partial
+import tools
+
+#
+# ListApp class
+#
+# Editable list of a table. Rows are kept in memory (self.rows, list of dict)
+# and only the visible rows are shown : the Treeview holds at most one item
+# per visible line, filled again from self.view when the list is scrolled,
+# filtered or sorted. Opening the list costs the same for 10 or 10000 rows.
+#
+#   self.rows    all rows of the table
+#   self.view    rows matching the filter, in sort order
+#   self.offset  index in self.view of the first visible row
+#
+# A double click on a cell opens an inline editor, the row is recorded when
+# the editor is validated (Return, focus lost or list scrolled). Escape cancels.
 
 class ListApp:
 
+    # Height of a row in pixels
+    row_height = 22
+
     def __init__(self, window, className, title="List", data=[], labels=[], actions=[], default={}):
 
         self.window = window
         self.frame = Frame(self.window, bg="#0a1526")
         self.title_frame = Frame(self.frame, bg="#0a1526")
         self.table_frame = Frame(self.frame, bg="#0a1526")
-        self.data = data
+        self.rows = [dict(d) for d in data]
+        self.view = list(self.rows)
         self.labels = labels
         self.actions = actions
         self.title = title
         self.entries = []
-        self.header = []
         self.default_font = 'monospace'
         self.default_width = 7
         self.className = className
         self.default = default
+        self.tree = None
+        self.scrollbar = None
+        self.editor = None
+        self.editing = None
+        self.offset = 0
+        self.visible = 1
+        self.selected = None
+        self.filter = StringVar(self.window)
+        self.count = StringVar(self.window)
+        self.sort_var = None
+        self.sort_reverse = False
 
-    def add_row(self, data):
+    # Displayed text of a value
+    @staticmethod
+    def text(value):
+        if not value and value != 0:
+            return ''
 
-        i = len(self.entries)
-        self.entries.append([])
+        return str(value)
 
-        for j in range(len(self.labels)):
+    # Sort key of a value : numbers, then texts, then empty values
+    @staticmethod
+    def sortKey(value):
+        if isinstance(value, (int, float)):
+            return (0, value, '')
 
-            if 'width' in self.labels[j].keys():
-                width = self.labels[j]['width']
-            else:
-                width = self.default_width
+        if not value and value != 0:
+            return (2, 0, '')
 
-            if 'font' in self.labels[j].keys():
-                font = self.labels[j]['font']
-            else:
-                font = self.default_font
+        return (1, 0, str(value).lower())
 
-            value = data[self.labels[j]['var']]
+    # Rows of the view shown in the tree
+    def visibleRows(self):
+        return self.view[self.offset:self.offset+self.visible]
 
-            if not value and value != 0:
-                value = ''
+    # Fill the tree with the visible rows. Items are named by their index in self.view.
+    def refresh(self):
+        self.closeEditor()
 
-            self.entries[i].append(Entry(self.table_frame, width=width, font=(font, 10), borderwidth=1, relief='flat'))
-            self.entries[i][j].insert(0, value)
-            self.entries[i][j].grid(row=i+1, column=j, sticky="nesw")
+        self.offset = max(0, min(self.offset, len(self.view) - self.visible))
 
-        j += 1
+        self.tree.delete(*self.tree.get_children())
 
-        action = partial(self.record, i, data)
-        self.entries[i].append(Button(self.table_frame, text="Save", font=("sans-serif", 10), bg="#dfe7e8", command=action, borderwidth=1))
-        self.entries[i][j].grid(row=i+1, column=j, sticky="nesw")
+        for i, row in enumerate(self.visibleRows()):
+            iid = str(self.offset + i)
+            self.tree.insert('', END, iid=iid, values=[self.text(row.get(label['var'])) for label in self.labels])
 
-        for a in range(len(self.actions)):
+            if row is self.selected:
+                self.tree.selection_set(iid)
 
-            j += 1
+        # Scrollbar position
+        if self.view:
+            self.scrollbar.set(self.offset / len(self.view), min(1, (self.offset + self.visible) / len(self.view)))
+        else:
+            self.scrollbar.set(0, 1)
 
-            actionData = self.actions[a]
+        self.count.set(str(len(self.view))+' / '+str(len(self.rows)))
 
-            if 'params' in actionData:
-                action = partial(actionData['action'], data, actionData['params'])
-            
-            else:
-                action = partial(actionData['action'], data)
+    # Number of visible rows from the tree height
+    def resize(self, event):
+        visible = max(1, event.height // self.row_height - 1)
 
-            self.entries[i].append(Button(self.table_frame, text=actionData['label'], font=("sans-serif", 10), bg="#dfe7e8", command=action, borderwidth=1))
-            self.entries[i][j].grid(row=i+1, column=j, sticky="nesw")
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
 
-        j += 1
-        action = partial(self.delete, i, data)
-        self.entries[i].append(Button(self.table_frame, text="Delete", font=("sans-serif", 10), bg="red", fg="white", command=action, borderwidth=1))
-        self.entries[i][j].grid(row=i+1, column=j, sticky="nesw")
+    # Scrollbar command : ('moveto', fraction) or ('scroll', number, 'units' or 'pages')
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.view))
 
+        elif args[0] == 'scroll':
+            step = int(args[1])
 
-    def record(self, row, data):
+            if args[2] == 'pages':
+                step *= self.visible
 
-        for i in range(len(self.labels)):
-            data[self.labels[i]['var']] = self.entries[row][i].get()
+            self.offset += step
+
+        self.refresh()
+
+    # Mouse wheel (delta on Windows and macOS, buttons 4 and 5 on Linux)
+    def wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.yview('scroll', -3, 'units')
+
+        else:
+            self.yview('scroll', 3, 'units')
+
+        return 'break'
+
+    # Remember the selected row, kept when it is scrolled out
+    def select(self, event=None):
+        selection = self.tree.selection()
+
+        if selection:
+            self.selected = self.view[int(selection[0])]
+
+    # Move the selection with keyboard arrows, the view is scrolled at the edges
+    def moveSelection(self, step):
+        if not self.view:
+            return 'break'
+
+        # Rows are compared by identity, two rows may have the same values
+        index = next((i for i, row in enumerate(self.view) if row is self.selected), None)
+
+        if index is None:
+            index = self.offset
+        else:
+            index += step
+
+        index = max(0, min(index, len(self.view) - 1))
+        self.selected = self.view[index]
+
+        if index < self.offset:
+            self.offset = index
+
+        elif index >= self.offset + self.visible:
+            self.offset = index - self.visible + 1
+
+        self.refresh()
+
+        return 'break'
+
+    # Keep the rows matching the filter text in one of the columns
+    def applyFilter(self, *args):
+        text = self.filter.get().strip().lower()
+
+        if text:
+            self.view = [row for row in self.rows if any(text in self.text(row.get(label['var'])).lower() for label in self.labels)]
+        else:
+            self.view = list(self.rows)
+
+        if self.sort_var:
+            self.view.sort(key=lambda row: self.sortKey(row.get(self.sort_var)), reverse=self.sort_reverse)
+
+        self.offset = 0
+        self.refresh()
+
+    # Sort the rows by a column, a second click reverses the order
+    def sort(self, var):
+        if self.sort_var == var:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_var = var
+            self.sort_reverse = False
+
+        for label in self.labels:
+            text = label['label']
+
+            if label['var'] == var:
+                text += ' ▼' if self.sort_reverse else ' ▲'
+
+            self.tree.heading(label['var'], text=text)
+
+        self.applyFilter()
+
+    # Open the inline editor on the double clicked cell
+    def edit(self, event):
+        if self.tree.identify_region(event.x, event.y) != 'cell':
+            return
+
+        iid = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+
+        if not iid:
+            return
+
+        # Previous edit recorded and shown
+        self.refresh()
+
+        x, y, width, height = self.tree.bbox(iid, column)
+        label = self.labels[int(column[1:]) - 1]
+        row = self.view[int(iid)]
+
+        self.editor = Entry(self.tree, font=(label.get('font', self.default_font), 10), borderwidth=1, relief='flat')
+        self.editor.insert(0, self.text(row.get(label['var'])))
+        self.editor.select_range(0, END)
+        self.editor.place(x=x, y=y, width=width, height=height)
+        self.editor.focus_set()
+
+        self.editing = (row, label['var'])
+
+        self.editor.bind('<Return>', lambda event: self.refresh())
+        self.editor.bind('<FocusOut>', lambda event: self.refresh())
+        self.editor.bind('<Escape>', lambda event: self.closeEditor(False))
+
+    # Close the inline editor, the edited value is recorded if save is True
+    def closeEditor(self, save=True):
+        if not self.editor:
+            return
+
+        editor = self.editor
+        row, var = self.editing
+        self.editor = None
+        self.editing = None
 
-            if (row == 0):
-                self.entries[row][i].delete(0, END)
+        value = editor.get()
+        editor.destroy()
+
+        if save and self.text(row.get(var)) != value:
+            previous = row.get(var)
+
+            # The error is shown, the handler calling refresh() goes on
+            try:
+                row[var] = self.convert(var, value)
+                self.record(row)
+
+            except Exception as e:
+                row[var] = previous
+                messagebox.showerror('Error', 'Value not recorded : '+str(e), parent=self.window)
+
+    # Value of an entry in the type of its column, so edited numbers are sorted
+    # as numbers (ValueError if the text is not a number)
+    def convert(self, var, value):
+        for column in self.className.schema:
+            if column.name == var and value.strip() != '':
+                if column.type.startswith('INTEGER'):
+                    return int(value)
+
+                if column.type.startswith('REAL'):
+                    return float(value)
+
+        return value
+
+    # Record a row, the row gets the values of the record (new id, defaults)
+    @tools.unitOfWork
+    def record(self, data):
 
         for key, val in self.default.items():
             if not key in data:
@@ -108,18 +296,65 @@ class ListApp:
         ob = self.className(data)
         ob.record()
 
-        if (row == 0):
-            self.add_row(ob.getAll())
+        data.update(ob.getAll())
+
+        return data
+
+    # Record the new row form, the form is kept if the row can't be recorded
+    def add(self):
+        data = {}
+
+        try:
+            for i in range(len(self.labels)):
+                data[self.labels[i]['var']] = self.convert(self.labels[i]['var'], self.entries[i].get())
 
-    def delete(self, row, data):
+            row = self.record(data)
+
+        except Exception as e:
+            messagebox.showerror('Error', 'Row not recorded : '+str(e), parent=self.window)
+            return
+
+        for i in range(len(self.labels)):
+            self.entries[i].delete(0, END)
+
+            if 'value' in self.labels[i].keys():
+                self.entries[i].insert(END, self.labels[i]['value'])
+
+        self.rows.append(row)
+        self.view.append(row)
+        self.selected = row
+        self.offset = len(self.view) - self.visible
+        self.refresh()
+
+    # Delete the selected row
+    @tools.unitOfWork
+    def delete(self):
+
+        if self.selected is None:
+            return
 
         MsgBox = messagebox.askquestion ('Delete', 'Confirm delete row ?', icon = 'warning', parent=self.window)
         if MsgBox == 'yes':
-            ob = self.className(data)
+            ob = self.className(self.selected)
             ob.delete()
 
-            for w in self.entries[row]:
-                w.destroy()
+            self.rows = [row for row in self.rows if row is not self.selected]
+            self.view = [row for row in self.view if row is not self.selected]
+
+            self.selected = None
+            self.refresh()
+
+    # Call an action of the list on the selected row
+    def action(self, actionData):
+
+        if self.selected is None:
+            return
+
+        if 'params' in actionData:
+            actionData['action'](self.selected, actionData['params'])
+
+        else:
+            actionData['action'](self.selected)
 
     def display(self):
 
@@ -129,8 +364,20 @@ class ListApp:
         label_title = Label(self.title_frame, text=self.title, font=("sans-serif", 14), bg="#0a1526", fg="white")
         label_title.pack()
 
-        # create header and new item row
-        self.entries.append([])
+        # filter
+        frame_filter = Frame(self.frame, bg="#0a1526")
+
+        Label(frame_filter, text="Filter", font=("sans-serif", 10), bg="#0a1526", fg="white").pack(side=LEFT)
+
+        entry_filter = Entry(frame_filter, textvariable=self.filter, font=("sans-serif", 10), borderwidth=1, relief='flat')
+        entry_filter.pack(side=LEFT, fill=X, expand=True, padx=5)
+
+        Label(frame_filter, textvariable=self.count, font=("sans-serif", 10), bg="#0a1526", fg="white").pack(side=LEFT)
+
+        self.filter.trace_add('write', self.applyFilter)
+
+        # new item row
+        frame_new = Frame(self.frame, bg="#0a1526")
 
         for i in range(len(self.labels)):
 
@@ -144,30 +391,66 @@ class ListApp:
             else:
                 font = self.default_font
 
-            Grid.columnconfigure(self.table_frame, i, weight=1)
+            Grid.columnconfigure(frame_new, i, weight=width)
 
-            self.header.append(Label(self.table_frame, text=self.labels[i]['label'], font=("sans-serif", 10, "bold"), bg="#0a1526", fg="white",  borderwidth=1, relief="groove"))
-            self.header[i].grid(row=0, column=i, sticky="nesw")
-
-            self.entries[0].append(Entry(self.table_frame, width=width, font=(font, 10), borderwidth=1, relief='flat'))
+            self.entries.append(Entry(frame_new, width=width, font=(font, 10), borderwidth=1, relief='flat'))
 
             if 'value' in self.labels[i].keys():
-                self.entries[0][i].insert(END, self.labels[i]['value'])
-            
-            self.entries[0][i].grid(row=1, column=i, sticky="nesw")
+                self.entries[i].insert(END, self.labels[i]['value'])
+
+            self.entries[i].grid(row=0, column=i, sticky="nesw")
+
+        btn = Button(frame_new, text="Add", width=5, font=("sans-serif", 10), command=self.add, bg="#dfe7e8", borderwidth=1)
+        btn.grid(row=0, column=len(self.labels), sticky="nesw")
+
+        # table
+        style = ttk.Style(self.window)
+        style.configure('List.Treeview', font=("sans-serif", 10), rowheight=self.row_height)
+        style.configure('List.Treeview.Heading', font=("sans-serif", 10, "bold"))
+
+        columns = [label['var'] for label in self.labels]
+        self.tree = ttk.Treeview(self.table_frame, columns=columns, show='headings', selectmode='browse', style='List.Treeview')
+
+        char_width = tkfont.Font(font=("sans-serif", 10)).measure('0')
+
+        for label in self.labels:
+            width = label.get('width', self.default_width) * char_width + 10
+
+            self.tree.heading(label['var'], text=label['label'], command=partial(self.sort, label['var']))
+            self.tree.column(label['var'], width=width, minwidth=20, stretch=True)
+
+        self.scrollbar = Scrollbar(self.table_frame, orient=VERTICAL, command=self.yview)
+
+        self.tree.bind('<Configure>', self.resize)
+        self.tree.bind('<<TreeviewSelect>>', self.select)
+        self.tree.bind('<Double-1>', self.edit)
+        self.tree.bind('<Up>', lambda event: self.moveSelection(-1))
+        self.tree.bind('<Down>', lambda event: self.moveSelection(1))
+        self.tree.bind('<Prior>', lambda event: self.moveSelection(-self.visible))
+        self.tree.bind('<Next>', lambda event: self.moveSelection(self.visible))
+        self.tree.bind('<MouseWheel>', self.wheel)
+        self.tree.bind('<Button-4>', self.wheel)
+        self.tree.bind('<Button-5>', self.wheel)
+
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+
+        # actions on the selected row
+        frame_actions = Frame(self.frame, bg="#0a1526")
 
+        for actionData in self.actions:
+            btn = Button(frame_actions, text=actionData['label'], font=("sans-serif", 10), bg="#dfe7e8", command=partial(self.action, actionData), borderwidth=1)
+            btn.pack(side=LEFT, padx=5)
 
-        # New element form
-        self.header.append(Label(self.table_frame, text="", font=("sans-serif", 10, "bold"), bg="#0a1526", fg="white"))
-        self.header[i+1].grid(row=0, column=i+1)
-        action = partial(self.record, 0, {})
-        self.entries[0].append(Button(self.table_frame, text="Add", width=5, font=("sans-serif", 10), command=action, bg="#dfe7e8", borderwidth=1))
-        self.entries[0][i+1].grid(row=1, column=i+1, sticky="nesw")
+        btn = Button(frame_actions, text="Delete", font=("sans-serif", 10), bg="red", fg="white", command=self.delete, borderwidth=1)
+        btn.pack(side=LEFT, padx=5)
 
-        for d in self.data:
-            self.add_row(d)
+        self.refresh()
 
         # add to window
         self.title_frame.pack(pady=15)
-        self.table_frame.pack(pady=15, fill=X)
-        self.frame.pack(fill=X)
+        frame_filter.pack(fill=X, padx=15)
+        frame_new.pack(pady=15, fill=X, padx=15)
+        self.table_frame.pack(fill=BOTH, expand=True, padx=15)
+        frame_actions.pack(pady=15)
+        self.frame.pack(fill=BOTH, expand=True)
@@ -0,0 +1,118 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+from tkinter import *
+from functools import partial
+
+#
+# WindowManager class
+#
+# Every window of the application is a Toplevel of the one Tk root
+# (RollartApp.window) and runs in its event loop, no dialog starts its own Tcl
+# interpreter or mainloop. A dialog is identified by a key, opening it again
+# brings the existing window to the front.
+#
+# Reusable dialogs (component pads, penalty) are only hidden when they are
+# closed and shown again with their widgets. The other dialogs are destroyed
+# when closed and emptied when opened again, so their content is built again
+# with fresh data.
+#
+#   window, build = WindowManager.open('elements', "Elements database - RollArt BV", "1280x720", (480,360))
+#
+#   if build:
+#       ... create widgets in window ...
+
+class WindowManager:
+
+    # Tk root of the application
+    root = None
+
+    # Dialog windows by key
+    dialogs = {}
+
+    # Keys of the reusable dialogs
+    reusable = set()
+
+    # Set the Tk root of the application
+    @classmethod
+    def setRoot(cls, root):
+        cls.root = root
+
+    # Get the Tk root, a hidden one is created if a dialog is started alone
+    # (python3 ./elements_database.py)
+    @classmethod
+    def getRoot(cls):
+        if cls.root is None:
+            cls.root = Tk()
+            cls.root.withdraw()
+
+        return cls.root
+
+    # Get a dialog window and if its content has to be built : a new window or
+    # an emptied not reusable window has to be built, a reusable window is given
+    # back with its widgets
+    @classmethod
+    def open(cls, key, title, geometry, minsize, reuse=False):
+        window = cls.dialogs.get(key)
+
+        if window is not None and window.winfo_exists():
+            window.title(title)
+            window.deiconify()
+            window.lift()
+            window.focus_set()
+
+            if reuse:
+                return window, False
+
+            for widget in window.winfo_children():
+                widget.destroy()
+
+            return window, True
+
+        window = Toplevel(cls.getRoot())
+        window.title(title)
+        window.geometry(geometry)
+        window.minsize(*minsize)
+        window.config(background="#0a1526")
+        window.protocol("WM_DELETE_WINDOW", partial(cls.close, key))
+
+        cls.dialogs[key] = window
+
+        if reuse:
+            cls.reusable.add(key)
+
+        else:
+            cls.reusable.discard(key)
+
+        return window, True
+
+    # Close a dialog, a reusable dialog is only hidden
+    @classmethod
+    def close(cls, key):
+        window = cls.dialogs.get(key)
+
+        if window is None or not window.winfo_exists():
+            cls.dialogs.pop(key, None)
+
+        elif key in cls.reusable:
+            window.withdraw()
+
+        else:
+            window.destroy()
+            del cls.dialogs[key]
@@ -0,0 +1,157 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Shared helpers for the benchmarks scripts.
+# Every benchmark runs against a throw-away home folder so the real
+# ~/.rollartBV/structure.db of the data operator is never touched.
+
+import os
+import sys
+import tempfile
+
+# Benchmarks are started from the benchmarks folder or from the root folder,
+# application modules are always imported from the root folder.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# setup_home(migrate = Boolean)
+# Point HOME to an empty temporary folder and create the database structure.
+# If migrate is False, only bare tables are created (no migration applied).
+# Must be called before any application module is imported.
+def setup_home(migrate=True):
+    home = tempfile.mkdtemp(prefix='rollartBV-bench-')
+    os.environ['HOME'] = home
+    os.makedirs(home + '/.rollartBV')
+
+    from motor.migration import Migration
+    from motor.category import Category
+    from motor.element_type import ElementType
+    from motor.element import Element
+    from motor.program import Program
+    from motor.program_element import ProgramElement
+    from motor.program_box import ProgramBox
+    from motor.session import Session
+    from motor.skater import Skater
+
+    if migrate:
+        Migration.database_integrity()
+
+    else:
+        Category.database_integrity()
+        ElementType.database_integrity()
+        Element.database_integrity()
+        Program.database_integrity()
+        ProgramElement.database_integrity()
+        ProgramBox.database_integrity()
+        Session.database_integrity()
+        Skater.database_integrity()
+
+    return home
+
+# seed_elements()
+# Fill the elements table with a synthetic rulebook (jumps, spins, steps)
+def seed_elements():
+    from motor.element import Element
+
+    codes = []
+
+    for rot in range(1, 5):
+        for jump in ['W', 'T', 'S', 'F', 'Lz', 'Lo', 'Th', 'A']:
+            codes.append((str(rot) + jump, 'Jump'))
+
+    for spin in ['U', 'S', 'C', 'Br', 'H', 'In']:
+        codes.append((spin, 'Spin'))
+
+    for step in ['StB', 'St1', 'St2', 'St3', 'St4', 'ChSt']:
+        codes.append((step, 'Step'))
+
+    i = 1
+    for code, kind in codes:
+        base = round(0.5 * i, 2)
+        Element({
+            'code': code,
+            'name': code,
+            'base': base,
+            'under': round(base * 0.7, 2),
+            'half': round(base * 0.5, 2),
+            'down': round(base * 0.3, 2),
+            'base_combo': round(base * 1.1, 2),
+            'combo_under': round(base * 0.8, 2),
+            'combo_half': round(base * 0.6, 2),
+            'combo_down': round(base * 0.4, 2),
+            'qoe1': round(base * 0.1, 2),
+            'qoe2': round(base * 0.2, 2),
+            'qoe3': round(base * 0.3, 2),
+            'qoem1': round(-base * 0.1, 2),
+            'qoem2': round(-base * 0.2, 2),
+            'qoem3': round(-base * 0.3, 2),
+            'type': kind
+        }).record()
+        i += 1
+
+# seed_program()
+# Create a session, a category, a skater and a started program with
+# the given number of recorded boxes (one solo jump per box)
+def seed_program(boxes=25):
+    from motor.session import Session
+    from motor.category import Category
+    from motor.skater import Skater
+    from motor.program import Program
+    from motor.program_box import ProgramBox
+    from motor.program_element import ProgramElement
+
+    session = Session({'name': 'Benchmark'})
+    session.record()
+
+    category = Category({'name': 'Senior', 'session': session.id, 'short': 0.0, 'long': 1.0})
+    category.record()
+
+    skater = Skater({'name': 'Skater', 'session': session.id, 'category': category.id, 'team': 'A'})
+    skater.record()
+
+    program = Program({
+        'skater': skater.name,
+        'skater_id': skater.id,
+        'program_name': 'long',
+        'category': category.id,
+        'session': session.id
+    })
+    program.record()
+
+    codes = ['2T', '2S', '3T', '2Lo', '2F', '3S', '2A', '1A']
+
+    for i in range(boxes):
+        box = ProgramBox({'program': program.id, 'type': 'SoloJump', 'order': i + 1})
+        box.record()
+
+        element = ProgramElement({
+            'program': program.id,
+            'box': box.id,
+            'type': 'SoloJump',
+            'code': codes[i % len(codes)],
+            'value_label': 'base',
+            'qoe': (i % 7) - 3
+        })
+        element.calculate()
+        element.record()
+
+    return program.id
@@ -0,0 +1,99 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Count the number of sqlite connections opened by a full open_program()
+# on a long program with 25 boxes.
+#
+# The script replays the database access of RollartApp.open_program() and
+# program_score() without any Tk window so it can run on a headless machine.
+#
+# Usage : python3 benchmarks/connections.py [boxes]
+
+import sys
+import sqlite3
+import time
+
+from common import setup_home, seed_elements, seed_program
+
+opened = 0
+connect = sqlite3.connect
+
+# Count every call to sqlite3.connect()
+def counting_connect(*args, **kwargs):
+    global opened
+    opened += 1
+    return connect(*args, **kwargs)
+
+def open_program(program_id):
+    from motor.program import Program
+    from motor.skater import Skater
+
+    program = Program(program_id)
+
+    # BOX LIST
+    boxes = program.getBoxes()
+    boxes[-1].getElements()
+
+    for box in boxes:
+        # BoxElement.wrapper() and BoxElement.display()
+        box.getElements()
+        box.getElements()
+
+    # SERVER EXCHANGE
+    Skater(program.skater_id)
+
+    # program_score()
+    program.calculate()
+    program.record()
+    program.getRank()
+    skater = Skater(program.skater_id)
+    skater.getTeamScore()
+
+def main():
+    global opened
+
+    boxes = 25
+    if len(sys.argv) > 1:
+        boxes = int(sys.argv[1])
+
+    setup_home()
+    seed_elements()
+    program_id = seed_program(boxes)
+
+    # Start from a closed shared connection so the first open is counted
+    import tools
+    if hasattr(tools, 'closeDb'):
+        tools.closeDb()
+
+    sqlite3.connect = counting_connect
+    opened = 0
+
+    start = time.perf_counter()
+    open_program(program_id)
+    duration = time.perf_counter() - start
+
+    sqlite3.connect = connect
+
+    print("open_program() with %d boxes" % boxes)
+    print("  connections opened : %d" % opened)
+    print("  duration           : %.2f ms" % (duration * 1000))
+
+if __name__ == '__main__':
+    main()
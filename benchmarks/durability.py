@@ -0,0 +1,74 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Time "Next element" actions (one unit of work each) and the checkpoint done
+# between two skaters with each database durability profile.
+# Results depend on the disk : run it on the venue laptop.
+#
+# Usage : python3 benchmarks/durability.py [actions]
+
+import sys
+import time
+
+from common import setup_home, seed_elements, seed_program
+from transactions import next_element
+
+def measure(program_id, actions):
+    import tools
+    from motor.program import Program
+    from motor.program_box import ProgramBox
+
+    program = Program(program_id)
+    box = ProgramBox({'program': program.id, 'type': 'SoloJump'})
+    box.record()
+    box_id = box.id
+
+    start = time.perf_counter()
+    for i in range(actions):
+        with tools.transaction():
+            box_id = next_element(program, box_id)
+    duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tools.checkpoint()
+    checkpoint = time.perf_counter() - start
+
+    return (duration * 1000 / actions, checkpoint * 1000)
+
+def main():
+    actions = 200
+    if len(sys.argv) > 1:
+        actions = int(sys.argv[1])
+
+    setup_home()
+    seed_elements()
+    program_id = seed_program(5)
+
+    import tools
+
+    print("profile (%d actions)     action    checkpoint" % actions)
+
+    for name in ('legacy', 'paranoid', 'competition'):
+        tools.closeDb()
+        tools.getConfig().set('database', 'profile', name)
+
+        print("  %-18s %8.2f ms %8.2f ms" % ((name, ) + measure(program_id, actions)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Count the SQL statements and time of the database access of open_program()
+# on a free (long) program with 25 boxes, with the elements read box by box
+# and with the whole program read by Program.getBoxes() in one query.
+#
+# Usage : python3 benchmarks/eager_loading.py [boxes]
+
+import sys
+import time
+
+from common import setup_home, seed_elements, seed_program
+
+statements = 0
+
+def count_statement(sql):
+    global statements
+    statements += 1
+
+# Replay of open_program(), BoxElement.wrapper() and BoxElement.display()
+def open_program(program_id, per_box):
+    from motor.program import Program
+    from motor.program_element import ProgramElement
+
+    program = Program(program_id)
+
+    boxes = program.getBoxes()
+
+    if per_box:
+        ProgramElement.boxes.clear()
+
+    boxes[-1].getElements()
+
+    for box in boxes:
+        if per_box:
+            ProgramElement.boxes.clear()
+
+        box.getElements()
+
+        if per_box:
+            ProgramElement.boxes.clear()
+
+        box.getElements()
+
+def measure(program_id, per_box, loops):
+    global statements
+
+    import tools
+
+    conn = tools.getDb()
+    conn.set_trace_callback(count_statement)
+    statements = 0
+
+    start = time.perf_counter()
+    for i in range(loops):
+        open_program(program_id, per_box)
+    duration = time.perf_counter() - start
+
+    conn.set_trace_callback(None)
+
+    return (statements / loops, duration * 1000 / loops)
+
+def main():
+    boxes = 25
+    if len(sys.argv) > 1:
+        boxes = int(sys.argv[1])
+
+    loops = 50
+
+    setup_home()
+    seed_elements()
+    program_id = seed_program(boxes)
+
+    print("open_program() with %d boxes                   statements   duration" % boxes)
+    print("  elements read box by box                  %10d %8.2f ms" % measure(program_id, True, loops))
+    print("  boxes and elements in one query           %10d %8.2f ms" % measure(program_id, False, loops))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Time ProgramElement.read() and ProgramElement.calculate() on the value table
+# of the rulebook, for every element code, rotation label and QOE.
+#
+# Usage : python3 benchmarks/element_values.py [loops]
+
+import sys
+import time
+
+from common import setup_home, seed_elements
+
+def main():
+    loops = 20
+    if len(sys.argv) > 1:
+        loops = int(sys.argv[1])
+
+    setup_home()
+    seed_elements()
+
+    from motor.program_element import ProgramElement
+    from motor.rulebook import Rulebook
+
+    Rulebook.load()
+
+    elements = []
+
+    for code in Rulebook.offsets:
+        for element_type in ('SoloJump', 'ComboJump'):
+            for value_label in ('base', '<', '<<', '<<<'):
+                for qoe in range(-3, 4):
+                    elements.append(ProgramElement({'code': code, 'type': element_type, 'value_label': value_label, 'qoe': qoe}))
+
+    start = time.perf_counter()
+    for i in range(loops):
+        for element in elements:
+            element.read()
+    read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loops):
+        for element in elements:
+            element.calculate()
+    calculate = time.perf_counter() - start
+
+    count = loops * len(elements)
+
+    print("%d element values (%d element codes)" % (count, len(Rulebook.offsets)))
+    print("  ProgramElement.read()      : %.2f us" % (read * 1000000 / count))
+    print("  ProgramElement.calculate() : %.2f us" % (calculate * 1000000 / count))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Time the hot queries of a program on a database holding several seasons,
+# before and after the migration creating secondary indexes. Also time the
+# startup database check when the database is outdated and when it is current.
+#
+# Usage : python3 benchmarks/indexes.py [seasons]
+
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from common import setup_home, seed_elements
+
+SESSIONS_PER_SEASON = 6
+CATEGORIES = 8
+SKATERS = 25
+BOXES = 12
+
+# seed_seasons(seasons = Integer)
+# Insert the raw rows of several seasons of competitions
+def seed_seasons(seasons):
+    import tools
+
+    conn = tools.getDb()
+    c = conn.cursor()
+
+    codes = ['2T', '2S', '3T', '2Lo', '2F', '3S', '2A', '1A', 'U', 'C', 'St2', 'ChSt']
+
+    for s in range(seasons * SESSIONS_PER_SEASON):
+        c.execute("INSERT INTO `sessions` (`name`, `date`, `lock`) VALUES (?, ?, 0)", ('Session '+str(s), '2020-01-01'))
+        session = c.lastrowid
+
+        for k in range(CATEGORIES):
+            c.execute("INSERT INTO `categories` (`name`, `order`, `session`, `short`, `long`, `status`) VALUES (?, ?, ?, 1.0, 1.0, 'end')", ('Cat '+str(k), k, session))
+            category = c.lastrowid
+
+            for n in range(SKATERS):
+                c.execute("INSERT INTO `skaters` (`name`, `order`, `session`, `category`, `initial_score`, `short_score`, `long_score`, `total_score`, `team`, `status`) VALUES (?, ?, ?, ?, 0, 0, 0, 0, '', 'longend')", ('Skater '+str(n), n, session, category))
+                skater = c.lastrowid
+
+                for program_name in ['short', 'long']:
+                    score = (n * 7919 % 1000) / 10.0
+                    c.execute("INSERT INTO `programs` (`skater`, `skater_id`, `program_name`, `category`, `session`, `total_score`, `score`, `components_score`, `skating_skills`, `transitions`, `performance`, `choreography`, `components_coef`, `penalization`, `status`) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0, 0, 0, 1, 0, 'stop')",
+                        ('Skater '+str(n), skater, program_name, category, session, score, score, score / 2))
+                    program = c.lastrowid
+
+                    rows = []
+                    for b in range(BOXES):
+                        c.execute("INSERT INTO `program_boxes` (`program`, `type`, `order`) VALUES (?, 'SoloJump', ?)", (program, b + 1))
+                        rows.append((program, c.lastrowid, codes[b], 1.5))
+
+                    c.executemany("INSERT INTO `program_elements` (`program`, `box`, `type`, `code`, `value_label`, `stared_value`) VALUES (?, ?, 'SoloJump', ?, 'base', ?)", rows)
+
+    conn.commit()
+
+    return program, category
+
+# run_queries(program = Integer, category = Integer, loops = Integer)
+# Time the queries issued while recording a program
+def run_queries(program, category, loops):
+    from motor.program import Program
+    from motor.category import Category
+
+    p = Program(program)
+    cat = Category(category)
+    cat.status = 'long'
+
+    timings = {}
+
+    start = time.perf_counter()
+    for i in range(loops):
+        boxes = p.getBoxes()
+    timings['Program.getBoxes()'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loops):
+        boxes[0].getElements()
+    timings['ProgramBox.getElements()'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loops):
+        p.calculate()
+    timings['Program.calculate()'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loops):
+        p.getRank()
+    timings['Program.getRank()'] = time.perf_counter() - start
+
+    # getCurrentSkater() prints the category id, keep the output clean
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for i in range(loops):
+            cat.getCurrentSkater()
+    timings['Category.getCurrentSkater()'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loops):
+        cat.getResults('long')
+    timings['Category.getResults()'] = time.perf_counter() - start
+
+    return timings
+
+def main():
+    seasons = 5
+    if len(sys.argv) > 1:
+        seasons = int(sys.argv[1])
+
+    loops = 50
+
+    setup_home(migrate=False)
+    seed_elements()
+    program, category = seed_seasons(seasons)
+
+    import tools
+    from motor.migration import Migration
+
+    c = tools.getDb().cursor()
+    c.execute("SELECT COUNT(*) FROM `program_elements`")
+    print("%d seasons, %d program elements" % (seasons, c.fetchone()[0]))
+
+    before = run_queries(program, category, loops)
+
+    start = time.perf_counter()
+    Migration.database_integrity()
+    migrate = time.perf_counter() - start
+
+    after = run_queries(program, category, loops)
+
+    start = time.perf_counter()
+    Migration.database_integrity()
+    current = time.perf_counter() - start
+
+    print("%-30s %12s %12s" % ('query (x'+str(loops)+')', 'no index', 'indexed'))
+    for name in before:
+        print("%-30s %9.2f ms %9.2f ms" % (name, before[name] * 1000, after[name] * 1000))
+
+    print("startup check, outdated database : %.2f ms" % (migrate * 1000))
+    print("startup check, current database  : %.2f ms" % (current * 1000))
+
+if __name__ == '__main__':
+    main()
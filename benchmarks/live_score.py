@@ -0,0 +1,108 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Measure the time spent on the Tk thread to publish live score messages
+# to a slow server (stand-in server answering after a delay), with an inline
+# urlopen() call and with the LiveScore background publisher.
+# Then count the requests sent for a burst of fast QOE clicks (3 messages per
+# click like setQoe()/program_score()/check()) with coalescing.
+#
+# Usage : python3 benchmarks/live_score.py [messages] [delay]
+
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+from common import setup_home
+
+def main():
+    messages = 10
+    delay = 0.2
+
+    if len(sys.argv) > 1:
+        messages = int(sys.argv[1])
+
+    if len(sys.argv) > 2:
+        delay = float(sys.argv[2])
+
+    setup_home()
+
+    from motor.live_score import LiveScore, StandInServer
+
+    server = StandInServer(delay=delay)
+    server.start()
+
+    values = [{'liveScoreEl': '2T', 'liveScoreVal': 1.7, 'liveScoreSk': i} for i in range(messages)]
+
+    # Inline calls, like the previous implementation
+    start = time.perf_counter()
+    for v in values:
+        urllib.request.urlopen(server.getUrl() + '?' + urllib.parse.urlencode(v)).read()
+    inline = time.perf_counter() - start
+
+    # Background publisher
+    liveScore = LiveScore(url=server.getUrl(), timeout=5)
+
+    start = time.perf_counter()
+    for v in values:
+        liveScore.publish(v)
+    queued = time.perf_counter() - start
+
+    liveScore.stop(timeout=messages * delay + 5)
+
+    # Unreachable endpoint
+    down = LiveScore(url='http://127.0.0.1:9/', timeout=1)
+
+    start = time.perf_counter()
+    for v in values:
+        down.publish(v)
+    unreachable = time.perf_counter() - start
+
+    down.stop(timeout=0)
+
+    # Burst of clicks on the same program
+    server.delay = 0
+    server.received = []
+
+    burst = LiveScore(url=server.getUrl(), timeout=5, window=0.2)
+
+    clicks = 30
+    for i in range(clicks):
+        burst.publish({'liveScoreSk': i, 'finalScoreTechnical': i}, 1)
+        burst.publish({'liveScoreSk': i, 'rank': 1}, 1)
+        burst.publish({'liveScoreEl': '2T', 'liveScoreVal': 1.7, 'liveScoreSk': i}, 1)
+        time.sleep(0.01)
+
+    burst.stop(timeout=5)
+    server.stop()
+
+    final = server.received[-1]
+
+    print("%d messages, server answering in %d ms" % (messages, delay * 1000))
+    print("  inline urlopen      : %9.2f ms on Tk thread" % (inline * 1000))
+    print("  LiveScore.publish() : %9.2f ms on Tk thread (%d delivered)" % (queued * 1000, liveScore.sent))
+    print("  unreachable server  : %9.2f ms on Tk thread" % (unreachable * 1000))
+    print("%d clicks in %d ms, %d messages published" % (clicks, clicks * 10, clicks * 3))
+    print("  requests sent       : %d (%d merged)" % (len(server.received), burst.coalesced))
+    print("  last state sent     : liveScoreSk=%s" % final['liveScoreSk'])
+
+if __name__ == '__main__':
+    main()
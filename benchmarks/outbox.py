@@ -0,0 +1,90 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Simulate a network outage during a program : messages are published while
+# the live score server is down, then the server comes back. Show the time
+# spent on the Tk thread, the outbox backlog, the delivery order and lag.
+#
+# Usage : python3 benchmarks/outbox.py [messages] [outage]
+
+import sys
+import time
+import socket
+
+from common import setup_home
+
+def main():
+    messages = 50
+    outage = 2.0
+
+    if len(sys.argv) > 1:
+        messages = int(sys.argv[1])
+
+    if len(sys.argv) > 2:
+        outage = float(sys.argv[2])
+
+    setup_home()
+
+    from motor.live_score import LiveScore, StandInServer
+
+    # Reserve a free port, nothing listens on it during the outage
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+
+    liveScore = LiveScore(url='http://127.0.0.1:'+str(port)+'/', timeout=1, window=0)
+    liveScore.backoff = 0.1
+    liveScore.backoff_max = 0.5
+    liveScore.start()
+
+    published = 0
+    start = time.perf_counter()
+    for i in range(messages):
+        liveScore.publish({'n': i})
+    published += time.perf_counter() - start
+
+    time.sleep(outage)
+    down = liveScore.getStats()
+
+    server = StandInServer(port)
+    server.start()
+
+    start = time.perf_counter()
+    while liveScore.getStats()['backlog'] and time.perf_counter() - start < 30:
+        time.sleep(0.01)
+    drain = time.perf_counter() - start
+
+    up = liveScore.getStats()
+
+    liveScore.stop()
+    server.stop()
+
+    order = [int(r['n']) for r in server.received]
+
+    print("%d messages published during a %.1f s outage" % (messages, outage))
+    print("  time on Tk thread   : %.2f ms" % (published * 1000))
+    print("  backlog during down : %d messages, lag %.1f s" % (down['backlog'], down['lag']))
+    print("  drained in          : %.2f s after server is back" % drain)
+    print("  delivered in order  : %s (%d/%d)" % (order == list(range(messages)), len(order), messages))
+    print("  last delivery lag   : %.1f s" % up['lag'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Compare the rank of a program computed with a COUNT(*) query on the programs
+# table and with the in memory ranking, while scores of a category change.
+# Results order of the ranking is checked against the SQL ORDER BY.
+#
+# Usage : python3 benchmarks/ranking.py [programs]
+
+import sys
+import random
+import time
+
+from common import setup_home
+
+def main():
+    count = 2000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+
+    loops = 500
+
+    setup_home()
+
+    import tools
+    from motor.program import Program
+    from motor.category import Category
+    from motor.ranking import Ranking
+
+    category = Category({'name': 'Senior', 'short': 0.0, 'long': 1.0})
+    category.record()
+
+    random.seed(1)
+
+    # Scores with one decimal so there are ties on total score
+    c = tools.getDb().cursor()
+    c.executemany("INSERT INTO `programs` (`skater`, `program_name`, `category`, `total_score`, `components_score`) VALUES (?, 'long', ?, ?, ?)",
+        [('Skater %d' % i, category.id, random.randint(0, 1000) / 10, random.randint(0, 300) / 10) for i in range(count)])
+    tools.getDb().commit()
+
+    programs = category.getResults('long')
+    program = programs[len(programs) // 2]
+
+    # Previous getRank() query
+    start = time.perf_counter()
+    for i in range(loops):
+        c.execute("SELECT COUNT(*) FROM `programs` WHERE `total_score` > ? AND `category` = ? AND `program_name` = ? AND `id` != ?",
+            (program.total_score, program.category, program.program_name, program.id))
+        c.fetchone()
+    query = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loops):
+        program.getRank()
+    ranking = time.perf_counter() - start
+
+    # Score changes of recorded programs
+    start = time.perf_counter()
+    for i in range(loops):
+        p = programs[random.randrange(count)]
+        p.total_score = random.randint(0, 1000) / 10
+        Ranking.record(p.id, p.category, p.program_name, p.total_score, p.components_score)
+    update = time.perf_counter() - start
+
+    for p in programs:
+        c.execute("UPDATE `programs` SET `total_score` = ? WHERE `id` = ?", (p.total_score, p.id))
+    tools.getDb().commit()
+
+    c.execute("SELECT `total_score`, `components_score` FROM `programs` WHERE `category` = ? AND `program_name` = 'long' ORDER BY `total_score` DESC, `components_score` DESC", (category.id, ))
+    expected = c.fetchall()
+    results = [(p.total_score, p.components_score) for p in category.getResults('long')]
+
+    print("%d programs in one category, %d loops" % (count, loops))
+    print("  COUNT(*) rank query : %8.4f ms" % (query * 1000 / loops))
+    print("  Ranking.getRank()   : %8.4f ms" % (ranking * 1000 / loops))
+    print("  Ranking update      : %8.4f ms" % (update * 1000 / loops))
+    print("  results order       : %s" % ('same as ORDER BY' if results == expected else 'DIFFERENT'))
+
+if __name__ == '__main__':
+    main()
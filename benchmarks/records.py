@@ -0,0 +1,63 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Time and memory of the records built from database rows, like the results
+# and reports which load thousands of programs and program elements.
+#
+# Usage : python3 benchmarks/records.py [rows]
+
+import sys
+import time
+import tracemalloc
+
+from common import setup_home
+
+def measure(cls, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    records = [cls(row) for row in rows]
+
+    duration = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("  %-15s : %6.2f us, %4d bytes by record" % (cls.__name__, duration * 1000000 / len(records), size / len(records)))
+
+def main():
+    count = 20000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+
+    setup_home()
+
+    from motor.program import Program
+    from motor.program_element import ProgramElement
+
+    print("%d records built from database rows" % count)
+
+    for cls in (ProgramElement, Program):
+        # Rows as given by tools.dict_factory
+        row = cls({}).getAll()
+        rows = [dict(row, id=i + 1) for i in range(count)]
+
+        measure(cls, rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Rescore a session of 100 000 program elements after a change of the elements
+# table, compared to the same work done element by element with the model
+# classes (measured on a sample and extrapolated). Both results are checked to
+# be the same.
+#
+# Usage : python3 benchmarks/rescore.py [elements] [sample]
+
+import sys
+import random
+import time
+
+from common import setup_home, seed_elements
+
+# Insert programs of 25 elements with random codes, rotation labels and QOE
+def seed_session(count):
+    import tools
+    from motor.session import Session
+    from motor.category import Category
+    from motor.skater import Skater
+    from motor.rulebook import Rulebook
+    from motor.bonus import BonusRules
+
+    session = Session({'name': 'Rescore'})
+    session.record()
+
+    category = Category({'name': 'Senior', 'session': session.id, 'short': 1.0, 'long': 1.0})
+    category.record()
+
+    Rulebook.load()
+    codes = list(Rulebook.offsets)
+    spins = ['U', 'S', 'C', 'H', 'In']
+    bonus = ['Fw', 'Sw', 'Biel', 'DE', '6R', 'LO']
+
+    conn = tools.getDb()
+    c = conn.cursor()
+
+    random.seed(3)
+    programs = count // 25
+    rows = []
+
+    for i in range((programs + 1) // 2):
+        skater = Skater({'name': 'Skater %d' % i, 'session': session.id, 'category': category.id, 'team': 'A', 'status': 'longend'})
+        skater.record()
+
+        for program_name in ('short', 'long'):
+            c.execute('''INSERT INTO `programs` (`skater`, `skater_id`, `program_name`, `category`, `session`, `status`,
+                    `skating_skills`, `transitions`, `performance`, `choreography`, `components_coef`, `penalization`)
+                VALUES (?, ?, ?, ?, ?, 'stop', ?, ?, ?, ?, 1.0, 0)''',
+                (skater.name, skater.id, program_name, category.id, session.id, 5.5, 5.0, 6.0, 5.75))
+            program = c.lastrowid
+
+            for j in range(25):
+                if j % 5 == 4:
+                    element_type = 'SoloSpin'
+                    code = random.choice(spins)
+                    mask = BonusRules.toMask(random.sample(bonus, 2))
+                else:
+                    element_type = random.choice(['SoloJump', 'ComboJump'])
+                    code = random.choice(codes)
+                    mask = 0
+
+                rows.append((program, element_type, code, random.choice(['base', 'base', '<', '<<']), random.randint(-3, 3), mask,
+                    1 if random.random() < 0.02 else 0, 1 if random.random() < 0.05 else 0))
+
+    c.executemany('''INSERT INTO `program_elements` (`program`, `type`, `code`, `value_label`, `qoe`, `bonus_mask`, `star`, `time`,
+            `label`, `bonus`, `base_value`, `bonus_value`, `qoe_value`, `technical_value`, `stared_value`)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, '', '', 0, 0, 0, 0, 0)''', rows[:count])
+    conn.commit()
+
+    return session.id
+
+# Rescore element by element with the model classes
+def rescore_objects(session, sample):
+    import tools
+    from motor.program import Program
+    from motor.program_element import ProgramElement
+
+    c = tools.getDb().cursor()
+    c.row_factory = tools.dict_factory
+    c.execute('''SELECT `program_elements`.* FROM `program_elements` JOIN `programs` ON `programs`.`id` = `program_elements`.`program`
+        WHERE `programs`.`session` = ? ORDER BY `program_elements`.`id` LIMIT ?''', (session, sample))
+
+    programs = []
+
+    for d in c.fetchall():
+        element = ProgramElement(d)
+        element.calculate()
+        element.record()
+
+        if not element.program in programs:
+            programs.append(element.program)
+
+    for program_id in programs:
+        program = Program(program_id)
+        program.calculate()
+        program.record()
+
+    return len(programs)
+
+def snapshot(session):
+    import tools
+
+    c = tools.getDb().cursor()
+    c.execute('''SELECT `program_elements`.`id`, `stared_value`, `technical_value` FROM `program_elements`
+        JOIN `programs` ON `programs`.`id` = `program_elements`.`program` WHERE `programs`.`session` = ? ORDER BY `program_elements`.`id`''', (session, ))
+    elements = c.fetchall()
+
+    c.execute("SELECT `id`, `technical_score`, `total_score` FROM `programs` WHERE `session` = ? ORDER BY `id`", (session, ))
+
+    return elements, c.fetchall()
+
+def main():
+    count = 100000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+
+    sample = 2000
+    if len(sys.argv) > 2:
+        sample = int(sys.argv[2])
+
+    setup_home()
+    seed_elements()
+    session = seed_session(count)
+
+    import tools
+    from motor.rescore import Rescore
+    from motor.rulebook import Rulebook
+
+    # First scoring of the seeded rows
+    Rescore(session).run()
+
+    # Rulebook correction : +10% on every base and QOE value
+    tools.getDb().execute('''UPDATE `elements` SET `base` = `base` * 1.1, `under` = `under` * 1.1, `half` = `half` * 1.1,
+        `down` = `down` * 1.1, `base_combo` = `base_combo` * 1.1, `qoe1` = `qoe1` * 1.1, `qoe3` = `qoe3` * 1.1''')
+    tools.getDb().commit()
+    Rulebook.invalidate()
+
+    start = time.perf_counter()
+    rescore = Rescore(session)
+    rescore.run()
+    duration = time.perf_counter() - start
+
+    stats = rescore.getStats()
+    expected = snapshot(session)
+
+    start = time.perf_counter()
+    programs = rescore_objects(session, sample)
+    objects = time.perf_counter() - start
+
+    elements, results = snapshot(session)
+    same = elements == expected[0] and results[:programs] == expected[1][:programs]
+
+    print("%d program elements" % stats['elements'])
+    print("  Rescore.run()             : %8.2f s (%d elements, %d programs, %d skaters changed)" % (duration, stats['changed_elements'], stats['changed_programs'], stats['changed_skaters']))
+    print("  element by element        : %8.2f s (estimated from %d elements)" % (objects * stats['elements'] / sample, sample))
+    print("  same results              : %s" % ('yes' if same else 'NO'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Connect several displays to the local scoreboard server, publish score
+# updates and measure serializations, events received by each display and
+# the time until every display has the last update.
+#
+# Usage : python3 benchmarks/scoreboard.py [displays] [updates]
+
+import sys
+import time
+import socket
+import threading
+
+from common import setup_home
+
+# display(port = Integer, last = String, result = List)
+# Minimal SSE client reading events until the last update is received
+def display(port, last, result):
+    s = socket.create_connection(('127.0.0.1', port))
+    s.sendall(b'GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n')
+
+    buffer = b''
+
+    while not buffer.endswith(last):
+        data = s.recv(65536)
+
+        if not data:
+            break
+
+        buffer += data
+
+    # Events separated by a blank line, minus the state event sent at connection
+    result.append((buffer.count(b'\n\n') - 1, time.perf_counter()))
+    s.close()
+
+def main():
+    displays = 20
+    updates = 200
+
+    if len(sys.argv) > 1:
+        displays = int(sys.argv[1])
+
+    if len(sys.argv) > 2:
+        updates = int(sys.argv[2])
+
+    setup_home()
+
+    from motor.live_score import LiveScore
+    from motor.scoreboard import ScoreboardServer
+
+    server = ScoreboardServer(host='127.0.0.1', port=0)
+    server.start(wait=True)
+
+    liveScore = LiveScore(url='')
+    liveScore.subscribe(server.update)
+
+    results = []
+    threads = []
+
+    last = ('"liveScoreSk": %d}\n\n' % (updates - 1)).encode('utf-8')
+
+    for i in range(displays):
+        t = threading.Thread(target=display, args=(server.port, last, results))
+        t.start()
+        threads.append(t)
+
+    while len(server.clients) < displays:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    published = 0
+
+    for i in range(updates):
+        t = time.perf_counter()
+        liveScore.publish({'liveScoreEl': '2T', 'liveScoreVal': 1.7, 'liveScoreSk': i, 'rank': 1}, 1)
+        published += time.perf_counter() - t
+
+    for t in threads:
+        t.join(30)
+
+    end = max(r[1] for r in results)
+
+    server.stop()
+
+    print("%d displays, %d updates" % (displays, updates))
+    print("  time on Tk thread     : %.2f ms" % (published * 1000))
+    print("  serializations        : %d" % server.updates)
+    print("  events per display    : %d to %d (late displays get the whole state)" % (min(r[0] for r in results), max(r[0] for r in results)))
+    print("  last update on all    : %.2f ms" % ((end - start) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Score simulated programs with the scoring kernel only : no database file,
+# no model class. Each program has 25 random elements of a 40 elements rulebook.
+#
+# Usage : python3 benchmarks/scoring.py [programs]
+
+import sys
+import random
+import time
+
+import common
+from motor.scoring import *
+
+def main():
+    programs = 10000
+    if len(sys.argv) > 1:
+        programs = int(sys.argv[1])
+
+    random.seed(4)
+
+    # Rulebook : base, <, <<, <<<, combo values, then QOE -3..-1 and +1..+3
+    elements = []
+
+    for i in range(40):
+        base = round(0.5 + i * 0.2, 2)
+        elements.append((base, base * 0.7, base * 0.5, base * 0.3, base * 0.9, base * 0.6, base * 0.4, base * 0.2,
+            -base * 0.3, -base * 0.2, -base * 0.1, base * 0.1, base * 0.2, base * 0.3))
+
+    values = compileValues(elements)
+
+    labels = ['base', 'base', '<', '<<']
+    types = ['SoloJump', 'ComboJump']
+
+    start = time.perf_counter()
+
+    for p in range(programs):
+        technical_score = 0
+
+        for e in range(25):
+            base_value, qoe_value = elementValues(values, random.randrange(40) * VALUE_STRIDE, random.choice(types), random.choice(labels), random.randint(-3, 3))
+            technical_value = technicalValue(base_value, 0, qoe_value)
+            technical_score += staredValue(technical_value, base_value, 0, 0)
+
+        components_score = componentsScore(7.25, 7.0, 7.5, 7.75, 1.0)
+        program_value, score = programScore(round(technical_score, 2), components_score, 0)
+        totalScore(score, 'long', 1, 50.0)
+
+    duration = time.perf_counter() - start
+
+    print("%d programs of 25 elements scored without database" % programs)
+    print("  duration : %.2f s (%d programs per second)" % (duration, programs / duration))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+#
+# Count the commits of one "Next element" action on a solo jump box, with a
+# commit per record() and with the action in one unit of work. In the default
+# rollback journal mode, each commit writes and syncs the journal file and the
+# database file.
+#
+# The script replays the database access of JumpElement.check(),
+# BoxElement.check() and program_score() without any Tk window.
+#
+# Usage : python3 benchmarks/transactions.py [actions]
+
+import sys
+import time
+
+from common import setup_home, seed_elements, seed_program
+
+statements = []
+
+def trace(sql):
+    statements.append(sql)
+
+# One "Next element" action
+def next_element(program, box_id):
+    from motor.program_box import ProgramBox
+    from motor.program_element import ProgramElement
+
+    box = ProgramBox(box_id)
+
+    # JumpElement.check()
+    element = ProgramElement({'program': program.id, 'box': box.id, 'type': 'SoloJump', 'code': '2T', 'value_label': 'base', 'qoe': 1})
+    element.calculate()
+    element.record()
+
+    # BoxElement.check() : a solo box keeps its last element only
+    elements = box.getElements()
+
+    if len(elements) > 1:
+        last = elements[-1]
+        box.empty()
+        last.record()
+
+    # program_score()
+    program.calculate()
+    program.record()
+
+    # New empty box for the next element
+    new_box = ProgramBox({'program': program.id, 'type': None})
+    new_box.record()
+
+    return new_box.id
+
+def measure(program_id, actions, unit_of_work):
+    import tools
+    from motor.program import Program
+    from motor.program_box import ProgramBox
+
+    program = Program(program_id)
+    box = ProgramBox({'program': program.id, 'type': 'SoloJump'})
+    box.record()
+    box_id = box.id
+
+    conn = tools.getDb()
+    conn.set_trace_callback(trace)
+    del statements[:]
+    commits = tools.commits
+
+    start = time.perf_counter()
+    for i in range(actions):
+        if unit_of_work:
+            with tools.transaction():
+                box_id = next_element(program, box_id)
+        else:
+            box_id = next_element(program, box_id)
+    duration = time.perf_counter() - start
+
+    conn.set_trace_callback(None)
+
+    return ((tools.commits - commits) / actions, len(statements) / actions, duration * 1000 / actions)
+
+def main():
+    actions = 100
+    if len(sys.argv) > 1:
+        actions = int(sys.argv[1])
+
+    setup_home()
+    seed_elements()
+    program_id = seed_program(5)
+
+    print("\"Next element\" action (%d actions)      commits   statements   duration" % actions)
+    print("  commit per record()                  %7.1f %12.1f %8.2f ms" % measure(program_id, actions, False))
+    print("  one unit of work                     %7.1f %12.1f %8.2f ms" % measure(program_id, actions, True))
+
+if __name__ == '__main__':
+    main()
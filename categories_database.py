@@ -22,6 +22,7 @@ from tkinter import *
 from apps.list import *
 from motor.category import *
 import tools
+from apps.window import *
 
 class CategoryApp:
 
@@ -68,19 +69,10 @@ class CategoryApp:
             'session': self.parent.session.id
         }
 
-        # Create main window
-        self.window = Tk()
+        # Dialog of the main window
+        self.window, build = WindowManager.open('categories', "Categories database - RollArt BV", "1600x720", (1280,360))
 
-        # Customizing self.window
-        self.window.title("Categories database - RollArt BV")
-        self.window.geometry("1600x720")
-        self.window.minsize(1280,360)
-        self.window.config(background="#0a1526")
-
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
+        conn = tools.getDb()
         c = conn.cursor()
         c.row_factory = tools.dict_factory
         c.execute("SELECT * FROM `categories` WHERE `session` = ? ORDER BY `order`, `id` ASC", (self.parent.session.id,))
@@ -88,7 +80,4 @@ class CategoryApp:
         data = c.fetchall()
 
         list = ListApp(window=self.window, title="Categories database", data=data, labels=labels, className=Category, default=default)
-        list.display()
-
-        # display window
-        self.window.mainloop()
\ No newline at end of file
+        list.display()
\ No newline at end of file
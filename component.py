@@ -21,6 +21,7 @@ import sqlite3
 from tkinter import *
 from tkinter import messagebox
 import tools
+from apps.window import *
 import numpy
 from functools import partial
 
@@ -35,13 +36,10 @@ class ComponentApp:
         self.btnsDeci = []
         self.unit = 0
         self.deci_frame = None
-        self.closed = False
-
-        comData = self.parent.program.getAll()
-        part = str(comData[self.component]).split('.')
-
-        self.unit = int(part[0])
+        self.closed = True
+        self.key = 'component_'+component
 
+    @tools.unitOfWork
     def confirm(self):
         val = float(self.entry.get())
 
@@ -54,81 +52,74 @@ class ComponentApp:
         else:
             messagebox.showwarning(title="Penalty alert", message="Only <= 0 value accepted", parent=self.window)
 
+    # Hide the pad, it is shown again by the next open_window()
     def close_window(self):
         self.closed = True
-        self.window.destroy()
+        WindowManager.close(self.key)
 
+    # Show the pad with the value of the current program. Widgets are created at
+    # the first opening only.
     def open_window(self):
 
-        # Create main window
-        self.window = Tk()
-
-        self.window.protocol("WM_DELETE_WINDOW", self.close_window)
+        self.window, build = WindowManager.open(self.key, "Component "+self.component+" - RollArt BV", "800x300", (480,360), reuse=True)
+        self.closed = False
 
-        # Customizing window
-        self.window.title("Component "+self.component+" - RollArt BV")
-        self.window.geometry("800x300")
-        self.window.minsize(480,360)
-        self.window.config(background="#0a1526")
+        if build:
+            self.window.protocol("WM_DELETE_WINDOW", self.close_window)
 
-        comData = self.parent.program.getAll()
-        part = str(comData[self.component]).split('.')
+            frame = Frame(self.window, bg="")
 
-        frame = Frame(self.window, bg="")
+            label = Label(frame, text="Component "+self.component, font=("sans-serif", 14), bg="#0a1526", fg="white")
+            label.pack(fill=X, pady=10)
 
-        label = Label(frame, text="Component "+self.component, font=("sans-serif", 14), bg="#0a1526", fg="white")
-        label.pack(fill=X, pady=10)
+            row = Frame(frame, bg="")
 
-        row = Frame(frame, bg="")
+            for i in range(0,11):
 
-        for i in range(0,11):
+                action = partial(self.selectUnit, i)
 
-            action = partial(self.selectUnit, i)
+                self.btnsUnit.append(Button(row, text=i, font=('sans-serif', 14), padx=10, pady=10, command=action))
+                self.btnsUnit[i].grid(row=0, column=i, sticky="nsew", pady=10)
 
-            self.btnsUnit.append(Button(row, text=i, font=('sans-serif', 14), padx=10, pady=10, command=action))
+                Grid.columnconfigure(row, i, weight=1)
 
-            if i == int(part[0]):
-                self.btnsUnit[i].configure(bg="cyan2")
-                self.btnsUnit[i].configure(activebackground="cyan2")
+            row.pack(fill=X)
 
-            else:
-                self.btnsUnit[i].configure(bg="#dfe7e8")
-                self.btnsUnit[i].configure(activebackground="#dfe7e8")
+            self.deci_frame = Frame(frame, bg="")
+            self.deci_frame.pack(fill=X)
 
-            self.btnsUnit[i].grid(row=0, column=i, sticky="nsew", pady=10)
+            frame.pack(fill=X)
 
-            Grid.columnconfigure(row, i, weight=1)
-
-        row.pack(fill=X)
+        comData = self.parent.program.getAll()
+        part = str(comData[self.component]).split('.')
 
-        self.deci_frame = Frame(frame, bg="")
+        self.unit = int(part[0])
 
+        self.unitForm()
         self.deciForm()
 
-        self.deci_frame.pack(fill=X)
-
-        frame.pack(fill=X)
-
-        # display window
-        self.window.mainloop()
-
     def selectUnit(self, val):
 
         if val != self.unit:
 
-            for btn in self.btnsUnit:
-                if btn['text'] == val:
-                    btn.configure(bg="cyan2")
-                    btn.configure(activebackground="cyan2")
-
-                else:
-                    btn.configure(bg="#dfe7e8")
-                    btn.configure(activebackground="#dfe7e8")
-
             self.unit = val
 
+            self.unitForm()
             self.deciForm()
 
+    # Highlight the selected unit button
+    def unitForm(self):
+
+        for btn in self.btnsUnit:
+            if btn['text'] == self.unit:
+                btn.configure(bg="cyan2")
+                btn.configure(activebackground="cyan2")
+
+            else:
+                btn.configure(bg="#dfe7e8")
+                btn.configure(activebackground="#dfe7e8")
+
+    @tools.unitOfWork
     def selectVal(self, val):
 
         if val > 0 and val <= 10:
@@ -19,6 +19,8 @@
 
 import sqlite3
 from tkinter import *
+import tools
+from apps.window import *
 from apps.list import *
 from pathlib import Path
 from motor.element import *
@@ -100,19 +102,10 @@ def open_window():
         }
     ]
 
-    # Create main window
-    window = Tk()
+    # Dialog of the main window
+    window, build = WindowManager.open('elements', "Elements database - RollArt BV", "1280x720", (480,360))
 
-    # Customizing window
-    window.title("Elements database - RollArt BV")
-    window.geometry("1280x720")
-    window.minsize(480,360)
-    window.config(background="#0a1526")
-
-    home_path = str(Path.home())
-    db_path = home_path + '/.rollartBV/structure.db'
-
-    conn = sqlite3.connect(db_path)
+    conn = tools.getDb()
     c = conn.cursor()
     c.row_factory = sqlite3.Row
     c.execute("SELECT * FROM `elements` ORDER BY `code`")
@@ -122,8 +115,11 @@ def open_window():
     list = ListApp(window=window, title="Elements database", data=data, labels=labels, className=Element)
     list.display()
 
-    # display window
-    window.mainloop()
+    return window
 
 if __name__ == '__main__':
-    open_window()
+    window = open_window()
+
+    # Started alone : closing the list ends the program
+    window.protocol("WM_DELETE_WINDOW", WindowManager.getRoot().destroy)
+    WindowManager.getRoot().mainloop()
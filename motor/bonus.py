@@ -0,0 +1,182 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+import json
+import tools
+from motor.scoring import *
+
+# Default spin and step bonus rules. Each rule gives the value of one bonus code :
+# base value coefficient and points added. A rule can be limited to one element
+# code ("element") and/or one element type ("type"), None means any.
+# A JSON file with the same list can replace these rules for a new season, see
+# the bonus setting of the [rules] section of config.ini.
+BONUS_RULES = [
+    {'code': '6R', 'element': None, 'type': None, 'bv_coef': 0.2, 'points': 0},
+    {'code': '4R', 'element': None, 'type': None, 'bv_coef': 0.2, 'points': 0},
+    {'code': 'DE', 'element': None, 'type': None, 'bv_coef': 0.15, 'points': 0},
+
+    {'code': 'Fw', 'element': 'U', 'type': None, 'bv_coef': 0, 'points': 1},
+    {'code': 'Ly', 'element': 'U', 'type': None, 'bv_coef': 0, 'points': 1},
+    {'code': 'Sw', 'element': 'U', 'type': None, 'bv_coef': 0.5, 'points': 2},
+    {'code': 'H', 'element': 'U', 'type': None, 'bv_coef': 0.5, 'points': 0},
+    {'code': 'Biel', 'element': 'U', 'type': None, 'bv_coef': 0.6, 'points': 3},
+    {'code': 'HBiel', 'element': 'U', 'type': None, 'bv_coef': 0.6, 'points': 4},
+    {'code': 'T', 'element': 'U', 'type': None, 'bv_coef': 0.4, 'points': 1},
+
+    {'code': 'Sw', 'element': 'S', 'type': None, 'bv_coef': 0.6, 'points': 0},
+    {'code': 'Fw', 'element': 'S', 'type': None, 'bv_coef': 0.4, 'points': 0},
+    {'code': 'Bh', 'element': 'S', 'type': None, 'bv_coef': 0.2, 'points': 0},
+
+    {'code': 'LO', 'element': 'C', 'type': None, 'bv_coef': 0.2, 'points': 0},
+    {'code': 'Fw', 'element': 'C', 'type': None, 'bv_coef': 0.2, 'points': 0},
+    {'code': 'Sw', 'element': 'C', 'type': None, 'bv_coef': 0.2, 'points': 0},
+
+    {'code': 'LO', 'element': 'H', 'type': None, 'bv_coef': 0.3, 'points': 0},
+    {'code': 'Fw', 'element': 'H', 'type': None, 'bv_coef': 0.5, 'points': 0},
+    {'code': 'Sw', 'element': 'H', 'type': None, 'bv_coef': 0.5, 'points': 0},
+
+    {'code': 'Bry', 'element': 'In', 'type': None, 'bv_coef': 0.25, 'points': 0},
+
+    # Type kept as in previous versions, so scores are unchanged. No element has the
+    # 'CompoSpin' type (data entry uses 'ComboSpin') : these bonuses are offered by
+    # the combo spin form but not counted. Counting them changes results and is a
+    # separate scoring decision, not part of this table.
+    {'code': 'SBC', 'element': None, 'type': 'CompoSpin', 'bv_coef': 0.15, 'points': 0},
+    {'code': 'DCH', 'element': None, 'type': 'CompoSpin', 'bv_coef': 0.15, 'points': 0},
+    {'code': 'BD', 'element': None, 'type': 'CompoSpin', 'bv_coef': 0.2, 'points': 0}
+]
+
+# Bit of each bonus code in the bonus_mask column of program elements. Bits are
+# stored in the database, an existing bit must never change. A new bonus code
+# takes a new bit here, or in a rules file with a "bit" value in its rule.
+BONUS_BITS = {
+    '6R': 0,
+    '4R': 1,
+    'DE': 2,
+    'Fw': 3,
+    'Ly': 4,
+    'Sw': 5,
+    'H': 6,
+    'Biel': 7,
+    'HBiel': 8,
+    'T': 9,
+    'Bh': 10,
+    'LO': 11,
+    'Bry': 12,
+    'SBC': 13,
+    'DCH': 14,
+    'BD': 15
+}
+
+#
+# BonusRules class
+#
+# Bonus rules compiled into one list per (element type, element code) of
+# (bonus bit mask, base value coefficient, points) in rules order. Lists are
+# built once and kept. Applied bonuses of an element are an integer bit mask,
+# its bonus value is a sum of the rules whose bit is set.
+
+class BonusRules:
+
+    rules = None
+    bits = None
+    codes = None
+    compiled = {}
+
+    # Load rules from the file given in config.ini (default rules if empty)
+    @classmethod
+    def load(cls):
+        path = tools.getConfig().get('rules', 'bonus')
+        rules = BONUS_RULES
+
+        if path:
+            try:
+                with open(path) as f:
+                    rules = json.load(f)
+
+            except (OSError, ValueError) as e:
+                print("Bonus rules error, default rules are used : "+str(e))
+
+        bits = dict(BONUS_BITS)
+
+        for rule in rules:
+            if 'bit' in rule:
+                bits[rule['code']] = rule['bit']
+
+            elif not rule['code'] in bits:
+                print("Bonus rules error, no bit for "+rule['code']+", rule is ignored")
+
+        cls.rules = rules
+        cls.bits = bits
+        cls.codes = sorted(bits.items(), key=lambda item: item[1])
+        cls.compiled = {}
+
+    # Get the compiled rules of an element type and code
+    @classmethod
+    def get(cls, element_type, code):
+        key = (element_type, code)
+        compiled = cls.compiled.get(key)
+
+        if compiled is None:
+            if cls.rules is None:
+                cls.load()
+
+            compiled = compileBonus(cls.rules, cls.bits, element_type, code)
+            cls.compiled[key] = compiled
+
+        return compiled
+
+    # Bit mask of a list of bonus codes (unknown codes are ignored)
+    @classmethod
+    def toMask(cls, codes):
+        if cls.bits is None:
+            cls.load()
+
+        mask = 0
+
+        for code in codes:
+            if code in cls.bits:
+                mask |= 1 << cls.bits[code]
+
+        return mask
+
+    # Bonus codes of a bit mask, comma separated for display
+    @classmethod
+    def toString(cls, mask):
+        if not mask:
+            return ''
+
+        if cls.codes is None:
+            cls.load()
+
+        codes = []
+
+        for code, bit in cls.codes:
+            if mask & (1 << bit):
+                codes.append(code)
+
+        return ','.join(codes)
+
+    # Bonus value of an element with the given applied bonus mask
+    @classmethod
+    def value(cls, element_type, code, base_value, mask):
+        if not mask:
+            return 0
+
+        return bonusValue(cls.get(element_type, code), base_value, mask)
@@ -0,0 +1,480 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+import os
+import json
+import shutil
+import threading
+import time
+import urllib.request
+import urllib.parse
+from collections import OrderedDict, deque
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import tools
+
+#
+# Outbox class
+#
+# Append-only file keeping live score messages which could not be sent. Each line
+# is one JSON message with its creation time. Sent messages are not removed from
+# the file, the position of the first unsent line is stored in a side file
+# (<outbox>.offset). Once everything is sent, both files are emptied. Under
+# steady traffic the file never empties : when the offset passes compact_size,
+# the unsent lines are copied to a new file.
+#
+# The offset file is replaced atomically and always written before the outbox
+# file is emptied or replaced : a crash in between sends some messages again,
+# it never skips unsent ones.
+# The outbox is only used by the LiveScore worker thread.
+
+class Outbox:
+
+    # Size in bytes of sent lines kept at the start of the file before compaction
+    compact_size = 1024 * 1024
+
+    def __init__(self, path=None):
+        if path is None:
+            path = str(Path.home()) + '/.rollartBV/outbox.jsonl'
+
+        self.path = path
+        self.offset_path = path + '.offset'
+        self.offset = 0
+        self.entries = deque()
+
+        self.load()
+
+    # Load unsent messages left by a previous run
+    def load(self):
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path) as f:
+                content = f.read().strip()
+
+                if content:
+                    self.offset = int(content)
+
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            position = self.offset
+
+            for line in f:
+                position += len(line)
+
+                try:
+                    entry = json.loads(line)
+
+                except ValueError:
+                    # Line partially written before a crash
+                    continue
+
+                self.entries.append((position, entry['time'], entry['values']))
+
+    # Add a message at the end of the outbox
+    def append(self, values, created):
+        line = json.dumps({'time': created, 'values': values}) + '\n'
+
+        with open(self.path, 'ab') as f:
+            f.write(line.encode('utf-8'))
+            position = f.tell()
+
+        self.entries.append((position, created, values))
+
+    # Get the first unsent message (None if empty)
+    def first(self):
+        if self.entries:
+            return self.entries[0][2]
+
+        return None
+
+    # Mark the first message as sent
+    def pop(self):
+        position, created, values = self.entries.popleft()
+
+        if not self.entries:
+            # Everything is sent, start again with empty files
+            self.offset = 0
+            self.writeOffset()
+            open(self.path, 'w').close()
+
+        elif position >= Outbox.compact_size:
+            self.offset = position
+            self.compact()
+
+        else:
+            self.offset = position
+            self.writeOffset()
+
+    # Write the offset file (replaced, never partially written)
+    def writeOffset(self):
+        tmp_path = self.offset_path + '.tmp'
+
+        with open(tmp_path, 'w') as f:
+            f.write(str(self.offset))
+
+        os.replace(tmp_path, self.offset_path)
+
+    # Copy the unsent lines to a new outbox file, the sent lines are dropped
+    def compact(self):
+        tmp_path = self.path + '.tmp'
+
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            src.seek(self.offset)
+            shutil.copyfileobj(src, dst)
+
+        start = self.offset
+
+        self.offset = 0
+        self.writeOffset()
+        os.replace(tmp_path, self.path)
+
+        self.entries = deque((position - start, created, values) for position, created, values in self.entries)
+
+    # Number of unsent messages
+    def size(self):
+        return len(self.entries)
+
+    # Age in seconds of the oldest unsent message
+    def lag(self):
+        entries = self.entries
+
+        if entries:
+            return max(0, time.time() - entries[0][1])
+
+        return 0
+
+
+#
+# LiveScore class
+#
+# Send live score information to a HTTP server for a realtime name and results
+# display. Messages are queued by the Tk thread and sent by a background worker,
+# so data entry never waits for the network.
+#
+# Messages published with the same key (one key per skater program) within the
+# coalescing window are merged, latest values win. Only the merged state is sent
+# once the window of the first message is over, so a burst of clicks produces
+# one request and the last state is always delivered. If too many messages are
+# pending in memory, the oldest one is dropped.
+#
+# When a message can't be sent (network down), it is written to the outbox and
+# all following messages go to the outbox too, so the order is kept. The worker
+# retries the first outbox message with an increasing delay and drains the
+# outbox once the server answers again, even after a restart of the application.
+
+class LiveScore:
+
+    def __init__(self, url=None, timeout=None, queue_size=None, window=None, outbox=None):
+        config = tools.getConfig()
+
+        if url is None:
+            url = config.get('live', 'url')
+
+        if timeout is None:
+            timeout = config.getfloat('live', 'timeout')
+
+        if queue_size is None:
+            queue_size = config.getint('live', 'queue_size')
+
+        if window is None:
+            window = config.getfloat('live', 'window')
+
+        self.url = url
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.window = window
+        self.outbox_path = outbox
+        self.outbox = None
+        self.backoff = config.getfloat('live', 'backoff')
+        self.backoff_max = config.getfloat('live', 'backoff_max')
+        self.pending = OrderedDict()
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.sequence = 0
+        self.thread = None
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag = 0
+        self.listeners = []
+
+    # Start the worker thread
+    def start(self):
+        if self.thread is None and self.url:
+            self.stopping = False
+            self.thread = threading.Thread(target=self.run, name='LiveScore', daemon=True)
+            self.thread.start()
+
+    # Stop the worker thread once pending messages are sent or stored in the
+    # outbox (or timeout is reached)
+    def stop(self, timeout=None):
+        if self.thread is None:
+            return
+
+        if timeout is None:
+            timeout = self.timeout
+
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+        self.thread.join(timeout)
+        self.thread = None
+
+    # Add a function called with the values of every published message
+    # (on the publishing thread, it must not block)
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    # Queue a message (dict of values) without blocking. Messages with the
+    # same key are merged until sent, a message without key is never merged.
+    def publish(self, values, key=None):
+        for listener in self.listeners:
+            listener(values)
+
+        if not self.url:
+            return
+
+        self.start()
+
+        with self.condition:
+            if key is None:
+                self.sequence += 1
+                key = ('message', self.sequence)
+
+            if key in self.pending:
+                self.pending[key][1].update(values)
+                self.coalesced += 1
+
+            else:
+                if len(self.pending) >= self.queue_size:
+                    self.pending.popitem(last=False)
+                    self.dropped += 1
+
+                self.pending[key] = [time.monotonic() + self.window, dict(values), time.time()]
+
+            self.condition.notify()
+
+    # Get the next message ready to send as (values, creation time).
+    # If block is True, wait for it, else return None if nothing is ready.
+    # Return None when stopped and nothing is pending.
+    def take(self, block=True):
+        with self.condition:
+            while True:
+                if self.pending:
+                    # Messages are ordered by deadline (same window for all)
+                    key, (deadline, values, created) = next(iter(self.pending.items()))
+                    wait = deadline - time.monotonic()
+
+                    if wait <= 0 or self.stopping:
+                        del self.pending[key]
+                        return (values, created)
+
+                    if not block:
+                        return None
+
+                    self.condition.wait(wait)
+
+                elif self.stopping or not block:
+                    return None
+
+                else:
+                    self.condition.wait()
+
+    # Move ready messages to the outbox
+    def store(self):
+        message = self.take(False)
+
+        while message:
+            self.outbox.append(message[0], message[1])
+            message = self.take(False)
+
+    # Wait until the retry time, storing ready messages. Return False if stopped.
+    def pause(self, delay):
+        retry = time.monotonic() + delay
+
+        while True:
+            self.store()
+
+            with self.condition:
+                if self.stopping:
+                    return False
+
+                remaining = retry - time.monotonic()
+
+                if remaining <= 0:
+                    return True
+
+                self.condition.wait(min(remaining, max(self.window, 0.05)))
+
+    # Worker loop
+    def run(self):
+        if self.outbox is None:
+            self.outbox = Outbox(self.outbox_path)
+
+        delay = 0
+
+        while True:
+
+            # Outbox is not empty, new messages are stored after the older ones
+            # and the first one is retried with backoff
+            if self.outbox.size():
+                self.store()
+
+                if self.send(self.outbox.first(), self.outbox.entries[0][1]):
+                    self.outbox.pop()
+                    delay = 0
+
+                else:
+                    delay = min(max(delay * 2, self.backoff), self.backoff_max)
+
+                    if not self.pause(delay):
+                        self.store()
+                        return
+
+            else:
+                message = self.take()
+
+                if message is None:
+                    return
+
+                if not self.send(message[0], message[1]):
+                    self.outbox.append(message[0], message[1])
+                    print("Live score : server unreachable, messages are kept in outbox")
+
+    # Send one message to the server
+    def send(self, values, created):
+        url = self.url + '?' + urllib.parse.urlencode(values)
+
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                response.read()
+
+            self.sent += 1
+            self.last_lag = max(0, time.time() - created)
+            return True
+
+        except Exception as e:
+            if not self.outbox.size():
+                print("Live score error : "+str(e))
+
+            self.failed += 1
+            return False
+
+    # Get counters (sent, failed, dropped, coalesced, backlog, lag in seconds)
+    def getStats(self):
+        backlog = 0
+        lag = self.last_lag
+
+        if self.outbox:
+            backlog = self.outbox.size()
+
+            if backlog:
+                lag = self.outbox.lag()
+
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'backlog': backlog,
+            'lag': round(lag, 1)
+        }
+
+
+#
+# StandInServer class
+#
+# Local HTTP server replacing the live score endpoint for tests and rehearsals.
+# It stores the query of every received request and can answer with a delay
+# to simulate a slow venue network.
+#
+# Usage : python3 -m motor.live_score [port]
+# then set url = http://127.0.0.1:port/ in the [live] section of config.ini
+
+class StandInServer:
+
+    def __init__(self, port=0, delay=0):
+        self.received = []
+        self.delay = delay
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if server.delay:
+                    threading.Event().wait(server.delay)
+
+                query = urllib.parse.urlparse(self.path).query
+                server.received.append(dict(urllib.parse.parse_qsl(query, keep_blank_values=True)))
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'OK')
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.thread = None
+
+    # Endpoint url to give to LiveScore
+    def getUrl(self):
+        return 'http://127.0.0.1:'+str(self.httpd.server_address[1])+'/'
+
+    # Serve in a background thread
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == '__main__':
+    import sys
+
+    port = 8000
+    if len(sys.argv) > 1:
+        port = int(sys.argv[1])
+
+    server = StandInServer(port)
+    server.start()
+
+    print("Live score stand-in server on "+server.getUrl())
+
+    count = 0
+
+    try:
+        while True:
+            time.sleep(0.2)
+
+            while count < len(server.received):
+                print(server.received[count])
+                count += 1
+
+    except KeyboardInterrupt:
+        server.stop()
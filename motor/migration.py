@@ -0,0 +1,160 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+import hashlib
+import tools
+from motor.category import *
+from motor.element_type import *
+from motor.element import *
+from motor.program import *
+from motor.program_element import *
+from motor.program_box import *
+from motor.session import *
+from motor.skater import *
+
+#
+# Migration class
+#
+# Database structure is versioned with PRAGMA user_version. Each entry of
+# MIGRATIONS is one version step, its position in the list is the version
+# number reached once it is applied.
+#
+# Table structures come from the schemas of the motor classes (MODELS). A
+# fingerprint of all schemas is stored in the database_schema table : when a
+# column is added to a schema, the fingerprint changes and the tables are
+# checked again on the next start, no step is needed. Steps are only needed for
+# indexes and data migrations. A step entry is a query or a function called
+# with a cursor.
+
+# 2 : bonus bit mask of existing program elements
+def migrate_bonus_mask(c):
+    c.execute("UPDATE `program_elements` SET `bonus_mask` = 0 WHERE `bonus_mask` IS NULL AND (`bonus` IS NULL OR `bonus` = '')")
+    c.execute("SELECT `id`, `bonus` FROM `program_elements` WHERE `bonus_mask` IS NULL")
+
+    masks = []
+
+    for element_id, bonus in c.fetchall():
+        masks.append((BonusRules.toMask((bonus or '').split(',')), element_id))
+
+    c.executemany("UPDATE `program_elements` SET `bonus_mask` = ? WHERE `id` = ?", masks)
+
+MIGRATIONS = [
+    # 1 : secondary indexes for hot queries
+    [
+        "CREATE INDEX IF NOT EXISTS `program_elements_program` ON `program_elements` (`program`)",
+        "CREATE INDEX IF NOT EXISTS `program_elements_box` ON `program_elements` (`box`)",
+        "CREATE INDEX IF NOT EXISTS `program_boxes_program_order` ON `program_boxes` (`program`, `order`)",
+        "CREATE INDEX IF NOT EXISTS `programs_category_name_score` ON `programs` (`category`, `program_name`, `total_score`)",
+        "CREATE INDEX IF NOT EXISTS `skaters_category_status_order` ON `skaters` (`category`, `status`, `order`)",
+        "CREATE INDEX IF NOT EXISTS `elements_code` ON `elements` (`code`)"
+    ],
+    # 2 : bonus_mask column of program elements
+    [
+        migrate_bonus_mask
+    ]
+]
+
+# Motor classes stored in the database, their tables are created from their schema
+MODELS = [Category, ElementType, Element, Program, ProgramElement, ProgramBox, Session, Skater]
+
+class Migration:
+
+    # Fingerprint of the table structures of this code : table, column names and types
+    @staticmethod
+    def fingerprint():
+        structure = repr([(model.table, [(column.name, column.type) for column in model.schema]) for model in MODELS])
+
+        return hashlib.sha1(structure.encode('utf-8')).hexdigest()
+
+    # Fingerprint stored in the database file (None if never stored)
+    @staticmethod
+    def getFingerprint():
+        c = tools.getDb().cursor()
+        c.execute("SELECT `name` FROM `sqlite_master` WHERE `type` = 'table' AND `name` = 'database_schema'")
+
+        if not c.fetchone():
+            return None
+
+        c.execute("SELECT `fingerprint` FROM `database_schema` LIMIT 1")
+        data = c.fetchone()
+
+        return data[0] if data else None
+
+    # Store the fingerprint of the checked tables
+    @classmethod
+    def setFingerprint(cls):
+        c = tools.getDb().cursor()
+        c.execute("CREATE TABLE IF NOT EXISTS `database_schema` (`fingerprint` TEXT)")
+        c.execute("DELETE FROM `database_schema`")
+        c.execute("INSERT INTO `database_schema` (`fingerprint`) VALUES (?)", (cls.fingerprint(), ))
+
+    # Version expected by this code
+    @staticmethod
+    def version():
+        return len(MIGRATIONS)
+
+    # Version of the database file
+    @staticmethod
+    def getVersion():
+        c = tools.getDb().cursor()
+        c.execute("PRAGMA user_version")
+
+        return c.fetchone()[0]
+
+    # Check if the database file is up to date : migration steps and table structures
+    @classmethod
+    def isCurrent(cls):
+        return cls.getVersion() >= cls.version() and cls.getFingerprint() == cls.fingerprint()
+
+    # Apply all missing migration steps
+    @classmethod
+    def run(cls):
+        conn = tools.getDb()
+        c = conn.cursor()
+
+        current = cls.getVersion()
+
+        for version in range(current + 1, cls.version() + 1):
+            print ("Migrate database to version "+str(version))
+
+            for query in MIGRATIONS[version - 1]:
+                if callable(query):
+                    query(c)
+
+                else:
+                    c.execute(query)
+
+            # PRAGMA can't be bound, version is always an integer
+            c.execute("PRAGMA user_version = %d" % version)
+
+        tools.commit()
+
+    # Check tables and run migrations, nothing is done if the database is current
+    @classmethod
+    def database_integrity(cls):
+        if cls.isCurrent():
+            return
+
+        for model in MODELS:
+            model.database_integrity()
+
+        cls.run()
+
+        cls.setFingerprint()
+        tools.commit()
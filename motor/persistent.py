@@ -0,0 +1,248 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+from collections import namedtuple
+import tools
+
+# Column of a table schema :
+#   name       column name, also the attribute name of the record
+#   type       SQLite type (declaration used by CREATE TABLE and ALTER TABLE)
+#   default    value of a missing column in hydrate(), a function is called
+#   attribute  False for columns only written by queries (not loaded in records)
+Column = namedtuple('Column', ['name', 'type', 'default', 'attribute'], defaults=[None, True])
+
+# Primary key column of the tables with an integer id
+ID = Column('id', 'INTEGER PRIMARY KEY AUTOINCREMENT', 0)
+
+#
+# Record class
+#
+# Metaclass of the motor record classes. From the schema of a class it
+# generates __slots__ (the columns and the extra attributes of the class, no
+# instance __dict__) and the fields list used by the generated queries.
+
+class Record(type):
+
+    def __new__(cls, name, bases, namespace):
+        schema = namespace.get('schema')
+
+        if schema is not None:
+            columns = tuple(column for column in schema if column.attribute)
+
+            namespace['columns'] = columns
+            namespace['fields'] = tuple(column.name for column in columns if column.name != 'id')
+            namespace['__slots__'] = tuple(column.name for column in columns) + tuple(namespace.get('attributes', ()))
+
+        return super().__new__(cls, name, bases, namespace)
+
+#
+# Persistent class
+#
+# Base of the motor classes stored in one table. A subclass gives its table
+# name and its schema (list of Column), everything else is generated once from
+# the schema : attributes, hydrate(), getAll(), queries and table structure.
+#
+# Tables with an `id` primary key are written with one statement :
+#   INSERT INTO `table` (`id`, ...) VALUES (?, ...)
+#   ON CONFLICT(`id`) DO UPDATE SET ... = excluded. ...
+# A new row gets id None, its id is read from cursor.lastrowid.
+#
+# Tables keyed by a code without unique index (elements, elements types) can't
+# use ON CONFLICT : the row is updated and inserted only if no row was updated.
+
+class Persistent(metaclass=Record):
+
+    __slots__ = ()
+
+    # Table name
+    table = None
+
+    # Columns of the table, see Column
+    schema = ()
+
+    # Attributes of the records which are not columns
+    attributes = ()
+
+    # Key column, `id` for tables with an integer primary key
+    key = 'id'
+
+    # Generated queries by class
+    queries = {}
+
+    # Identity map : loaded records by id, set to {} by the classes using it
+    # (see get() and fromRow())
+    identity = None
+
+    # Load a record from a dict of values or from the database by key
+    def __init__(self, data=0):
+        if type(data) is dict:
+            self.hydrate(data)
+
+        else:
+            c = self.conn.cursor()
+            c.row_factory = tools.dict_factory
+            c.execute(self.getQueries()['select'], (data,))
+
+            values = c.fetchone()
+
+            if not values:
+                values = {}
+
+            self.hydrate(values)
+
+    # Shared database connection
+    @property
+    def conn(self):
+        return tools.getDb()
+
+    # Get the generated queries of the class
+    @classmethod
+    def getQueries(cls):
+        queries = Persistent.queries.get(cls)
+
+        if queries is None:
+            columns = ', '.join('`%s`' % field for field in cls.fields)
+            placeholders = ', '.join('?' for field in cls.fields)
+            updates = ', '.join('`%s` = excluded.`%s`' % (field, field) for field in cls.fields)
+
+            queries = {
+                'select': 'SELECT * FROM `%s` WHERE `%s` = ? LIMIT 1' % (cls.table, cls.key),
+                'upsert': 'INSERT INTO `%s` (`id`, %s) VALUES (?, %s) ON CONFLICT(`id`) DO UPDATE SET %s' % (cls.table, columns, placeholders, updates),
+                'insert': 'INSERT INTO `%s` (%s) VALUES (%s)' % (cls.table, columns, placeholders),
+                'update': 'UPDATE `%s` SET %s WHERE `%s` = ?' % (cls.table, ', '.join('`%s` = ?' % field for field in cls.fields), cls.key),
+                'delete': 'DELETE FROM `%s` WHERE `%s` = ?' % (cls.table, cls.key)
+            }
+
+            Persistent.queries[cls] = queries
+
+        return queries
+
+    # Get the record of an id, loaded from database only once and then
+    # shared by every screen until it is deleted
+    @classmethod
+    def get(cls, record_id):
+        record = cls.identity.get(record_id)
+
+        if record is None:
+            record = cls(record_id)
+
+            if record.id:
+                cls.identity[record.id] = record
+
+        return record
+
+    # Get the record of a database row : the loaded record of the same id is
+    # updated with the row values
+    @classmethod
+    def fromRow(cls, data):
+        record = cls.identity.get(data['id'])
+
+        if record is None:
+            record = cls(data)
+            cls.identity[record.id] = record
+
+        else:
+            record.hydrate(data)
+
+        return record
+
+    # Forget the loaded records of the class
+    @classmethod
+    def invalidate(cls):
+        cls.identity.clear()
+
+    # Hydrate values to class, missing values use the schema defaults
+    def hydrate(self, data):
+        for column in self.columns:
+            if column.name in data:
+                value = data[column.name]
+
+            elif callable(column.default):
+                value = column.default()
+
+            else:
+                value = column.default
+
+            setattr(self, column.name, value)
+
+    # Get all values in a dict
+    def getAll(self):
+        return {column.name: getattr(self, column.name) for column in self.columns}
+
+    # Values of the fields
+    def getValues(self):
+        return [getattr(self, field) for field in self.fields]
+
+    # record data to database
+    def record(self):
+        queries = self.getQueries()
+        c = self.conn.cursor()
+
+        if self.key == 'id':
+            c.execute(queries['upsert'], [self.id or None] + self.getValues())
+
+            if not self.id:
+                self.id = c.lastrowid
+
+        else:
+            values = self.getValues()
+            c.execute(queries['update'], values + [getattr(self, self.key)])
+
+            if c.rowcount == 0:
+                c.execute(queries['insert'], values)
+
+        tools.commit()
+
+        # Loaded record of the same id written by another instance : it gets the
+        # written values, so every screen holding it shows them
+        if self.identity is not None:
+            mapped = self.identity.get(self.id)
+
+            if mapped is not None and mapped is not self:
+                mapped.hydrate(self.getAll())
+
+    # Remove from database
+    def delete(self):
+        c = self.conn.cursor()
+        c.execute(self.getQueries()['delete'], (getattr(self, self.key),))
+        tools.commit()
+
+        if self.identity is not None:
+            self.identity.pop(self.id, None)
+
+    # Create database structure : table of the schema, missing columns are added
+    @classmethod
+    def database_integrity(cls):
+        c = tools.getDb().cursor()
+
+        print ("Check "+cls.table+" table")
+
+        c.execute('CREATE TABLE IF NOT EXISTS `%s` (%s)' % (cls.table, ', '.join('`%s` %s' % (column.name, column.type) for column in cls.schema)))
+
+        c.execute("PRAGMA table_info(`%s`)" % cls.table)
+
+        existing = []
+
+        for field in c.fetchall():
+            existing.append(field[1])
+
+        for column in cls.schema:
+            if not column.name in existing:
+                print ("Add "+column.name+" "+column.type+" to table")
+                c.execute("ALTER TABLE `%s` ADD COLUMN '%s' '%s'" % (cls.table, column.name, column.type))
@@ -22,100 +22,51 @@ import os
 from pathlib import Path
 import time
 import tools
+from motor.persistent import Persistent, Column, ID
 from motor.program_box import *
 from motor.program_element import *
-
-class Program:
-
-    def __init__(self, data):
-
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        self.conn = sqlite3.connect(db_path)
-
-        data_id = data
-
-        if type(data) is dict:
-            if 'id' in data:
-                data_id = data['id']
-            
-            else:
-                data_id  = 0
-            
-            self.hydrate(data)
-
-        else:
-            c = self.conn.cursor()
-            c.row_factory = tools.dict_factory
-            c.execute("SELECT * FROM `programs` WHERE `id` = ? LIMIT 1", (data_id,))
-
-            values = c.fetchone()
-
-            if not values:
-                values = {}
-
-            self.hydrate(values)
+from motor.ranking import *
+from motor.scoring import *
+
+class Program(Persistent):
+
+    # Table and columns, see Persistent
+    table = 'programs'
+    schema = (
+        ID,
+        Column('skater', 'TEXT', 'unamed-skater'),
+        Column('skater_id', 'INTEGER', 0),
+        Column('program_name', 'TEXT', 'long'),
+        Column('start', 'INTEGER', 0),
+        Column('end', 'INTEGER', 0),
+        Column('duration', 'INTEGER', 0),
+        Column('technical_score', 'REAL', 0.0),
+        Column('skating_skills', 'REAL', 0.0),
+        Column('transitions', 'REAL', 0.0),
+        Column('performance', 'REAL', 0.0),
+        Column('choreography', 'REAL', 0.0),
+        Column('components_coef', 'REAL', 1.0),
+        Column('components_score', 'REAL', 0.0),
+        Column('program_value', 'REAL', 0.0),
+        Column('penalization', 'REAL', 0.0),
+        Column('score', 'REAL', 0.0),
+        Column('total_score', 'REAL', 0.0),
+        Column('category', 'INTEGER', 0),
+        Column('session', 'INTEGER', 0),
+        Column('status', 'TEXT', 'start'),
+        Column('fall', 'INTEGER', 0)
+    )
+
+    # Scores added to the total of a long program (initial and short program
+    # scores), loaded by loadTotals()
+    attributes = ('carried_score',)
 
     # Hydrate values to class
     def hydrate(self, data):
+        Persistent.hydrate(self, data)
+
+        self.carried_score = None
 
-        # check data integrity
-        values = {
-            'id': 0,
-            'skater': 'unamed-skater',
-            'skater_id': 0,
-            'program_name': 'long',
-            'start': 0,
-            'end': 0,
-            'duration': 0,
-            'technical_score': 0.0,
-            'skating_skills': 0.0,
-            'transitions': 0.0,
-            'performance': 0.0,
-            'choreography': 0.0,
-            'components_coef': 1.0,
-            'components_score': 0.0,
-            'program_value': 0.0,
-            'penalization': 0.0,
-            'score': 0.0,
-            'total_score': 0.0,
-            'category': 0,
-            'session': 0,
-            'status': 'start',
-            'fall': 0
-        }
-
-        for key in values:
-            if key in data:
-                values[key] = data[key]
-
-        # hydrate data
-        self.id = values['id']
-        self.skater = values['skater']
-        self.skater_id = values['skater_id']
-        self.program_name = values['program_name']
-        self.start = values['start']
-        self.end = values['end']
-        self.duration = values['duration']
-        self.technical_score = values['technical_score']
-        self.skating_skills = values['skating_skills']
-        self.transitions = values['transitions']
-        self.performance = values['performance']
-        self.choreography = values['choreography']
-        self.components_coef = values['components_coef']
-        self.components_score = values['components_score']
-        self.program_value = values['program_value']
-        self.penalization = values['penalization']
-        self.score = values['score']
-        self.total_score = values['total_score']
-        self.category = values['category']
-        self.session = values['session']
-        self.status = values['status']
-        self.fall = values['fall']
-
-
-    
     # Get program content
     def getElements(self):
         c = self.conn.cursor()
@@ -132,24 +83,38 @@ class Program:
         
         return elements
 
-    # Get program content
+    # Get program content : boxes and their elements are read with one query,
+    # elements are then given by ProgramBox.getElements() without database access
     def getBoxes(self):
         c = self.conn.cursor()
 
-        c.row_factory = tools.dict_factory
-        c.execute("SELECT * FROM `program_boxes` WHERE `program` = ? ORDER BY `order`, `id`", (self.id, ))
+        c.execute('''SELECT `program_boxes`.*, `program_elements`.* FROM `program_boxes`
+            LEFT JOIN `program_elements` ON `program_elements`.`box` = `program_boxes`.`id`
+            WHERE `program_boxes`.`program` = ?
+            ORDER BY `program_boxes`.`order`, `program_boxes`.`id`, `program_elements`.`id`''', (self.id, ))
 
-        data = c.fetchall()
+        # Columns of program_boxes, then columns of program_elements
+        fields = [column[0] for column in c.description]
+        split = fields.index('id', 1)
 
         boxes = []
+        box = None
+
+        for row in c.fetchall():
+            if box is None or box.id != row[0]:
+                box = ProgramBox(dict(zip(fields[:split], row[:split])))
+                boxes.append(box)
+                ProgramElement.boxes[box.id] = []
+
+            # Box without element
+            if row[split] is not None:
+                ProgramElement.boxes[box.id].append(dict(zip(fields[split:], row[split:])))
 
-        for d in data:
-            boxes.append(ProgramBox(d))
-        
         return boxes
 
-    # calculate program value
-    def calculate(self):
+    # Load program totals from database : running sum of elements values and
+    # scores carried to the total of a long program
+    def loadTotals(self):
         c = self.conn.cursor()
 
         c.execute("SELECT SUM(`stared_value`) FROM `program_elements` WHERE `program` = ?", (self.id, ))
@@ -157,19 +122,11 @@ class Program:
         data = c.fetchone()
 
         if data[0]:
-            val = data[0]
+            ProgramElement.totals[self.id] = data[0]
         else:
-            val = 0
+            ProgramElement.totals[self.id] = 0
 
-        self.technical_score = round(val, 2)
-        self.components_score = round((self.skating_skills + self.transitions + self.choreography + self.performance) * self.components_coef, 2)
-        self.program_value = round(self.technical_score + self.components_score, 2)
-        self.score = round(self.program_value + self.penalization, 2)
-
-        if self.score < 0:
-            self.score = 0
-        
-        self.total_score = self.score
+        self.carried_score = 0
 
         # Add short program score to total
         if self.program_name.upper() == 'LONG' and self.skater_id:
@@ -178,8 +135,8 @@ class Program:
             c.execute("SELECT `initial_score` FROM `skaters` WHERE `id` = ?", (self.skater_id, ))
             data = c.fetchone()
 
-            if data['initial_score']:
-                self.total_score += float(data['initial_score'])
+            if data and data['initial_score']:
+                self.carried_score += float(data['initial_score'])
 
             c.execute("SELECT * FROM `programs` WHERE `program_name` = 'short' AND `skater_id` = ? AND `category` = ? AND `session` = ? LIMIT 1", 
                 (self.skater_id, self.category, self.session))
@@ -187,243 +144,51 @@ class Program:
             data = c.fetchone()
 
             if data:
-                self.total_score += data['score']
-            
-            self.total_score = round(self.total_score, 2)
+                self.carried_score += data['score']
+
+    # Consistency check : reload totals from database and return False if the
+    # running totals were different
+    def checkTotals(self):
+        technical = ProgramElement.totals.get(self.id)
+        carried = self.carried_score
+
+        self.loadTotals()
+
+        if technical is None or round(technical, 2) != round(ProgramElement.totals[self.id], 2):
+            return False
+
+        return carried is None or round(carried, 2) == round(self.carried_score, 2)
+
+    # calculate program value with the scoring kernel (database is read only if
+    # totals are not loaded)
+    def calculate(self):
+        if self.carried_score is None or not self.id in ProgramElement.totals:
+            self.loadTotals()
+
+        val = ProgramElement.totals[self.id]
+
+        self.technical_score = round(val, 2)
+        self.components_score = componentsScore(self.skating_skills, self.transitions, self.choreography, self.performance, self.components_coef)
+        self.program_value, self.score = programScore(self.technical_score, self.components_score, self.penalization)
+
+        # Add short program score to total
+        self.total_score = totalScore(self.score, self.program_name, self.skater_id, self.carried_score)
 
-    # get rank for this program
+    # get rank for this program (total score, then components score)
     def getRank(self):
-        c = self.conn.cursor()
-        c.row_factory = tools.dict_factory
-        c.execute("SELECT COUNT(*) AS `num` FROM `programs` WHERE `total_score` > ? AND `category` = ? AND `program_name` = ? AND `id` != ?", (self.total_score, self.category, self.program_name, self.id))
-        data = c.fetchone()
+        ranking = Ranking.get(self.category, self.program_name)
 
-        if data:
-            rank = data['num'] + 1
-        else:
-            rank = 1
-        
-        return rank
+        return ranking.getRank(self.id, self.total_score, self.components_score)
 
     # record data to database
     def record(self):
-        c = self.conn.cursor()
-
-        c.row_factory = sqlite3.Row
-        c.execute("SELECT * FROM `programs` WHERE `id` = ? LIMIT 1", (self.id,))
-        exists = c.fetchone()
-
-        if not exists:
-            c.execute('''INSERT INTO `programs` 
-                (   `skater`, 
-                    `skater_id`, 
-                    `program_name`,
-                    `start`,
-                    `end`,
-                    `duration`,
-                    `technical_score`,
-                    `penalization`,
-                    `skating_skills`,
-                    `transitions`,
-                    `performance`,
-                    `choreography`,
-                    `components_coef`,
-                    `components_score`,
-                    `program_value`,
-                    `score`,
-                    `total_score`,
-                    `category`,
-                    `session`,
-                    `status`,
-                    `fall`
-                ) 
-                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)''', 
-                (
-                    self.skater, 
-                    self.skater_id, 
-                    self.program_name, 
-                    self.start, 
-                    self.end, 
-                    self.duration, 
-                    self.technical_score, 
-                    self.penalization, 
-                    self.skating_skills, 
-                    self.transitions,
-                    self.performance,
-                    self.choreography,
-                    self.components_coef,
-                    self.components_score,
-                    self.program_value,
-                    self.score,
-                    self.total_score,
-                    self.category,
-                    self.session,
-                    self.status,
-                    self.fall
-                ))
-            
-            # get last id
-            c.execute('SELECT `id` FROM `programs` ORDER BY `id` DESC LIMIT 1')
-            res = c.fetchone()
-
-            self.id = res[0]
+        Persistent.record(self)
 
-        else:
-            c.execute('''UPDATE `programs` SET 
-                            `skater` = ?, 
-                            `skater_id` = ?, 
-                            `program_name` = ?,
-                            `start` = ?,
-                            `end` = ?,
-                            `duration` = ?,
-                            `technical_score` = ?,
-                            `penalization` = ?,
-                            `skating_skills` = ?,
-                            `transitions` = ?,
-                            `performance` = ?,
-                            `choreography` = ?,
-                            `components_coef` = ?,
-                            `components_score` = ?,
-                            `program_value` = ?,
-                            `score` = ?,
-                            `total_score` = ?,
-                            `category` = ?,
-                            `session` = ?,
-                            `status` = ?,
-                            `fall` = ?
-                        WHERE `id` = ?''', (
-                            self.skater, 
-                            self.skater_id, 
-                            self.program_name, 
-                            self.start, 
-                            self.end, 
-                            self.duration, 
-                            self.technical_score, 
-                            self.penalization, 
-                            self.skating_skills, 
-                            self.transitions,
-                            self.performance,
-                            self.choreography,
-                            self.components_coef,
-                            self.components_score,
-                            self.program_value,
-                            self.score,
-                            self.total_score,
-                            self.category,
-                            self.session,
-                            self.status,
-                            self.fall,
-                            self.id
-                        ))
-
-        self.conn.commit()
-
-    # Get all values in a dict
-    def getAll(self):
-        data = {
-            'id': self.id,
-            'skater': self.skater,
-            'skater_id': self.skater_id,
-            'program_name': self.program_name,
-            'start': self.start,
-            'end': self.end,
-            'duration': self.duration,
-            'technical_score': self.technical_score,
-            'skating_skills': self.skating_skills,
-            'transitions': self.transitions,
-            'performance': self.performance,
-            'choreography': self.choreography,
-            'components_coef': self.components_coef,
-            'components_score': self.components_score,
-            'program_value': self.program_value,
-            'penalization': self.penalization,
-            'score': self.score,
-            'total_score': self.total_score,
-            'category': self.category,
-            'session': self.session,
-            'status': self.status,
-            'fall': self.fall
-        }
-
-        return data
+        Ranking.record(self.id, self.category, self.program_name, self.total_score, self.components_score)
 
     # Remove element from database
     def delete(self):
-        c = self.conn.cursor()
-        c.execute('DELETE FROM `programs` WHERE `id` = ?', (self.id,))
-        self.conn.commit()
-
-    # Create database structure
-    @staticmethod
-    def database_integrity():
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
-
-        c = conn.cursor()
-
-        print ("Check programs table")
-
-        c.execute('''CREATE TABLE IF NOT EXISTS `programs`
-            (`id` INTEGER PRIMARY KEY AUTOINCREMENT,
-            `skater` TEXT, 
-            `skater_id` INTEGER, 
-            `program_name` TEXT,
-            `start` INTEGER,
-            `end` INTEGER,
-            `duration` INTEGER,
-            `technical_score` REAL,
-            `skating_skills` REAL,
-            `transitions` REAL,
-            `performance` REAL,
-            `choreography` REAL,
-            `components_coef` REAL,
-            `components_score` REAL,
-            `program_value` REAL,
-            `penalization` REAL,
-            `score` REAL,
-            `total_score` REAL,
-            `category` INTEGER,
-            `session` INTEGER,
-            `status` TEXT,
-            `fall` INTEGER)''')
-
-        c.execute("PRAGMA table_info(`programs`)")
-        fields = c.fetchall()
-
-        existing = []
-
-        for field in fields:
-            existing.append(field[1])
-
-        fields = {
-            'skater': 'TEXT', 
-            'skater_id': 'INTEGER', 
-            'program_name': 'TEXT',
-            'start': 'INTEGER',
-            'end': 'INTEGER',
-            'duration': 'INTEGER',
-            'technical_score': 'REAL',
-            'skating_skills': 'REAL',
-            'transitions': 'REAL',
-            'performance': 'REAL',
-            'choreography': 'REAL',
-            'components_coef': 'REAL',
-            'components_score': 'REAL',
-            'program_value': 'REAL',
-            'penalization': 'REAL',
-            'score': 'REAL',
-            'total_score': 'REAL',
-            'category': 'INTEGER',
-            'session': 'INTEGER',
-            'status': 'TEXT',
-            'fall': 'INTEGER'
-        }
-
-        for field, type in fields.items():
-            if not field in existing:
-                print ("Add "+field+" "+type+" to table")
-                c.execute("ALTER TABLE `programs` ADD COLUMN '%s' '%s'" % (field, type))
-
-        conn.close()
\ No newline at end of file
+        Persistent.delete(self)
+
+        ProgramElement.totals.pop(self.id, None)
+        Ranking.delete(self.id)
@@ -21,486 +21,173 @@ import sqlite3
 import os
 from pathlib import Path
 import tools
+from motor.persistent import Persistent, Column, ID
 from motor.element import *
+from motor.rulebook import *
+from motor.bonus import *
+from motor.scoring import *
+
+class ProgramElement(Persistent):
+
+    # Table and columns, see Persistent
+    table = 'program_elements'
+    schema = (
+        ID,
+        Column('program', 'INTEGER', 0),
+        Column('box', 'INTEGER', 0),
+        Column('type', 'TEXT', 'SoloJump'),
+        Column('label', 'TEXT', '2 Toeloop'),
+        Column('code', 'TEXT', '2T'),
+        Column('value_label', 'TEXT', 'base'),
+        Column('base_value', 'REAL', 1.7),
+        Column('bonus', 'TEXT', ''),
+        Column('bonus_mask', 'INTEGER', None),
+        Column('bonus_value', 'REAL', 0.0),
+        Column('qoe', 'TEXT', 0),
+        Column('qoe_value', 'REAL', 0),
+        Column('technical_value', 'REAL', 1.7),
+        Column('star', 'INTEGER', 0),
+        Column('stared_value', 'REAL', 1.7),
+        Column('time', 'INTEGER', 0)
+    )
+
+    # Program, box and stared_value of the recorded row (None for a new element),
+    # used to move the value counted in the program total without reading the row
+    attributes = ('recorded',)
+
+    # Running sum of stared_value by program id, updated by delta on each
+    # record() and delete() (see Program.calculate())
+    totals = {}
+
+    # Rows of the elements of each loaded box by box id, ordered by id and kept
+    # up to date by record() and delete() (see ProgramBox.getElements()). Only
+    # the boxes of the opened program are kept, see forgetBoxes().
+    boxes = {}
 
-class ProgramElement:
+    # Hydrate values to class
+    def hydrate(self, data):
+        Persistent.hydrate(self, data)
 
-    def __init__(self, data=0):
+        # Element recorded before the bonus_mask column
+        if self.bonus_mask is None:
+            self.bonus_mask = BonusRules.toMask((self.bonus or '').split(','))
 
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
+        self.recorded = (self.program, self.box, self.stared_value) if self.id else None
 
-        self.conn = sqlite3.connect(db_path)
+    # record data to database
+    def record(self):
+        exists = self.recorded
 
-        data_id = data
+        # Value currently counted in the program total
+        previous = 0
 
-        if type(data) is dict:
-            if 'id' in data:
-                data_id = data['id']
-            
-            else:
-                data_id  = 0
-            
-            self.hydrate(data)
+        if exists:
+            previous = exists[2] or 0
 
-        else:
-            c = self.conn.cursor()
-            c.row_factory = tools.dict_factory
-            c.execute("SELECT * FROM `program_elements` WHERE `id` = ? LIMIT 1", (data_id,))
+            # Element moved to another program
+            if exists[0] != self.program:
+                ProgramElement.addTotal(exists[0], -previous)
+                previous = 0
 
-            values = c.fetchone()
+        Persistent.record(self)
 
-            if not values:
-                values = {}
+        self.recorded = (self.program, self.box, self.stared_value)
 
-            self.hydrate(values)
+        ProgramElement.addTotal(self.program, (self.stared_value or 0) - previous)
 
-    # Hydrate values to class
-    def hydrate(self, data):
+        if exists:
+            ProgramElement.removeRow(exists[1], self.id)
 
-        # check data integrity
-        values = {
-            'id': 0,
-            'program': 0,
-            'box': 0,
-            'type': "SoloJump",
-            'label': "2 Toeloop",
-            'code': "2T",
-            'value_label': 'base',
-            'base_value': 1.7,
-            'bonus': '',
-            'bonus_value': 0.0,
-            'qoe': 0,
-            'qoe_value': 0,
-            'technical_value': 1.7,
-            'star': 0,
-            'stared_value': 1.7,
-            'time': 0
-        }
-
-        for key in values:
-            if key in data:
-                values[key] = data[key]
-
-        # hydrate data
-        self.id = values['id']
-        self.program = values['program']
-        self.box = values['box']
-        self.type = values['type']
-        self.label = values['label']
-        self.code = values['code']
-        self.value_label = values['value_label']
-        self.base_value = values['base_value']
-        self.bonus = values['bonus']
-        self.bonus_value = values['bonus_value']
-        self.qoe = values['qoe']
-        self.qoe_value = values['qoe_value']
-        self.technical_value = values['technical_value']
-        self.star = values['star']
-        self.stared_value = values['stared_value']
-        self.time = values['time']
+        ProgramElement.addRow(self.box, self.getAll())
 
+    # Remove element from database
+    def delete(self):
+        exists = self.recorded
 
-    # record data to database
-    def record(self):
         c = self.conn.cursor()
+        c.execute('DELETE FROM `program_elements` WHERE `id` = ?', (self.id,))
+        tools.commit()
+
+        self.recorded = None
+
+        if exists:
+            ProgramElement.addTotal(exists[0], -(exists[2] or 0))
+            ProgramElement.removeRow(exists[1], self.id)
+
+    # Number of recorded elements with a bonus, in a session if given
+    @staticmethod
+    def countBonus(code, session=None):
+        c = tools.getDb().cursor()
+        bit = BonusRules.toMask([code])
 
-        c.row_factory = sqlite3.Row
-        c.execute("SELECT * FROM `program_elements` WHERE `id` = ? LIMIT 1", (self.id,))
-        exists = c.fetchone()
-
-        if not exists:
-            c.execute('''INSERT INTO `program_elements` 
-                (   `program`, 
-                    `box`,
-                    `type`, 
-                    `label`,
-                    `code`,
-                    `value_label`,
-                    `base_value`,
-                    `bonus`,
-                    `bonus_value`,
-                    `qoe`,
-                    `qoe_value`,
-                    `technical_value`,
-                    `star`,
-                    `stared_value`,
-                    `time`
-                ) 
-                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)''', 
-                (
-                    self.program, 
-                    self.box,
-                    self.type, 
-                    self.label, 
-                    self.code, 
-                    self.value_label, 
-                    self.base_value, 
-                    self.bonus, 
-                    self.bonus_value, 
-                    self.qoe, 
-                    self.qoe_value, 
-                    self.technical_value,
-                    self.star,
-                    self.stared_value,
-                    self.time
-                ))
-            
-            # get last id
-            c.execute('SELECT `id` FROM `program_elements` ORDER BY `id` DESC LIMIT 1')
-            res = c.fetchone()
-
-            self.id = res[0]
+        if session is None:
+            c.execute("SELECT COUNT(*) FROM `program_elements` WHERE `bonus_mask` & ?", (bit, ))
 
         else:
-            c.execute('''UPDATE `program_elements` SET 
-                            `program` = ?, 
-                            `box` = ?,
-                            `type` = ?, 
-                            `label` = ?,
-                            `code` = ?,
-                            `value_label` = ?,
-                            `base_value` = ?,
-                            `bonus` = ?,
-                            `bonus_value` = ?,
-                            `qoe` = ?,
-                            `qoe_value` = ?,
-                            `technical_value` = ?,
-                            `star` = ?,
-                            `stared_value` = ?,
-                            `time` = ?
-                        WHERE `id` = ?''', (
-                            self.program,
-                            self.box, 
-                            self.type, 
-                            self.label, 
-                            self.code, 
-                            self.value_label, 
-                            self.base_value, 
-                            self.bonus, 
-                            self.bonus_value, 
-                            self.qoe, 
-                            self.qoe_value, 
-                            self.technical_value,
-                            self.star,
-                            self.stared_value,
-                            self.time,
-                            self.id
-                        ))
-
-        self.conn.commit()
-
-    # Get all values in a dict
-    def getAll(self):
-        data = {
-            'id': self.id,
-            'program': self.program,
-            'box': self.box,
-            'type': self.type,
-            'label': self.label,
-            'code': self.code,
-            'value_label': self.value_label,
-            'base_value': self.base_value,
-            'bonus': self.bonus,
-            'bonus_value': self.bonus_value,
-            'qoe': self.qoe,
-            'qoe_value': self.qoe_value,
-            'technical_value': self.technical_value,
-            'star': self.star,
-            'stared_value': self.stared_value,
-            'time': self.time
-        }
-
-        return data
+            c.execute('''SELECT COUNT(*) FROM `program_elements`
+                JOIN `programs` ON `programs`.`id` = `program_elements`.`program`
+                WHERE `program_elements`.`bonus_mask` & ? AND `programs`.`session` = ?''', (bit, session))
 
-    # Remove element from database
-    def delete(self):
-        c = self.conn.cursor()
-        c.execute('DELETE FROM `program_elements` WHERE `id` = ?', (self.id,))
-        self.conn.commit()
+        return c.fetchone()[0]
+
+    # Update the running total of a program if it is loaded
+    @staticmethod
+    def addTotal(program, delta):
+        if program in ProgramElement.totals and delta:
+            ProgramElement.totals[program] += delta
+
+    # Add an element row (values just written) to its box if the box is loaded
+    @staticmethod
+    def addRow(box, data):
+        rows = ProgramElement.boxes.get(box)
+
+        if rows is None:
+            return
+
+        rows.append(data)
+
+        if len(rows) > 1 and rows[-2]['id'] > data['id']:
+            rows.sort(key=lambda row: row['id'])
+
+    # Forget the loaded boxes (another program is opened)
+    @staticmethod
+    def forgetBoxes():
+        ProgramElement.boxes.clear()
+
+    # Remove an element row from its box if the box is loaded
+    @staticmethod
+    def removeRow(box, element_id):
+        rows = ProgramElement.boxes.get(box)
+
+        if rows is not None:
+            rows[:] = [row for row in rows if row['id'] != element_id]
 
     
-    # Calculate sum values
+    # Calculate sum values (scoring kernel)
     def calculate(self):
 
         self.read()
 
-        # Spin bonus
-        bonus = [
-            {
-                'code': '6R',
-                'bv_coef': 0.2,
-                'points': 0
-            },
-            {
-                'code': '4R',
-                'bv_coef': 0.2,
-                'points': 0
-            },
-            {
-                'code': 'DE',
-                'bv_coef': 0.15,
-                'points': 0
-            }
-        ]
-
-        if self.code == 'U':
-            bonus.append({
-                'code': 'Fw',
-                'bv_coef': 0,
-                'points': 1
-            })
-            bonus.append({
-                'code': 'Ly',
-                'bv_coef': 0,
-                'points': 1
-            })
-            bonus.append({
-                'code': 'Sw',
-                'bv_coef': 0.5,
-                'points': 2
-            })
-            bonus.append({
-                'code': 'H',
-                'bv_coef': 0.5,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Biel',
-                'bv_coef': 0.6,
-                'points': 3
-            })
-            bonus.append({
-                'code': 'HBiel',
-                'bv_coef': 0.6,
-                'points': 4
-            })
-            bonus.append({
-                'code': 'T',
-                'bv_coef': 0.4,
-                'points': 1
-            })
-        
-        elif self.code == 'S':
-            bonus.append({
-                'code': 'Sw',
-                'bv_coef': 0.6,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Fw',
-                'bv_coef': 0.4,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Bh',
-                'bv_coef': 0.2,
-                'points': 0
-            })
-        
-        elif self.code == 'C':
-            bonus.append({
-                'code': 'LO',
-                'bv_coef': 0.2,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Fw',
-                'bv_coef': 0.2,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Sw',
-                'bv_coef': 0.2,
-                'points': 0
-            })
-
-        elif self.code == 'H':
-            bonus.append({
-                'code': 'LO',
-                'bv_coef': 0.3,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Fw',
-                'bv_coef': 0.5,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'Sw',
-                'bv_coef': 0.5,
-                'points': 0
-            })
-
-        elif self.code == 'In':
-            bonus.append({
-                'code': 'Bry',
-                'bv_coef': 0.25,
-                'points': 0
-            })
-
-        if self.type == 'CompoSpin':
-            bonus.append({
-                'code': 'SBC',
-                'bv_coef': 0.15,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'DCH',
-                'bv_coef': 0.15,
-                'points': 0
-            })
-            bonus.append({
-                'code': 'BD',
-                'bv_coef': 0.2,
-                'points': 0
-            })
-
-        applied = self.bonus.split(',')
-
-        self.bonus_value = 0
-
-        for bon in bonus:
-            if bon['code'] in applied:
-                self.bonus_value += (self.base_value * bon['bv_coef']) + bon['points']
-
-        self.bonus_value = round(self.bonus_value, 2)
+        # Spin and step bonus, the bonus string is only kept for display
+        self.bonus_value = BonusRules.value(self.type, self.code, self.base_value, self.bonus_mask)
+        self.bonus = BonusRules.toString(self.bonus_mask)
 
         # Element value
-        self.technical_value = round(self.base_value + self.bonus_value + self.qoe_value, 2)
+        self.technical_value = technicalValue(self.base_value, self.bonus_value, self.qoe_value)
+        self.stared_value = staredValue(self.technical_value, self.base_value, self.star, self.time)
 
-        if self.technical_value < 0:
-            self.technical_value = 0
-        
-        if self.star:
-            self.stared_value = 0
+    
+    # Read from element table (through the in memory rulebook value table)
+    def read(self):
+        offset = Rulebook.getOffset(self.code)
 
-        else:
-            self.stared_value = self.technical_value
+        if offset is None:
+            return
 
-            if self.time:
-                self.stared_value += self.base_value * 0.1
-        self.stared_value = round(self.stared_value, 2)
+        self.label = Rulebook.records[self.code].name
+        self.base_value, self.qoe_value = elementValues(Rulebook.values, offset, self.type, self.value_label, self.qoe, self.qoe_value)
 
-    
-    # Read from element table
-    def read(self):
-        element = Element(self.code)
-
-        if element.code:
-            self.label = element.name
-
-            # Combo jumb bonus
-            if self.type == 'ComboJump':
-                if self.value_label == '<':
-                    self.base_value = element.combo_under
-                
-                elif self.value_label == '<<':
-                    self.base_value = element.combo_half
-                
-                elif self.value_label == '<<<':
-                    self.base_value = element.combo_down
-                
-                else:
-                    self.base_value = element.base_combo
-            
-            # All other types
-            else:
-                if self.value_label == '<':
-                    self.base_value = element.under
-                
-                elif self.value_label == '<<':
-                    self.base_value = element.half
-                
-                elif self.value_label == '<<<':
-                    self.base_value = element.down
-                
-                else:
-                    self.base_value = element.base
-
-            # QOE reader
-            if self.qoe == 3:
-                self.qoe_value = element.qoe3
-            
-            elif self.qoe == 2:
-                self.qoe_value = element.qoe2
-
-            elif self.qoe == 1:
-                self.qoe_value = element.qoe1
-
-            elif self.qoe == -1:
-                self.qoe_value = element.qoem1
-
-            elif self.qoe == -2:
-                self.qoe_value = element.qoem2
-
-            elif self.qoe == -3:
-                self.qoe_value = element.qoem3
-
-            elif self.qoe == 0:
-                self.qoe_value = 0
-
-
-    # Create database structure
-    @staticmethod
-    def database_integrity():
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
-
-        c = conn.cursor()
-
-        print ("Check program_elements table")
-
-        c.execute('''CREATE TABLE IF NOT EXISTS `program_elements`
-            (`id` INTEGER PRIMARY KEY AUTOINCREMENT,
-            `program` INTEGER, 
-            `box` INTEGER, 
-            `type` TEXT, 
-            `label` TEXT,
-            `code` TEXT,
-            `value_label` TEXT,
-            `base_value` REAL,
-            `bonus` TEXT,
-            `bonus_value` REAL,
-            `qoe` TEXT,
-            `qoe_value` REAL,
-            `technical_value` REAL,
-            `star` INTEGER,
-            `stared_value` REAL,
-            `time` INTEGER
-            )''')
-
-        c.execute("PRAGMA table_info(`program_elements`)")
-        fields = c.fetchall()
-
-        existing = []
-
-        for field in fields:
-            existing.append(field[1])
-
-        fields = {
-            'program': 'INTEGER', 
-            'box': 'INTEGER', 
-            'type': 'TEXT', 
-            'label': 'TEXT',
-            'code': 'TEXT',
-            'value_label': 'TEXT',
-            'base_value': 'REAL',
-            'bonus': 'TEXT',
-            'bonus_value': 'REAL',
-            'qoe': 'TEXT',
-            'qoe_value': 'REAL',
-            'technical_value': 'REAL',
-            'star': 'INTEGER',
-            'stared_value': 'REAL',
-            'time': 'INTEGER'
-        }
-
-        for field, type in fields.items():
-            if not field in existing:
-                print ("Add "+field+" "+type+" to table")
-                c.execute("ALTER TABLE `program_elements` ADD COLUMN '%s' '%s'" % (field, type))
-
-        conn.close()
+
+# In memory copies may contain rolled back values
+tools.onRollback(ProgramElement.totals.clear)
+tools.onRollback(ProgramElement.boxes.clear)
@@ -0,0 +1,150 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+from bisect import bisect_left, insort
+import tools
+
+#
+# Ranking class
+#
+# In memory ranking of the programs of one category and one segment (program
+# name). Programs are kept in a sorted list of (-total_score, -components_score, id)
+# so the best program is first and ties on total score are broken by components
+# score, like the results table. The list is loaded once from the database and
+# updated by Program.record() and Program.delete().
+
+class Ranking:
+
+    # Loaded rankings by (category, program_name)
+    rankings = {}
+
+    # Ranking of each loaded program id
+    programs = {}
+
+    def __init__(self, category, program_name):
+        self.category = category
+        self.program_name = program_name
+        self.keys = []
+        self.entries = {}
+
+    # Get the ranking of a category and segment, loaded from database if needed
+    @classmethod
+    def get(cls, category, program_name):
+        ranking = cls.rankings.get((category, program_name))
+
+        if ranking is None:
+            ranking = cls(category, program_name)
+            ranking.load()
+            cls.rankings[(category, program_name)] = ranking
+
+        return ranking
+
+    # Forget all loaded rankings
+    @classmethod
+    def invalidate(cls):
+        cls.rankings = {}
+        cls.programs = {}
+
+    # Update a program if its ranking is loaded (moved if category or segment changed)
+    @classmethod
+    def record(cls, program_id, category, program_name, total_score, components_score):
+        previous = cls.programs.get(program_id)
+
+        if previous and (previous.category != category or previous.program_name != program_name):
+            previous.remove(program_id)
+
+        ranking = cls.rankings.get((category, program_name))
+
+        if ranking:
+            ranking.update(program_id, total_score, components_score)
+
+    # Remove a program from its ranking
+    @classmethod
+    def delete(cls, program_id):
+        ranking = cls.programs.get(program_id)
+
+        if ranking:
+            ranking.remove(program_id)
+
+    # Sort key of a program
+    @staticmethod
+    def key(program_id, total_score, components_score):
+        return (-(total_score or 0), -(components_score or 0), program_id)
+
+    # Load programs from database
+    def load(self):
+        c = tools.getDb().cursor()
+        c.execute("SELECT `id`, `total_score`, `components_score` FROM `programs` WHERE `category` = ? AND `program_name` = ?", (self.category, self.program_name))
+
+        self.entries = {}
+
+        for program_id, total_score, components_score in c.fetchall():
+            self.entries[program_id] = Ranking.key(program_id, total_score, components_score)
+            Ranking.programs[program_id] = self
+
+        self.keys = sorted(self.entries.values())
+
+    # Add or move a program
+    def update(self, program_id, total_score, components_score):
+        key = Ranking.key(program_id, total_score, components_score)
+        previous = self.entries.get(program_id)
+
+        if previous == key:
+            return
+
+        if previous:
+            del self.keys[bisect_left(self.keys, previous)]
+
+        insort(self.keys, key)
+        self.entries[program_id] = key
+        Ranking.programs[program_id] = self
+
+    # Remove a program
+    def remove(self, program_id):
+        previous = self.entries.pop(program_id, None)
+
+        if previous:
+            del self.keys[bisect_left(self.keys, previous)]
+
+        if Ranking.programs.get(program_id) is self:
+            del Ranking.programs[program_id]
+
+    # Rank of a score : number of other programs with a better total score (or same
+    # total score and better components score) plus one
+    def getRank(self, program_id, total_score, components_score):
+        key = Ranking.key(program_id, total_score, components_score)
+        rank = bisect_left(self.keys, key[:2]) + 1
+
+        # Program recorded with a better score than the given one
+        previous = self.entries.get(program_id)
+
+        if previous and previous[:2] < key[:2]:
+            rank -= 1
+
+        return rank
+
+    # Ids of the n best programs (all if n is None)
+    def getTop(self, n=None):
+        if n is None:
+            n = len(self.keys)
+
+        return [key[2] for key in self.keys[:n]]
+
+# In memory rankings may contain rolled back scores
+tools.onRollback(Ranking.invalidate)
@@ -0,0 +1,318 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+import numpy
+import tools
+from motor.scoring import *
+from motor.rulebook import *
+from motor.bonus import *
+from motor.program_element import *
+from motor.ranking import *
+from motor.skater import *
+
+#
+# Rescore class
+#
+# Recompute all the scores of a session after a change of the rulebook (elements
+# table or bonus rules). Element rows of the session are loaded as columns and
+# every column is computed for the whole session with NumPy arrays (indexing of
+# the rulebook value table, no loop over the rows), then the changed
+# rows are written back with executemany in one transaction, followed by the
+# program totals and the skater scores. Rankings are rebuilt on next use.
+#
+# Values follow the scoring kernel (value table layout, technicalValue(),
+# staredValue(), bonusValue(), rounding of round()) like ProgramElement.calculate()
+# and Program.calculate(). An empty value (NULL) is counted as 0.
+#
+# Usage :
+#   rescore = Rescore(session_id)
+#   rescore.run()
+#   print(rescore.getStats())
+
+class Rescore:
+
+    def __init__(self, session):
+        self.session = session
+        self.conn = tools.getDb()
+        self.columns = {}
+        self.elements = 0
+        self.changed_elements = 0
+        self.changed_programs = 0
+        self.changed_skaters = 0
+
+    # Load element rows of the session as columns
+    def load(self):
+        c = self.conn.cursor()
+        c.execute('''SELECT `program_elements`.`id`, `program_elements`.`program`, `program_elements`.`type`,
+                `program_elements`.`code`, `program_elements`.`value_label`, `program_elements`.`qoe`,
+                `program_elements`.`bonus_mask`, `program_elements`.`star`, `program_elements`.`time`,
+                `program_elements`.`label`, `program_elements`.`base_value`, `program_elements`.`bonus`,
+                `program_elements`.`bonus_value`, `program_elements`.`qoe_value`,
+                `program_elements`.`technical_value`, `program_elements`.`stared_value`
+            FROM `program_elements`
+            JOIN `programs` ON `programs`.`id` = `program_elements`.`program`
+            WHERE `programs`.`session` = ?''', (self.session, ))
+
+        rows = c.fetchall()
+        names = ['id', 'program', 'type', 'code', 'value_label', 'qoe', 'bonus_mask', 'star', 'time',
+            'label', 'base_value', 'bonus', 'bonus_value', 'qoe_value', 'technical_value', 'stared_value']
+
+        self.elements = len(rows)
+
+        if rows:
+            self.columns = dict(zip(names, [list(column) for column in zip(*rows)]))
+        else:
+            self.columns = {name: [] for name in names}
+
+    # Map a column with a function called once by distinct value (values are
+    # compared as text, None is 'None')
+    @staticmethod
+    def mapColumn(column, function, dtype=numpy.int64):
+        keys, inverse = numpy.unique(numpy.array(column, dtype=str), return_inverse=True)
+
+        return numpy.array([function(key) for key in keys], dtype=dtype)[inverse.reshape(-1)]
+
+    # Round like round(value, 2). Values close to a half cent are rounded by Python,
+    # the others are exactly rounded on the scaled value.
+    @staticmethod
+    def round2(values):
+        scaled = values * 100
+        rounded = numpy.rint(scaled) / 100
+
+        near = numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6
+
+        for i in numpy.flatnonzero(near):
+            rounded[i] = round(float(values[i]), 2)
+
+        return rounded
+
+    # NumPy column to list, NaN (empty value) as None
+    @staticmethod
+    def toList(values):
+        values = values.astype(object)
+        values[numpy.isnan(values.astype(numpy.float64))] = None
+
+        return values.tolist()
+
+    # Compute element values for all rows, return the new value columns. Every
+    # value is computed for the whole session at once with NumPy arrays : base and
+    # QOE values are read with one indexing of the rulebook value table.
+    def score(self):
+        columns = self.columns
+        count = self.elements
+
+        # Rulebook value table, the last value (NaN) is read for unknown codes
+        Rulebook.load()
+        table = numpy.append(numpy.array(Rulebook.values, dtype=numpy.float64), numpy.nan)
+        missing = len(table) - 1
+
+        offset = Rescore.mapColumn(columns['code'], lambda code: Rulebook.offsets.get(code, -1))
+        known = offset >= 0
+
+        # Position of the base value : rotation label, then combo jump values
+        position = Rescore.mapColumn(columns['value_label'], lambda label: VALUE_LABELS.get(label, 0))
+        position += Rescore.mapColumn(columns['type'], lambda element_type: VALUE_COMBO if element_type == 'ComboJump' else 0)
+
+        qoe_position = Rescore.mapColumn(columns['qoe'], lambda qoe: VALUE_QOE.get(qoe, -1))
+        qoe_known = known & (qoe_position >= 0)
+
+        # Values of unknown codes (and QOE) are kept
+        base = numpy.where(known, table[numpy.where(known, offset + position, missing)], numpy.array(columns['base_value'], dtype=numpy.float64))
+        qoe = numpy.where(qoe_known, table[numpy.where(qoe_known, offset + qoe_position, missing)], numpy.array(columns['qoe_value'], dtype=numpy.float64))
+
+        names = Rescore.mapColumn(columns['code'], lambda code: Rulebook.records[code].name if code in Rulebook.records else None, object)
+        label = numpy.where(known, names, numpy.array(columns['label'], dtype=object))
+
+        # Empty values are counted as 0
+        base_zero = numpy.nan_to_num(base)
+        qoe_zero = numpy.nan_to_num(qoe)
+        mask = numpy.nan_to_num(numpy.array(columns['bonus_mask'], dtype=numpy.float64)).astype(numpy.int64)
+        star = numpy.nan_to_num(numpy.array(columns['star'], dtype=numpy.float64)) != 0
+        time = numpy.nan_to_num(numpy.array(columns['time'], dtype=numpy.float64)) != 0
+
+        # Bonus value by element type and code, rules added in rules order
+        bonus_value = numpy.zeros(count)
+        groups = numpy.char.add(numpy.char.add(numpy.array(columns['type'], dtype=str), '\n'), numpy.array(columns['code'], dtype=str))
+        keys, inverse = numpy.unique(groups, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        for i, key in enumerate(keys):
+            rows = numpy.flatnonzero((inverse == i) & (mask != 0))
+
+            if not len(rows):
+                continue
+
+            element_type, code = key.split('\n')
+            value = numpy.zeros(len(rows))
+
+            for bit, bv_coef, points in BonusRules.get(element_type, code):
+                value = value + numpy.where(mask[rows] & bit, (base_zero[rows] * bv_coef) + points, 0)
+
+            bonus_value[rows] = Rescore.round2(value)
+
+        masks, mask_inverse = numpy.unique(mask, return_inverse=True)
+        bonus = numpy.array([BonusRules.toString(int(m)) for m in masks], dtype=object)[mask_inverse.reshape(-1)]
+
+        # Element values, see technicalValue() and staredValue()
+        technical = Rescore.round2(base_zero + bonus_value + qoe_zero)
+        technical = numpy.where(technical < 0, 0, technical)
+
+        stared = Rescore.round2(numpy.where(time, technical + base_zero * TIME_BONUS, technical))
+        stared = numpy.where(star, 0, stared)
+
+        return {
+            'label': label.tolist(),
+            'base_value': Rescore.toList(base),
+            'bonus': bonus.tolist(),
+            'bonus_value': bonus_value.tolist(),
+            'qoe_value': Rescore.toList(qoe),
+            'technical_value': technical.tolist(),
+            'stared_value': stared.tolist()
+        }
+
+    # Write changed element rows, return technical score by program
+    def writeElements(self, scored):
+        names = ['label', 'base_value', 'bonus', 'bonus_value', 'qoe_value', 'technical_value', 'stared_value']
+
+        new_rows = list(zip(*[scored[name] for name in names]))
+        old_rows = list(zip(*[self.columns[name] for name in names]))
+
+        updates = []
+
+        for element_id, new, old in zip(self.columns['id'], new_rows, old_rows):
+            if new != old:
+                updates.append(new + (element_id, ))
+
+        self.changed_elements = len(updates)
+
+        c = self.conn.cursor()
+        c.executemany('''UPDATE `program_elements` SET `label` = ?, `base_value` = ?, `bonus` = ?, `bonus_value` = ?,
+            `qoe_value` = ?, `technical_value` = ?, `stared_value` = ? WHERE `id` = ?''', updates)
+
+        technical = {}
+
+        for program, stared_value in zip(self.columns['program'], scored['stared_value']):
+            technical[program] = technical.get(program, 0) + stared_value
+
+        return technical
+
+    # Compute and write program scores, short programs first for the long program totals
+    def writePrograms(self, technical):
+        c = self.conn.cursor()
+        c.row_factory = tools.dict_factory
+        c.execute("SELECT * FROM `programs` WHERE `session` = ? ORDER BY `id`", (self.session, ))
+        programs = c.fetchall()
+
+        c.execute("SELECT `id`, `initial_score` FROM `skaters` WHERE `session` = ?", (self.session, ))
+        initial = {}
+
+        for skater in c.fetchall():
+            if skater['initial_score']:
+                initial[skater['id']] = float(skater['initial_score'])
+
+        programs.sort(key=lambda program: (program['program_name'] or '').upper() == 'LONG')
+
+        short = {}
+        updates = []
+
+        for program in programs:
+            technical_score = round(technical.get(program['id'], 0), 2)
+            components_score = componentsScore(program['skating_skills'] or 0, program['transitions'] or 0,
+                program['choreography'] or 0, program['performance'] or 0, program['components_coef'] or 0)
+            program_value, score = programScore(technical_score, components_score, program['penalization'] or 0)
+
+            if program['program_name'] == 'short':
+                short.setdefault((program['skater_id'], program['category']), score)
+
+            # Add initial and short program scores to total
+            carried = initial.get(program['skater_id'], 0) + short.get((program['skater_id'], program['category']), 0)
+            total_score = totalScore(score, program['program_name'] or '', program['skater_id'], carried)
+
+            new = (technical_score, components_score, program_value, score, total_score)
+
+            if new != (program['technical_score'], program['components_score'], program['program_value'], program['score'], program['total_score']):
+                updates.append(new + (program['id'], ))
+
+            program['score'] = score
+
+        self.changed_programs = len(updates)
+
+        c.executemany('''UPDATE `programs` SET `technical_score` = ?, `components_score` = ?, `program_value` = ?,
+            `score` = ?, `total_score` = ? WHERE `id` = ?''', updates)
+
+        return programs
+
+    # Compute and write skater scores of confirmed programs
+    def writeSkaters(self, programs):
+        scores = {}
+
+        # First program of each skater and program name, like Skater.getCurrentProgram()
+        for program in sorted(programs, key=lambda program: program['id']):
+            scores.setdefault((program['skater_id'], (program['program_name'] or '').upper()), program['score'])
+
+        c = self.conn.cursor()
+        c.row_factory = tools.dict_factory
+        c.execute("SELECT `id`, `status`, `initial_score`, `short_score`, `long_score`, `total_score` FROM `skaters` WHERE `session` = ?", (self.session, ))
+
+        updates = []
+
+        for skater in c.fetchall():
+            status = str(skater['status']).upper()
+            short_score = skater['short_score'] or 0
+            long_score = skater['long_score'] or 0
+
+            # Short program is confirmed
+            if status in ('SHORTEND', 'LONG', 'LONGSTART', 'LONGEND') and (skater['id'], 'SHORT') in scores:
+                short_score = scores[(skater['id'], 'SHORT')]
+
+            # Long program is confirmed
+            if status == 'LONGEND' and (skater['id'], 'LONG') in scores:
+                long_score = scores[(skater['id'], 'LONG')]
+
+            total_score = skaterTotal(short_score, long_score, skater['initial_score'])
+
+            if (short_score, long_score, total_score) != (skater['short_score'], skater['long_score'], skater['total_score']):
+                updates.append((short_score, long_score, total_score, skater['id']))
+
+        self.changed_skaters = len(updates)
+
+        c.executemany("UPDATE `skaters` SET `short_score` = ?, `long_score` = ?, `total_score` = ? WHERE `id` = ?", updates)
+
+    # Rescore the whole session in one transaction
+    def run(self):
+        with tools.transaction():
+            self.load()
+            technical = self.writeElements(self.score())
+            programs = self.writePrograms(technical)
+            self.writeSkaters(programs)
+
+        # In memory copies of the scores are outdated
+        ProgramElement.totals.clear()
+        ProgramElement.boxes.clear()
+        Ranking.invalidate()
+        Skater.invalidate()
+
+    # Get counters of the last run
+    def getStats(self):
+        return {
+            'elements': self.elements,
+            'changed_elements': self.changed_elements,
+            'changed_programs': self.changed_programs,
+            'changed_skaters': self.changed_skaters
+        }
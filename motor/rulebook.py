@@ -0,0 +1,115 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+from collections import namedtuple
+import tools
+from motor.scoring import *
+
+# Immutable copy of one row of the elements table
+ElementRecord = namedtuple('ElementRecord', [
+    'code',
+    'name',
+    'base',
+    'under',
+    'half',
+    'down',
+    'base_combo',
+    'combo_under',
+    'combo_half',
+    'combo_down',
+    'qoe1',
+    'qoe2',
+    'qoe3',
+    'qoem1',
+    'qoem2',
+    'qoem3',
+    'type'
+])
+
+#
+# Rulebook class
+#
+# In memory copy of the elements table. The whole table is loaded at the first
+# lookup and kept until an element is recorded or deleted, so scoring an element
+# never reads the database during a competition.
+#
+# Element values are also compiled into the value table of the scoring kernel
+# (values), offsets gives the position of the first value of an element code.
+
+class Rulebook:
+
+    records = None
+    offsets = None
+    values = None
+
+    # Load the whole elements table
+    @classmethod
+    def load(cls):
+        c = tools.getDb().cursor()
+        c.execute("SELECT `code`, `name`, `base`, `under`, `half`, `down`, `base_combo`, `combo_under`, `combo_half`, `combo_down`, `qoe1`, `qoe2`, `qoe3`, `qoem1`, `qoem2`, `qoem3`, `type` FROM `elements`")
+
+        records = {}
+        offsets = {}
+        elements = []
+
+        for row in c.fetchall():
+            record = ElementRecord._make(row)
+
+            # Keep the first row like the previous SELECT ... LIMIT 1
+            if record.code and not record.code in records:
+                records[record.code] = record
+                offsets[record.code] = len(elements) * VALUE_STRIDE
+
+                elements.append((
+                    record.base, record.under, record.half, record.down,
+                    record.base_combo, record.combo_under, record.combo_half, record.combo_down,
+                    record.qoem3, record.qoem2, record.qoem1, record.qoe1, record.qoe2, record.qoe3
+                ))
+
+        values = compileValues(elements)
+
+        cls.records = records
+        cls.offsets = offsets
+        cls.values = values
+
+    # Get an element record by code, None if unknown
+    @classmethod
+    def get(cls, code):
+        if cls.records is None:
+            cls.load()
+
+        return cls.records.get(code)
+
+    # Get the offset of an element code in the value table, None if unknown
+    @classmethod
+    def getOffset(cls, code):
+        if cls.records is None:
+            cls.load()
+
+        return cls.offsets.get(code)
+
+    # Forget loaded records, next lookup will reload the table
+    @classmethod
+    def invalidate(cls):
+        cls.records = None
+        cls.offsets = None
+        cls.values = None
+
+# Records may contain rolled back elements
+tools.onRollback(Rulebook.invalidate)
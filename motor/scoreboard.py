@@ -0,0 +1,288 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+import asyncio
+import json
+import threading
+import tools
+
+# Default display page, shows the live score state and follows /events
+PAGE = b'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>RollArt Unchained - Scoreboard</title>
+<style>
+body { background: #0a1526; color: white; font-family: sans-serif; margin: 2em; }
+h1 { background: #bd3800; padding: 0.3em 0.5em; }
+table { border-collapse: collapse; width: 100%; font-size: 2em; }
+td { border: 1px solid #dfe7e8; padding: 0.3em 0.5em; }
+td.value { text-align: right; width: 30%; }
+</style>
+</head>
+<body>
+<h1 id="skaterName">-</h1>
+<table>
+<tr><td>Team</td><td class="value" id="skaterTeam"></td></tr>
+<tr><td>Element</td><td class="value" id="liveScoreEl"></td></tr>
+<tr><td>Element value</td><td class="value" id="liveScoreVal"></td></tr>
+<tr><td>Technical score</td><td class="value" id="finalScoreTechnical"></td></tr>
+<tr><td>Components</td><td class="value" id="finalScoreComponents"></td></tr>
+<tr><td>Deduction</td><td class="value" id="finalScoreDeduction"></td></tr>
+<tr><td>Segment score</td><td class="value" id="segmentScore"></td></tr>
+<tr><td>Total score</td><td class="value" id="finalScore"></td></tr>
+<tr><td>Rank</td><td class="value" id="rank"></td></tr>
+</table>
+<script>
+function apply(event) {
+    var values = JSON.parse(event.data);
+    for (var key in values) {
+        var cell = document.getElementById(key);
+        if (cell) { cell.textContent = values[key]; }
+    }
+}
+var source = new EventSource('/events');
+source.addEventListener('state', apply);
+source.onmessage = apply;
+</script>
+</body>
+</html>
+'''
+
+#
+# ScoreboardServer class
+#
+# Local HTTP server pushing live score values to any number of displays (arena
+# screen, streaming overlay, coach tablets) with Server-Sent Events.
+# It runs an asyncio loop in a background thread and is fed by the same values
+# as the live score publisher. Each update is compared to the current state,
+# only changed values are serialized once and the same bytes are written to
+# every connected display.
+#
+# Routes :
+#   /        default display page
+#   /events  event stream, a "state" event with the whole state at connection
+#            then one message per update with changed values only
+#   /state   whole state as JSON
+
+class ScoreboardServer:
+
+    def __init__(self, host=None, port=None):
+        config = tools.getConfig()
+
+        if host is None:
+            host = config.get('scoreboard', 'host')
+
+        if port is None:
+            port = config.getint('scoreboard', 'port')
+
+        self.host = host
+        self.port = port
+        self.state = {}
+        self.clients = {}
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.updates = 0
+
+    # Start the server thread. The Tk thread never waits for it, wait is only used
+    # by scripts reading the listening port.
+    def start(self, wait=False):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='Scoreboard', daemon=True)
+            self.thread.start()
+
+        if wait:
+            self.ready.wait(5)
+
+    # Stop the server thread
+    def stop(self):
+        if self.thread is None:
+            return
+
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+        self.thread.join(5)
+        self.thread = None
+
+    # Thread main function
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+
+        except OSError as e:
+            print("Scoreboard server error : "+str(e))
+            self.loop.close()
+            self.loop = None
+            self.ready.set()
+            return
+
+        self.port = self.server.sockets[0].getsockname()[1]
+        print("Scoreboard server on http://"+self.host+":"+str(self.port)+"/")
+
+        self.ready.set()
+
+        try:
+            self.loop.run_forever()
+
+        finally:
+            self.server.close()
+
+            # Close connections still opened
+            tasks = asyncio.all_tasks(self.loop)
+
+            for task in tasks:
+                task.cancel()
+
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+            self.loop = None
+
+    # Called by any thread (live score publisher) with new values
+    def update(self, values):
+        loop = self.loop
+
+        if loop:
+            try:
+                loop.call_soon_threadsafe(self.apply, dict(values))
+
+            except RuntimeError:
+                # Loop closed, server could not start
+                pass
+
+    # Update the state and send changed values to all displays (loop thread)
+    def apply(self, values):
+        delta = {}
+
+        for key, value in values.items():
+            if self.state.get(key) != value:
+                delta[key] = value
+
+        if not delta:
+            return
+
+        self.state.update(delta)
+        self.updates += 1
+
+        payload = ('data: ' + json.dumps(delta) + '\n\n').encode('utf-8')
+        snapshot = None
+
+        for queue in self.clients:
+            try:
+                queue.put_nowait(payload)
+
+            except asyncio.QueueFull:
+                # Display is late, pending updates are replaced by the whole state
+                if snapshot is None:
+                    snapshot = self.snapshot()
+
+                while not queue.empty():
+                    queue.get_nowait()
+
+                queue.put_nowait(snapshot)
+
+    # Whole state event
+    def snapshot(self):
+        return ('event: state\ndata: ' + json.dumps(self.state) + '\n\n').encode('utf-8')
+
+    # Handle one HTTP connection
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+
+            # Skip headers
+            while True:
+                line = await reader.readline()
+
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request.decode('latin-1').split()
+            path = '/'
+
+            if len(parts) > 1:
+                path = parts[1].split('?')[0]
+
+            if path == '/events':
+                await self.stream(writer)
+
+            elif path == '/state':
+                self.respond(writer, '200 OK', 'application/json', json.dumps(self.state).encode('utf-8'))
+                await writer.drain()
+
+            elif path == '/':
+                self.respond(writer, '200 OK', 'text/html; charset=utf-8', PAGE)
+                await writer.drain()
+
+            else:
+                self.respond(writer, '404 Not Found', 'text/plain', b'Not found')
+                await writer.drain()
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        except asyncio.CancelledError:
+            # Server is stopping
+            pass
+
+        finally:
+            writer.close()
+
+    # Write a complete HTTP response
+    def respond(self, writer, status, content_type, body):
+        writer.write(('HTTP/1.1 '+status+'\r\n'
+            'Content-Type: '+content_type+'\r\n'
+            'Content-Length: '+str(len(body))+'\r\n'
+            'Access-Control-Allow-Origin: *\r\n'
+            'Connection: close\r\n\r\n').encode('latin-1'))
+        writer.write(body)
+
+    # Send events to one display until it disconnects
+    async def stream(self, writer):
+        queue = asyncio.Queue(maxsize=100)
+
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream\r\n'
+            b'Cache-Control: no-cache\r\n'
+            b'Access-Control-Allow-Origin: *\r\n'
+            b'Connection: keep-alive\r\n\r\n')
+        writer.write(self.snapshot())
+        await writer.drain()
+
+        self.clients[queue] = writer
+
+        try:
+            while queue in self.clients:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), 15)
+
+                except asyncio.TimeoutError:
+                    # Keep alive comment, also detects closed displays
+                    payload = b': ping\n\n'
+
+                writer.write(payload)
+                await writer.drain()
+
+        finally:
+            self.clients.pop(queue, None)
@@ -0,0 +1,189 @@
+# Rollart unchained
+# Copyright (C) 2021  Skaters Team community
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Contributors :
+# Guillaume MODARD <guillaumemodard@gmail.com>
+
+#
+# Scoring kernel
+#
+# Pure functions computing element, program and skater scores from plain values.
+# They don't use the database nor the interface : model classes (ProgramElement,
+# Program, Skater), the session rescore and the interface delegate to them, and
+# they can be used alone to score or simulate programs without a database file.
+#
+# Element values come from a value table : one flat sequence of floats with
+# VALUE_STRIDE values per element (see compileValues()), an element is given by
+# the offset of its first value. Empty values are NaN.
+#
+# Example :
+#   values = compileValues([(1.0, 0.8, 0.5, 0.3, 0.9, 0.7, 0.4, 0.2, -0.3, -0.2, -0.1, 0.1, 0.2, 0.3)])
+#   base, qoe = elementValues(values, 0, 'SoloJump', 'base', 2)
+#   technical = technicalValue(base, 0, qoe)
+
+# The value table is a standard array : live scoring reads the values of one
+# element at a time, a read is cheaper than a NumPy scalar access. The session
+# rescore (motor/rescore.py) reads it as a NumPy array for whole columns.
+from array import array
+
+# Layout of the values of one element in the value table : base values by
+# rotation label (base, <, <<, <<<), the same for combo jumps, then QOE values
+# from -3 to +3
+VALUE_LABELS = {'<': 1, '<<': 2, '<<<': 3}
+VALUE_COMBO = 4
+VALUE_QOE = {-3: 8, -2: 9, -1: 10, 0: 11, 1: 12, 2: 13, 3: 14}
+VALUE_STRIDE = 15
+
+# QOE of recorded elements is read back as text (qoe column is TEXT)
+VALUE_QOE.update({str(qoe): position for qoe, position in list(VALUE_QOE.items())})
+
+# Penalization of a fall
+FALL_PENALTY = -1
+
+# Part of the base value added to an element with a time bonus
+TIME_BONUS = 0.1
+
+# compileValues(elements = list)
+# Build the value table from element values, each element is a sequence of
+# base, under, half, down, base_combo, combo_under, combo_half, combo_down,
+# qoem3, qoem2, qoem1, qoe1, qoe2, qoe3 (None or text for empty values)
+def compileValues(elements):
+    values = array('d')
+    nan = float('nan')
+
+    for element in elements:
+        element = list(element)
+
+        # QOE 0 has no value
+        element.insert(11, 0)
+
+        for value in element:
+            try:
+                values.append(float(value))
+
+            except (TypeError, ValueError):
+                values.append(nan)
+
+    return values
+
+# readValue(values = array, position = int)
+# Read one value of the table, None if empty
+def readValue(values, position):
+    value = values[position]
+
+    if value != value:
+        return None
+
+    return value
+
+# elementValues(values = array, offset = int, element_type = str, value_label = str, qoe = int, qoe_value = float)
+# Base value and QOE value of an element. For an unknown QOE, qoe_value is kept.
+def elementValues(values, offset, element_type, value_label, qoe, qoe_value=None):
+    position = offset + VALUE_LABELS.get(value_label, 0)
+
+    # Combo jump values follow solo values
+    if element_type == 'ComboJump':
+        position += VALUE_COMBO
+
+    base_value = readValue(values, position)
+
+    position = VALUE_QOE.get(qoe)
+
+    if position is not None:
+        qoe_value = readValue(values, offset + position)
+
+    return (base_value, qoe_value)
+
+# compileBonus(rules = list, bits = dict, element_type = str, code = str)
+# Bonus rules of an element type and code as a list of (bit mask, base value
+# coefficient, points) in rules order
+def compileBonus(rules, bits, element_type, code):
+    compiled = []
+
+    for rule in rules:
+        if rule['code'] in bits and rule.get('element') in (None, code) and rule.get('type') in (None, element_type):
+            compiled.append((1 << bits[rule['code']], rule.get('bv_coef', 0), rule.get('points', 0)))
+
+    return compiled
+
+# bonusValue(compiled = list, base_value = float, mask = int)
+# Value of the applied bonuses (bit mask) of an element
+def bonusValue(compiled, base_value, mask):
+    value = 0
+
+    if mask:
+        for bit, bv_coef, points in compiled:
+            if mask & bit:
+                value += (base_value * bv_coef) + points
+
+    return round(value, 2)
+
+# technicalValue(base_value = float, bonus_value = float, qoe_value = float)
+# Element value, never negative
+def technicalValue(base_value, bonus_value, qoe_value):
+    value = round(base_value + bonus_value + qoe_value, 2)
+
+    if value < 0:
+        value = 0
+
+    return value
+
+# staredValue(technical_value = float, base_value = float, star = int, time = int)
+# Element value counted in the program : 0 for a stared (not valid) element,
+# time bonus added
+def staredValue(technical_value, base_value, star, time):
+    if star:
+        value = 0
+
+    else:
+        value = technical_value
+
+        if time:
+            value += base_value * TIME_BONUS
+
+    return round(value, 2)
+
+# componentsScore(skating_skills = float, transitions = float, choreography = float, performance = float, coef = float)
+def componentsScore(skating_skills, transitions, choreography, performance, coef):
+    return round((skating_skills + transitions + choreography + performance) * coef, 2)
+
+# programScore(technical_score = float, components_score = float, penalization = float)
+# Program value and score (never negative) as a tuple
+def programScore(technical_score, components_score, penalization):
+    program_value = round(technical_score + components_score, 2)
+    score = round(program_value + penalization, 2)
+
+    if score < 0:
+        score = 0
+
+    return (program_value, score)
+
+# totalScore(score = float, program_name = str, skater_id = int, carried_score = float)
+# Total of a program : initial and short program scores (carried_score) are
+# added to the score of the long program of a skater
+def totalScore(score, program_name, skater_id, carried_score):
+    if program_name.upper() == 'LONG' and skater_id:
+        return round(score + carried_score, 2)
+
+    return score
+
+# skaterTotal(short_score = float, long_score = float, initial_score = str)
+def skaterTotal(short_score, long_score, initial_score):
+    initial = 0
+    if initial_score:
+        initial = float(initial_score)
+
+    return round(short_score + long_score + initial, 2)
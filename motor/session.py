@@ -22,98 +22,23 @@ import os
 from pathlib import Path
 import time
 import tools
+from motor.persistent import Persistent, Column, ID
 from motor.category import *
 
-class Session:
+class Session(Persistent):
 
-    def __init__(self, session):
+    # Table and columns, see Persistent
+    table = 'sessions'
+    schema = (
+        ID,
+        Column('name', 'TEXT', 'Unnamed'),
+        Column('date', 'TEXT', lambda: time.strftime('%Y-%m-%d')),
+        # Opened session flag, only written by open() and close()
+        Column('lock', 'INTEGER', attribute=False)
+    )
 
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        self.conn = sqlite3.connect(db_path)
-
-        session_id = session
-
-        if type(session) is dict:
-            data = session
-
-            if 'id' in session:
-                session_id = session['id']
-            
-            else:
-                session_id  = 0
-            
-            self.hydrate(data)
-
-        else:
-            c = self.conn.cursor()
-            c.row_factory = tools.dict_factory
-            c.execute("SELECT * FROM `sessions` WHERE `id` = ? LIMIT 1", (session_id,))
-
-            data = c.fetchone()
-
-            if not data:
-                data = {}
-
-            self.hydrate(data)
-
-    # Hydrate values to class
-    def hydrate(self, data):
-
-        # check data integrity
-        values = {
-            'id': 0,
-            'name': 'Unnamed',
-            'date': time.strftime('%Y-%m-%d')
-        }
-
-        for key in values:
-            if key in data:
-                values[key] = data[key]
-
-        # hydrate data
-        self.name = values['name']
-        self.date = values['date']
-        self.id = values['id']
-
-    # record data to database
-    def record(self):
-        c = self.conn.cursor()
-
-        c.row_factory = sqlite3.Row
-        c.execute("SELECT * FROM `sessions` WHERE `id` = ? LIMIT 1", (self.id,))
-        exists = c.fetchone()
-
-        if not exists:
-            c.execute('INSERT INTO `sessions` (`name`, `date`) VALUES (?,?)', (self.name, self.date))
-
-            # get last id
-            c.execute('SELECT `id` FROM `sessions` ORDER BY `id` DESC LIMIT 1')
-            res = c.fetchone()
-
-            self.id = res[0]
-
-        else:
-            c.execute('UPDATE `sessions` SET `name` = ?, `date` = ? WHERE `id` = ?', (self.name, self.date, self.id))
-
-        self.conn.commit()
-
-    # Get all values in a dict
-    def getAll(self):
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'date': self.date
-        }
-
-        return data
-
-    # Remove element from database
-    def delete(self):
-        c = self.conn.cursor()
-        c.execute('DELETE FROM `sessions` WHERE `id` = ?', (self.id,))
-        self.conn.commit()
+    # Loaded sessions by id, see Persistent.get()
+    identity = {}
 
     # Open the session
     def open(self):
@@ -121,13 +46,24 @@ class Session:
 
         c.execute('UPDATE `sessions` SET `lock` = "1" WHERE `id` = ?', (self.id,))
         c.execute('UPDATE `sessions` SET `lock` = "0" WHERE `id` != ?', (self.id,))
-        self.conn.commit()
+        tools.commit()
+
+        Session.forgetAll()
 
     # Close all session
     def close(self):
         c = self.conn.cursor()
         c.execute('UPDATE `sessions` SET `lock` = "0"')
-        self.conn.commit()
+        tools.commit()
+
+        Session.forgetAll()
+
+    # Forget the loaded sessions, categories and skaters (identity maps)
+    @staticmethod
+    def forgetAll():
+        Session.invalidate()
+        Category.invalidate()
+        Skater.invalidate()
 
     # Get categories of this session
     def getCategories(self):
@@ -140,17 +76,14 @@ class Session:
         categories = []
 
         for d in data:
-            categories.append(Category(d))
+            categories.append(Category.fromRow(d))
 
         return categories
 
     # get opened session
     @classmethod
     def getOpened(self):
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
+        conn = tools.getDb()
 
         c = conn.cursor()
         c.row_factory = tools.dict_factory
@@ -158,50 +91,12 @@ class Session:
         data = c.fetchone()
 
         if data:
-            session = self(data)
+            session = self.fromRow(data)
         
         else:
             session = 0
 
-        conn.close()
-
         return session
 
-    # Create database structure
-    @staticmethod
-    def database_integrity():
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
-
-        c = conn.cursor()
-
-        print ("Check sessions table")
-
-        c.execute('''CREATE TABLE IF NOT EXISTS `sessions`
-            (`id` INTEGER PRIMARY KEY AUTOINCREMENT,
-            `name` TEXT,
-            `date` TEXT,
-            `lock` INTEGER)''')
-
-        c.execute("PRAGMA table_info(`sessions`)")
-        fields = c.fetchall()
-
-        existing = []
-
-        for field in fields:
-            existing.append(field[1])
-
-        fields = {
-            'name': 'TEXT',
-            'date': 'TEXT',
-            'lock': 'INTEGER'
-        }
-
-        for field, type in fields.items():
-            if not field in existing:
-                print ("Add "+field+" "+type+" to table")
-                c.execute("ALTER TABLE `sessions` ADD COLUMN '%s' '%s'" % (field, type))
-
-        conn.close()
\ No newline at end of file
+# Loaded sessions may contain rolled back values
+tools.onRollback(Session.invalidate)
@@ -22,169 +22,30 @@ import os
 from pathlib import Path
 import time
 import tools
+from motor.persistent import Persistent, Column, ID
 from motor.program import *
-
-class Skater:
-
-    def __init__(self, data):
-
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        self.conn = sqlite3.connect(db_path)
-
-        data_id = data
-
-        if type(data) is dict:
-            if 'id' in data:
-                data_id = data['id']
-            
-            else:
-                data_id  = 0
-            
-            self.hydrate(data)
-
-        else:
-            c = self.conn.cursor()
-            c.row_factory = tools.dict_factory
-            c.execute("SELECT * FROM `skaters` WHERE `id` = ? LIMIT 1", (data_id,))
-
-            values = c.fetchone()
-
-            if not values:
-                values = {}
-
-            self.hydrate(values)
-
-    # Hydrate values to class
-    def hydrate(self, data):
-
-        # check data integrity
-        values = {
-            'id': 0,
-            'name': 'unnamed-skater',
-            'order': 0,
-            'session': 0,
-            'category': 0,
-            'initial_score': 0.0,
-            'short_score': 0.0,
-            'long_score': 0.0,
-            'total_score': 0.0,
-            'team': '',
-            'status': 'unstarted'
-        }
-
-        for key in values:
-            if key in data:
-                values[key] = data[key]
-
-        # hydrate data
-        self.id = values['id']
-        self.name = values['name']
-        self.order = values['order']
-        self.session = values['session']
-        self.category = values['category']
-        self.initial_score = values['initial_score']
-        self.short_score = values['short_score']
-        self.long_score = values['long_score']
-        self.total_score = values['total_score']
-        self.team = values['team']
-        self.status = values['status']
-
-
-    # record data to database
-    def record(self):
-        c = self.conn.cursor()
-
-        c.row_factory = sqlite3.Row
-        c.execute("SELECT * FROM `skaters` WHERE `id` = ? LIMIT 1", (self.id,))
-        exists = c.fetchone()
-
-        if not exists:
-            c.execute('''INSERT INTO `skaters` 
-                (   `name`, 
-                    `order`, 
-                    `session`,
-                    `category`,
-                    `initial_score`,
-                    `short_score`,
-                    `long_score`,
-                    `total_score`,
-                    `team`,
-                    `status`
-                ) 
-                VALUES (?,?,?,?,?,?,?,?,?,?)''', 
-                (
-                    self.name, 
-                    self.order, 
-                    self.session, 
-                    self.category, 
-                    self.initial_score,
-                    self.short_score, 
-                    self.long_score, 
-                    self.total_score, 
-                    self.team,
-                    self.status
-                ))
-
-            # get last id
-            c.execute('SELECT `id` FROM `skaters` ORDER BY `id` DESC LIMIT 1')
-            res = c.fetchone()
-
-            self.id = res[0]
-
-        else:
-            c.execute('''UPDATE `skaters` SET 
-                            `name` = ?, 
-                            `order` = ?,
-                            `session` = ?,
-                            `category` = ?,
-                            `initial_score` = ?,
-                            `short_score` = ?,
-                            `long_score` = ?,
-                            `total_score` = ?,
-                            `team` = ?,
-                            `status` = ?
-                        WHERE `id` = ?''', 
-                    (
-                        self.name, 
-                        self.order, 
-                        self.session, 
-                        self.category,
-                        self.initial_score,
-                        self.short_score, 
-                        self.long_score, 
-                        self.total_score, 
-                        self.team, 
-                        self.status,
-                        self.id
-                    ))
-
-        self.conn.commit()
-
-    # Get all values in a dict
-    def getAll(self):
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'order': self.order,
-            'session': self.session,
-            'category': self.category,
-            'initial_score': self.initial_score,
-            'short_score': self.short_score,
-            'long_score': self.long_score,
-            'total_score': self.total_score,
-            'team': self.team,
-            'status': self.status
-        }
-
-        return data
-
-    # Remove element from database
-    def delete(self):
-        c = self.conn.cursor()
-        c.execute('DELETE FROM `skaters` WHERE `id` = ?', (self.id,))
-        self.conn.commit()
+from motor.scoring import *
+
+class Skater(Persistent):
+
+    # Table and columns, see Persistent
+    table = 'skaters'
+    schema = (
+        ID,
+        Column('name', 'TEXT', 'unnamed-skater'),
+        Column('order', 'INTEGER', 0),
+        Column('session', 'INTEGER', 0),
+        Column('category', 'INTEGER', 0),
+        Column('initial_score', 'REAL', 0.0),
+        Column('short_score', 'REAL', 0.0),
+        Column('long_score', 'REAL', 0.0),
+        Column('total_score', 'REAL', 0.0),
+        Column('team', 'TEXT', ''),
+        Column('status', 'TEXT', 'unstarted')
+    )
+
+    # Loaded skaters by id, see Persistent.get()
+    identity = {}
 
     # Get the opened program of the skater or return none
     def getCurrentProgram(self):
@@ -217,11 +78,7 @@ class Skater:
             return None
 
     def calculate(self):
-        initial_score = 0
-        if self.initial_score:
-            initial_score = float(self.initial_score)
-
-        self.total_score = round(self.short_score + self.long_score + initial_score, 2)
+        self.total_score = skaterTotal(self.short_score, self.long_score, self.initial_score)
 
     def getTeamScore(self):
         c = self.conn.cursor()
@@ -253,55 +110,5 @@ class Skater:
 
         return teams
 
-    # Create database structure
-    @staticmethod
-    def database_integrity():
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
-
-        c = conn.cursor()
-
-        print ("Check skaters table")
-
-        c.execute('''CREATE TABLE IF NOT EXISTS `skaters`
-            (`id` INTEGER PRIMARY KEY AUTOINCREMENT,
-            `name` TEXT,
-            `order` INTEGER,
-            `session` INTEGER,
-            `category` INTEGER,
-            `initial_score` REAL,
-            `short_score` REAL,
-            `long_score` REAL,
-            `total_score` REAL,
-            `team` TEXT,
-            `status` TEXT)''')
-
-        c.execute("PRAGMA table_info(`skaters`)")
-        fields = c.fetchall()
-
-        existing = []
-
-        for field in fields:
-            existing.append(field[1])
-
-        fields = {
-            'name': 'TEXT',
-            'order': 'INTEGER',
-            'session': 'INTEGER',
-            'category': 'INTEGER',
-            'initial_score' : 'REAL',
-            'short_score': 'REAL',
-            'long_score': 'REAL',
-            'total_score': 'REAL',
-            'team': 'TEXT',
-            'status': 'TEXT'
-        }
-
-        for field, type in fields.items():
-            if not field in existing:
-                print ("Add "+field+" "+type+" to table")
-                c.execute("ALTER TABLE `skaters` ADD COLUMN '%s' '%s'" % (field, type))
-
-        conn.close()
+# Loaded skaters may contain rolled back values
+tools.onRollback(Skater.invalidate)
@@ -21,6 +21,7 @@ import sqlite3
 from tkinter import *
 from tkinter import messagebox
 import tools
+from apps.window import *
 
 class PenaltyApp:
 
@@ -29,6 +30,7 @@ class PenaltyApp:
         self.window = None
         self.entry = None
 
+    @tools.unitOfWork
     def confirm(self):
         val = float(self.entry.get())
 
@@ -36,35 +38,30 @@ class PenaltyApp:
             self.parent.program.penalization = val
             self.parent.program.record()
             self.parent.program_score()
-            self.window.destroy()
+            WindowManager.close('penalty')
 
         else:
             messagebox.showwarning(title="Penalty alert", message="Only <= 0 value accepted", parent=self.window)
 
     def open_window(self):
 
-        # Create main window
-        self.window = Tk()
+        # Dialog of the main window, created once and then shown again
+        self.window, build = WindowManager.open('penalty', "Penalty - RollArt BV", "500x300", (480,360), reuse=True)
 
-        # Customizing window
-        self.window.title("Penalty - RollArt BV")
-        self.window.geometry("500x300")
-        self.window.minsize(480,360)
-        self.window.config(background="#0a1526")
+        if build:
+            frame = Frame(self.window, bg="")
 
-        frame = Frame(self.window, bg="")
+            label = Label(frame, text="Penalty", font=("sans-serif", 14), bg="#0a1526", fg="white")
+            label.pack(fill=X, pady=10)
 
-        label = Label(frame, text="Penalty", font=("sans-serif", 14), bg="#0a1526", fg="white")
-        label.pack(fill=X, pady=10)
+            self.entry = Entry(frame, font=('sans-serif', 14), borderwidth=1, relief='flat')
+            self.entry.pack(fill=X, pady=10)
 
-        self.entry = Entry(frame, font=('sans-serif', 14), borderwidth=1, relief='flat')
-        self.entry.insert(END, self.parent.program.penalization)
-        self.entry.pack(fill=X, pady=10)
-
-        btn = Button(frame, font=('sans-serif', 14, 'bold'), text="Confirm", bg="green", fg="white", pady=10, command=self.confirm)
-        btn.pack(fill=X, pady=10)
+            btn = Button(frame, font=('sans-serif', 14, 'bold'), text="Confirm", bg="green", fg="white", pady=10, command=self.confirm)
+            btn.pack(fill=X, pady=10)
 
-        frame.pack(fill=X)
+            frame.pack(fill=X)
 
-        # display window
-        self.window.mainloop()
+        # Value of the current program
+        self.entry.delete(0, END)
+        self.entry.insert(END, self.parent.program.penalization)
@@ -20,8 +20,6 @@
 import os
 from pathlib import Path
 from functools import partial
-import urllib.request
-import urllib.parse
 
 from tkinter import *
 from tkinter import messagebox
@@ -41,9 +39,14 @@ from motor.element import *
 from motor.element_type import *
 from motor.program_element import *
 from motor.skater import *
+from motor.migration import *
+from motor.live_score import *
+from motor.scoreboard import *
+from motor.rescore import *
 
 from penalty import *
 from component import *
+from apps.window import *
 
 #
 # RollartApp class
@@ -58,6 +61,9 @@ class RollartApp:
         # Create main window
         self.window = Tk()
 
+        # Dialogs are Toplevel windows of this one
+        WindowManager.setRoot(self.window)
+
         # Customizing window
         self.window.title("RollArt Unchained")
         self.window.geometry("1600x900")
@@ -73,6 +79,8 @@ class RollartApp:
         self.boxes_frame = None
         self.elements_form = None
         self.score_frame = None
+        self.score_vars = {}
+        self.score_pending = None
         self.program = None
         self.boxes = []
         self.btnsComponents = {
@@ -83,7 +91,22 @@ class RollartApp:
         }
         self.session = None
         self.category = None
-        self.componentsApps = []
+        # Component pads by component and penalty dialog, created at first use
+        self.componentsApps = {}
+        self.penaltyApp = None
+
+        # Live score messages are sent to the display server in background.
+        # Started now to send messages left in the outbox by a previous run.
+        self.liveScore = LiveScore()
+        self.liveScore.start()
+
+        # Local scoreboard server, fed with the same values as the live score
+        self.scoreboard = None
+
+        if tools.getConfig().getboolean('scoreboard', 'enabled'):
+            self.scoreboard = ScoreboardServer()
+            self.scoreboard.start()
+            self.liveScore.subscribe(self.scoreboard.update)
 
         # Check current session
         # The system is able to open only one session at a time even if the
@@ -98,6 +121,7 @@ class RollartApp:
     # start()
     # Start a program without any opened session (solo skater mode)
     # This method check if progam fields are filed and start the program if so.
+    @tools.unitOfWork
     def start(self):
 
         skater = self.skater_entry.get()
@@ -125,6 +149,7 @@ class RollartApp:
     # This method show teams score and categories list. It is possible to start category 
     # from that panel, show results for finished categories. Once a category is ended,
     # it is no more possible to add skaters.
+    @tools.unitOfWork
     def start_session(self):
 
         # Clear the root window and add a new empty frame
@@ -270,6 +295,7 @@ class RollartApp:
     # The system get the last opened program in the category or the next program of the category.
     # If we are athe the end of the program, window is cleaned and the list of categories is displayed
     # (start_session method)
+    @tools.unitOfWork
     def resume_category(self, category):
         # We can open only one category and one program at a time. It is 
         # stored in the root application object
@@ -410,6 +436,9 @@ class RollartApp:
 
             btn = Button(menu_frame, text="Skaters", font=("sans-serif", 12), bg="#dfe7e8", command=self.skater_database)
             btn.pack(pady=5, fill=X)
+
+            btn = Button(menu_frame, text="Rescore session", font=("sans-serif", 12), bg="#dfe7e8", command=self.rescore_session)
+            btn.pack(pady=5, fill=X)
         # End of session check statement
 
         # End of skaters and categories
@@ -446,10 +475,18 @@ class RollartApp:
     # which let the data operator to enter all the elements called by the technical specialist
     # and its assistant.
     # The system is also able to communicated in real time with a server all the results.
+    @tools.unitOfWork
     def open_program(self, program):
 
+        # Loaded boxes of the previous program are not needed anymore
+        if self.program is None or self.program.id != program.id:
+            ProgramElement.forgetBoxes()
+
         self.program = program
 
+        # Full computation of the program totals, they are then updated by delta
+        self.program.loadTotals()
+
         # Clear the window and create new empty frame
         if self.frame:
             self.frame.destroy()
@@ -471,6 +508,12 @@ class RollartApp:
         label_skater = Label(title_frame, text=self.program.skater+' ('+program.program_name+')', font=("sans-serif", 10), bg="#bd3800", fg="white", padx=10)
         label_skater.grid(row=0, column=2, sticky="nes")
 
+        # Live score counters (messages waiting for the server and delivery lag)
+        if self.liveScore.url:
+            label_live = Label(title_frame, text="", font=("sans-serif", 10), bg="#bd3800", fg="white", padx=10)
+            label_live.grid(row=0, column=3, sticky="nes")
+            self.live_status(label_live)
+
         Grid.rowconfigure(title_frame, 0, weight=1)
         Grid.columnconfigure(title_frame, 1, weight=1)
 
@@ -618,19 +661,29 @@ class RollartApp:
 
         # If we use session, we add team name
         if self.program.session and self.program.skater_id:
-            skater = Skater(self.program.skater_id)
+            skater = Skater.get(self.program.skater_id)
             skaterTeam = skater.team
         # End of session statement
 
-        skaterName = urllib.parse.quote_plus(self.program.skater)
-
-        url = 'https://www.raiv.fr/wintercup2020/data.php?skaterName='+skaterName+'&skaterTeam='+skaterTeam+'&liveScoreEl=-&liveScoreVal=0.0&liveScoreSk=0.0&finalScoreTechnical=0.0&finalScoreComponents=0.0&finalScoreDeduction=0.0&segmentScore=0.0&finalScore=0.0&rank=0'
-        urllib.request.urlopen(url)
+        self.liveScore.publish({
+            'skaterName': self.program.skater,
+            'skaterTeam': skaterTeam,
+            'liveScoreEl': '-',
+            'liveScoreVal': 0.0,
+            'liveScoreSk': 0.0,
+            'finalScoreTechnical': 0.0,
+            'finalScoreComponents': 0.0,
+            'finalScoreDeduction': 0.0,
+            'segmentScore': 0.0,
+            'finalScore': 0.0,
+            'rank': 0
+        }, self.program.id)
         # End of SERVER EXCHANGE
         #
 
-        # Calling program score footer
-        self.program_score()
+        # Program score footer
+        self.score_panel()
+        self.refresh_score()
 
         self.frame.pack(fill=X)
     # End of open_program()
@@ -638,76 +691,131 @@ class RollartApp:
 
     #
     # program_score()
-    # Calculate and show the current program technical score, components, penalization, total score.
+    # Ask for a refresh of the program score. Requests are merged until the application is idle,
+    # so a burst of clicks gives one calculation, one record and one redraw (see refresh_score()).
     def program_score(self):
-        
-        # Clearing the last frame
-        if self.score_frame:
-            self.score_frame.destroy()
+        if self.score_pending is None:
+            self.score_pending = self.window.after_idle(self.refresh_score)
+    # End of program_score()
 
-        self.score_frame = Frame(self.frame,  bg="#0a1526")
 
-        # Refresh program score and record
-        self.program.calculate()
-        self.program.record()
+    #
+    # score_panel()
+    # Create the score table of the program screen : technical score, components, penalization
+    # and total score. Values are StringVar updated by refresh_score().
+    def score_panel(self):
 
-        # For each type of score, show one row with label and score
-        label = Label(self.score_frame, text="Technical Score", font=("sans-serif", 12), bg="#0a1526", fg="white", borderwidth=1, relief="groove", anchor="e", justify=RIGHT, padx=10)
-        label.grid(row=0, column=0, sticky="nesw")
-        label = Label(self.score_frame, text=self.program.technical_score, font=("sans-serif", 12), bg="#0a1526", fg="white", borderwidth=1, relief="groove", anchor="w", justify=LEFT, padx=10)
-        label.grid(row=0, column=1, sticky="nesw")
+        self.score_frame = Frame(self.frame,  bg="#0a1526")
+        self.score_vars = {}
 
-        label = Label(self.score_frame, text="Components", font=("sans-serif", 12), bg="#0a1526", fg="white", borderwidth=1, anchor="e", relief="groove", padx=10)
-        label.grid(row=1, column=0, sticky="nesw")
-        label = Label(self.score_frame, text=self.program.components_score, font=("sans-serif", 12), bg="#0a1526", fg="white", borderwidth=1, anchor="w", relief="groove", padx=10)
-        label.grid(row=1, column=1, sticky="nesw")
+        # For each type of score, show one row with label and score
+        rows = [
+            ('technical_score', "Technical Score", 12),
+            ('components_score', "Components", 12),
+            ('penalization', "Penalization", 12),
+            ('score', "Score", 14)
+        ]
 
-        label = Label(self.score_frame, text="Penalization", font=("sans-serif", 12), bg="#0a1526", fg="white", borderwidth=1, anchor="e", relief="groove", padx=10)
-        label.grid(row=2, column=0, sticky="nesw")
-        label = Label(self.score_frame, text=self.program.penalization, font=("sans-serif", 12), bg="#0a1526", fg="white", borderwidth=1, anchor="w", relief="groove", padx=10)
-        label.grid(row=2, column=1, sticky="nesw")
+        for i, (field, text, size) in enumerate(rows):
+            self.score_vars[field] = StringVar(self.score_frame)
 
-        label = Label(self.score_frame, text="Score", font=("sans-serif", 14), bg="#0a1526", fg="white", borderwidth=1, anchor="e", relief="groove", padx=10)
-        label.grid(row=3, column=0, sticky="nesw")
-        label = Label(self.score_frame, text=self.program.score, font=("sans-serif", 14), bg="#0a1526", fg="white", borderwidth=1, anchor="w", relief="groove", padx=10)
-        label.grid(row=3, column=1, sticky="nesw")
+            label = Label(self.score_frame, text=text, font=("sans-serif", size), bg="#0a1526", fg="white", borderwidth=1, relief="groove", anchor="e", justify=RIGHT, padx=10)
+            label.grid(row=i, column=0, sticky="nesw")
+            label = Label(self.score_frame, textvariable=self.score_vars[field], font=("sans-serif", size), bg="#0a1526", fg="white", borderwidth=1, relief="groove", anchor="w", justify=LEFT, padx=10)
+            label.grid(row=i, column=1, sticky="nesw")
+        # End of score rows loop
 
         Grid.columnconfigure(self.score_frame, 0, weight=1)
         Grid.columnconfigure(self.score_frame, 1, minsize=300)
 
-        # End of score table
+        self.score_frame.pack(fill=X, pady=10)
+    # End of score_panel()
+
+
+    #
+    # refresh_score()
+    # Calculate and record the current program score now, then update the changed values of the
+    # score table and send the score to the live server. A refresh asked by program_score() and
+    # not done yet is cancelled.
+    @tools.unitOfWork
+    def refresh_score(self):
+
+        if self.score_pending is not None:
+            self.window.after_cancel(self.score_pending)
+            self.score_pending = None
+
+        if not self.program:
+            return
+
+        # Refresh program score and record
+        self.program.calculate()
+        self.program.record()
+
+        # Only changed labels are redrawn
+        if self.score_frame and self.score_frame.winfo_exists():
+            for field, var in self.score_vars.items():
+                text = str(getattr(self.program, field))
+
+                if var.get() != text:
+                    var.set(text)
+        # End of score table
 
         #
-        # SERVER EXCHANGE
+        # SERVER EXCHANGE
         # We send information about the current skater to a HTTP server for a realtime name and results display
         rank = 1
         teamScore = 0
         team = 'team'
         
-        # If session is opened, we get the current rank of the skater in the category and calculate
+        # If session is opened, we get the current rank of the skater in the category and calculate
         # team score
         if self.program.session:
             rank = self.program.getRank()
 
-            skater = Skater(self.program.skater_id)
+            skater = Skater.get(self.program.skater_id)
 
             teamScore = skater.getTeamScore()
             team = 'team'+skater.team
         # End of check session statement
 
-        url = 'https://www.raiv.fr/wintercup2020/data.php?liveScoreSk='+str(self.program.total_score)+'&finalScoreTechnical='+str(self.program.technical_score)+'&finalScoreComponents='+str(self.program.components_score)+'&finalScoreDeduction='+str(self.program.penalization)+'&segmentScore='+str(self.program.score)+'&finalScore='+str(self.program.total_score)+'&rank='+str(rank)+'&'+team+'='+str(teamScore)
-        urllib.request.urlopen(url)
+        self.liveScore.publish({
+            'liveScoreSk': self.program.total_score,
+            'finalScoreTechnical': self.program.technical_score,
+            'finalScoreComponents': self.program.components_score,
+            'finalScoreDeduction': self.program.penalization,
+            'segmentScore': self.program.score,
+            'finalScore': self.program.total_score,
+            'rank': rank,
+            team: teamScore
+        }, self.program.id)
 
         # End of SERVER EXCHANGE
         #
+    # End of refresh_score()
 
-        self.score_frame.pack(fill=X, pady=10)
-    # End of program_score()
+
+    #
+    # live_status(label = Label)
+    # Show live score counters and refresh them every second while the label exists.
+    def live_status(self, label):
+        if not label.winfo_exists():
+            return
+
+        stats = self.liveScore.getStats()
+
+        if stats['backlog']:
+            label.configure(text="Live: "+str(stats['backlog'])+" pending, lag "+str(stats['lag'])+"s", fg="yellow")
+        else:
+            label.configure(text="Live: lag "+str(stats['lag'])+"s", fg="white")
+
+        self.window.after(1000, partial(self.live_status, label))
+    # End of live_status()
 
 
     #
     # toggle_program_status(btn = Button)
     # Change the program status to START or STOP (depending on the previous status)
+    @tools.unitOfWork
     def toggle_program_status(self, btn):
         # If program is started, we change status to STOP and change button appearance.
         # Toggle last box to display mode or remove
@@ -754,9 +862,10 @@ class RollartApp:
     # 
     # program_fall(btn = Button)
     # Add a fall, increment the button, apply penalty
+    @tools.unitOfWork
     def program_fall(self, btn):
         self.program.fall += 1
-        self.program.penalization -= 1
+        self.program.penalization += FALL_PENALTY
         self.program.record()
 
         self.program_score()
@@ -768,17 +877,20 @@ class RollartApp:
     # program_penalty()
     # Open penalty dialog box
     def program_penalty(self):
-        penaltyApp = PenaltyApp(self)
-        penaltyApp.open_window()
+        if self.penaltyApp is None:
+            self.penaltyApp = PenaltyApp(self)
+
+        self.penaltyApp.open_window()
     # End of program_penalty()
 
     # 
     # program_component(component = String)
-    # Open component dialog box
+    # Open component dialog box (the pad of a component is created once and then reused)
     def program_component(self, component):
-        componentApp = ComponentApp(component, self)
-        self.componentsApps.append(componentApp)
-        componentApp.open_window()
+        if not component in self.componentsApps:
+            self.componentsApps[component] = ComponentApp(component, self)
+
+        self.componentsApps[component].open_window()
     # End of program_component()
 
 
@@ -799,19 +911,31 @@ class RollartApp:
     # End of program_component_value()
 
 
+    #
+    # rescore_session()
+    # Compute again all elements, programs and skaters scores of the current session with
+    # the current elements database (after a correction of an element value)
+    def rescore_session(self):
+        MsgBox = messagebox.askquestion('Rescore session', 'Compute again all scores of the session with the current elements database ?', icon = 'warning')
+
+        if MsgBox == 'yes':
+            rescore = Rescore(self.session.id)
+            rescore.run()
+
+            stats = rescore.getStats()
+
+            messagebox.showinfo(title="Rescore session", message="%d elements, %d programs and %d skaters updated" %
+                (stats['changed_elements'], stats['changed_programs'], stats['changed_skaters']))
+    # End of rescore_session()
+
+
     #
     # skater_database()
     # Edit skaters list for the current session
     def skater_database(self):
 
-        # Create main window
-        window = Tk()
-
-        # Customizing window
-        window.title("Skaters - RollArt BV")
-        window.geometry("1280x720")
-        window.minsize(1280,720)
-        window.config(background="#0a1526")
+        # Dialog of the main window
+        window, build = WindowManager.open('skaters', "Skaters - RollArt BV", "1280x720", (1280,720))
 
         # Categories frame
         frame = Frame(window, bg="")
@@ -831,8 +955,6 @@ class RollartApp:
         # End of categories loop
 
         frame.pack(fill=X)
-
-        window.mainloop()
     # End of skater_database()
 
 
@@ -841,8 +963,13 @@ class RollartApp:
     # Method called when data operator click on Next skater
     # This method control if all mandatories values on the current program are set before confirmation of the
     # program. If not, an alert is raised.
+    @tools.unitOfWork
     def confirm_skater(self):
 
+        # Score asked by the last clicks and not calculated yet
+        if self.score_pending is not None:
+            self.refresh_score()
+
         # Program status has to be "STOP"
         if self.program.status.upper() == 'STOP':
             
@@ -851,7 +978,12 @@ class RollartApp:
 
                 self.close_components_windows()
 
-                skater = Skater(self.program.skater_id)
+                # Check running totals against database before confirming the score
+                if not self.program.checkTotals():
+                    print("Program totals reloaded from database")
+                    self.refresh_score()
+
+                skater = Skater.get(self.program.skater_id)
 
                 if self.program.program_name.upper() == 'SHORT':
                     status = 'shortend'
@@ -865,6 +997,7 @@ class RollartApp:
                 skater.record()
 
                 self.resume_category(self.category)
+                self.schedule_checkpoint()
 
             else:
                 messagebox.showwarning(title="Can't confirm", message="Asign components values before confirm")
@@ -881,13 +1014,23 @@ class RollartApp:
     # skip_skater()
     # Like confirm_skater, this method go to the next skater in the category but without any
     # control on the values. Program can be empty or not to be skiped.
+    @tools.unitOfWork
     def skip_skater(self):
 
+        # Score asked by the last clicks and not calculated yet
+        if self.score_pending is not None:
+            self.refresh_score()
+
         if self.program.status.upper() == 'STOP':
 
             self.close_components_windows()
+
+            # Check running totals against database before keeping the score
+            if not self.program.checkTotals():
+                print("Program totals reloaded from database")
+                self.refresh_score()
             
-            skater = Skater(self.program.skater_id)
+            skater = Skater.get(self.program.skater_id)
 
             if self.program.program_name.upper() == 'SHORT':
                 status = 'shortend'
@@ -901,21 +1044,29 @@ class RollartApp:
             skater.record()
 
             self.resume_category(self.category)
+            self.schedule_checkpoint()
 
         else:
             messagebox.showwarning(title="Can't skip", message="Stop program before skip")
     # End of skip_skater()
 
 
+    #
+    # schedule_checkpoint()
+    # Write the database journal (WAL) to the database file once the next skater screen is
+    # displayed, while the data operator waits for the next program
+    def schedule_checkpoint(self):
+        self.window.after_idle(tools.checkpoint)
+    # End of schedule_checkpoint()
+
+
     #
     # close_components_windows()
-    # Close all components windows and reset componentsApp before going to the next skater
+    # Hide all components windows before going to the next skater
     def close_components_windows(self):
-        for app in self.componentsApps:
+        for app in self.componentsApps.values():
             if not app.closed:
                 app.close_window()
-
-        self.componentsApps = []
     # End of close_components_windows()
 
 
@@ -930,14 +1081,8 @@ class RollartApp:
     # Matric of long program with short program on the category
     # | Rank | Skater | Tech. score | Components | Deduction | Program | Total |
     def results(self, category, programType):
-        # Create main window
-        window = Tk()
-
-        # Customizing window
-        window.title("Results - "+category.name+" - "+programType+" - RollArt BV")
-        window.geometry("1600x720")
-        window.minsize(1600,720)
-        window.config(background="#0a1526")
+        # Results window of the category and program, built again with the current results
+        window, build = WindowManager.open('results_'+str(category.id)+'_'+programType, "Results - "+category.name+" - "+programType+" - RollArt BV", "1600x720", (1600,720))
 
         # List frame
         frame = Frame(window, bg="")
@@ -1029,9 +1174,6 @@ class RollartApp:
 
         frame.pack(fill=X)
         # End of list frame
-            
-
-        window.mainloop()
     # End of results()
 
 
@@ -1053,7 +1195,10 @@ class BoxElement():
         self.mode = 'display'
         self.btnEdit = None
         self.btnDel = None
+        self.rows = {}
+        self.pads = {}
 
+    @tools.unitOfWork
     def wrapper(self, mode='auto'):
 
         if self.frame:
@@ -1095,6 +1240,9 @@ class BoxElement():
         if self.frame_content:
             self.frame_content.destroy()
 
+        # Entry pads of the destroyed form
+        self.pads = {}
+
         self.frame_content = Frame(self.frame, bg="#0a1526")
 
         frame_types = Frame(self.frame_content, bg="#0a1526")
@@ -1157,94 +1305,142 @@ class BoxElement():
         if self.frame_content:
             self.frame_content.destroy()
 
+        self.pads = {}
+
         self.frame_content = Frame(self.frame, bg="#0a1526")
 
+        # Widgets of each element row by element id, updated in place by updateRow()
+        self.rows = {}
+
         elements = self.box.getElements()
 
         i = 0
 
         for element in elements:
-            element_frame = Frame(self.frame_content, bg="#0a1526")
+            self.rows[element.id] = self.elementRow(element, i)
 
-            label = Label(element_frame, text=element.type, font=("sans-serif", 12), bg="#0a1526", fg="white")
-            label.grid(row=i, column=0, sticky="w", padx=10)
+            i += 1
 
-            action = partial(self.star, element)
+        self.btnEdit.configure(bg="#dfe7e8")
+        self.frame_content.grid(row=self.box.order-1, column=2, sticky="nsew")
 
-            btn = Button(element_frame, text="*", font=("sans-serif", 11), command=action)
+    # Create the widgets of an element row, their values are set by updateRow()
+    def elementRow(self, element, i):
 
-            if element.star:
-                btn.configure(bg='yellow', fg='red')
-            btn.grid(row=i, column=1, sticky="nsew")
+        row = {}
 
-            action = partial(self.time, element)
+        element_frame = Frame(self.frame_content, bg="#0a1526")
 
-            btn = Button(element_frame, text="T", font=("sans-serif", 11), command=action)
+        label = Label(element_frame, text=element.type, font=("sans-serif", 12), bg="#0a1526", fg="white")
+        label.grid(row=i, column=0, sticky="w", padx=10)
 
-            if element.time:
-                btn.configure(bg='yellow', fg='red')
-            btn.grid(row=i, column=2, sticky="nsew")
+        action = partial(self.star, element)
 
-            base_code = ''
-            if element.value_label.lower() != 'base':
-                base_code = element.value_label
+        row['star'] = Button(element_frame, text="*", font=("sans-serif", 11), command=action)
+        row['star'].grid(row=i, column=1, sticky="nsew")
 
-            if element.bonus != '':
-                base_code += '('+element.bonus+')'
+        action = partial(self.time, element)
 
-            label = Label(element_frame, text=element.code+base_code, font=("sans-serif", 12), bg="#0a1526", fg="white")
-            label.grid(row=i, column=3, sticky="w", padx=10)
+        row['time'] = Button(element_frame, text="T", font=("sans-serif", 11), command=action)
+        row['time'].grid(row=i, column=2, sticky="nsew")
 
-            if not element.star and element.base_value > 0:
+        # Colors of a star or time button which is not selected
+        row['colors'] = (row['star'].cget('bg'), row['star'].cget('fg'))
 
-                qoes = [-3, -2, -1, 0, 1, 2, 3]
-                j = 1
+        row['code'] = Label(element_frame, font=("sans-serif", 12), bg="#0a1526", fg="white")
+        row['code'].grid(row=i, column=3, sticky="w", padx=10)
 
-                for qoe in qoes:
-                    label = '+'+str(qoe) if qoe > 0 else str(qoe)
-                    
-                    if (int(qoe) == int(element.qoe)):
-                        if qoe > 0:
-                            color = "PaleGreen1"
+        row['qoes'] = []
 
-                        elif qoe < 0:
-                            color = "salmon"
+        qoes = [-3, -2, -1, 0, 1, 2, 3]
+        j = 1
 
-                        else:
-                            color = "DarkSlategray1"
-                    
-                    else:
-                        color = "#dfe7e8"
-                    
-                    action = partial(self.setQoe, element, qoe)
+        for qoe in qoes:
+            label = '+'+str(qoe) if qoe > 0 else str(qoe)
 
-                    btn = Button(element_frame, text=label, font=("sans-serif", 11), bg=color, command=action)
-                    btn.grid(row=i, column=3+j, sticky="nsew")
-                    j += 1
+            action = partial(self.setQoe, element, qoe)
 
-            label = Label(element_frame, text=element.stared_value, font=("sans-serif", 12), bg="#0a1526", fg="white")
-            label.grid(row=i, column=11, sticky="w", padx=10)
+            btn = Button(element_frame, text=label, font=("sans-serif", 11), command=action)
+            btn.grid(row=i, column=3+j, sticky="nsew")
 
-            Grid.columnconfigure(element_frame, 0, weight=1)
-            Grid.columnconfigure(element_frame, 1)
-            Grid.columnconfigure(element_frame, 2)
-            Grid.columnconfigure(element_frame, 3, minsize=300)
+            row['qoes'].append((qoe, btn))
+            j += 1
 
-            j = 0
+        row['value'] = Label(element_frame, font=("sans-serif", 12), bg="#0a1526", fg="white")
+        row['value'].grid(row=i, column=11, sticky="w", padx=10)
 
-            while j < 7:
-                Grid.columnconfigure(element_frame, 4+j, minsize=90)
-                j += 1
+        Grid.columnconfigure(element_frame, 0, weight=1)
+        Grid.columnconfigure(element_frame, 1)
+        Grid.columnconfigure(element_frame, 2)
+        Grid.columnconfigure(element_frame, 3, minsize=300)
 
-            Grid.columnconfigure(element_frame, 11, minsize=150)
+        j = 0
 
-            element_frame.pack(fill=X)
+        while j < 7:
+            Grid.columnconfigure(element_frame, 4+j, minsize=90)
+            j += 1
 
-            i += 1
+        Grid.columnconfigure(element_frame, 11, minsize=150)
 
-        self.btnEdit.configure(bg="#dfe7e8")
-        self.frame_content.grid(row=self.box.order-1, column=2, sticky="nsew")
+        element_frame.pack(fill=X)
+
+        self.updateRow(element, row)
+
+        return row
+
+    # Update the row of an element in place : star, time and QOE buttons colors, code and value
+    def updateRow(self, element, row=None):
+
+        if row is None:
+            row = self.rows.get(element.id)
 
+        # Element not displayed in this box
+        if row is None:
+            self.display()
+            return
+
+        for btn, selected in ((row['star'], element.star), (row['time'], element.time)):
+            if selected:
+                btn.configure(bg='yellow', fg='red')
+            else:
+                btn.configure(bg=row['colors'][0], fg=row['colors'][1])
+
+        base_code = ''
+        if element.value_label.lower() != 'base':
+            base_code = element.value_label
+
+        if element.bonus != '':
+            base_code += '('+element.bonus+')'
+
+        row['code'].configure(text=element.code+base_code)
+
+        # QOE buttons are hidden for a stared element or an element without value
+        for qoe, btn in row['qoes']:
+
+            if not element.star and element.base_value > 0:
+
+                if (int(qoe) == int(element.qoe)):
+                    if qoe > 0:
+                        color = "PaleGreen1"
+
+                    elif qoe < 0:
+                        color = "salmon"
+
+                    else:
+                        color = "DarkSlategray1"
+
+                else:
+                    color = "#dfe7e8"
+
+                btn.configure(bg=color)
+                btn.grid()
+
+            else:
+                btn.grid_remove()
+
+        row['value'].configure(text=element.stared_value)
+
+    @tools.unitOfWork
     def toggleMode(self):
 
         elements = self.box.getElements()
@@ -1256,16 +1452,19 @@ class BoxElement():
         elif self.mode == 'display':
             self.form()
 
+    @tools.unitOfWork
     def empty(self):
         self.box.empty()
         self.form()
 
+    @tools.unitOfWork
     def remove(self):
         program_id = self.box.program
         self.box.delete()
         program = Program(program_id)
         self.parent.open_program(program)
 
+    @tools.unitOfWork
     def check(self, force=False):
         
         elements = self.box.getElements()
@@ -1275,6 +1474,10 @@ class BoxElement():
             if len(elements) > 1 and (self.box.type == 'SoloJump' or self.box.type == 'SoloSpin' or self.box.type == 'Choreo' or self.box.type == 'Step'):
                 lastAdded = elements[-1]
                 self.box.empty()
+
+                # Row deleted by empty() and its value removed from the program total :
+                # the element is recorded again as a new row
+                lastAdded.recorded = None
                 lastAdded.record()
 
             self.display()
@@ -1299,12 +1502,15 @@ class BoxElement():
             if lastAdded.value_label.upper() != 'BASE':
                 label = lastAdded.value_label
             
-            code = urllib.parse.quote_plus(lastAdded.code+label)
             self.parent.program.calculate()
 
-            url = 'https://www.raiv.fr/wintercup2020/data.php?liveScoreEl='+code+'&liveScoreVal='+str(lastAdded.base_value)+'&liveScoreSk='+str(self.parent.program.total_score)
-            urllib.request.urlopen(url)
+            self.parent.liveScore.publish({
+                'liveScoreEl': lastAdded.code+label,
+                'liveScoreVal': lastAdded.base_value,
+                'liveScoreSk': self.parent.program.total_score
+            }, self.parent.program.id)
 
+    @tools.unitOfWork
     def star(self, element):
         if element.star:
             element.star = 0
@@ -1314,9 +1520,10 @@ class BoxElement():
         element.calculate()
         element.record()
         
-        self.display()
+        self.updateRow(element)
         self.parent.program_score()
 
+    @tools.unitOfWork
     def time(self, element):
         if element.time:
             element.time = 0
@@ -1326,16 +1533,18 @@ class BoxElement():
         element.calculate()
         element.record()
         
-        self.display()
+        self.updateRow(element)
         self.parent.program_score()
 
+    @tools.unitOfWork
     def setQoe(self, element, qoe):
         element.qoe = qoe
         element.calculate()
         element.record()
-        self.display()
+        self.updateRow(element)
         self.parent.program_score()
 
+    @tools.unitOfWork
     def element_form(self, typeCode, frame):
 
         # Check button
@@ -1348,10 +1557,15 @@ class BoxElement():
                 btn.configure(bg="#dfe7e8")
                 btn.configure(activebackground="#dfe7e8")
 
-        ws = frame.winfo_children()
+        # Labels of the recorded elements are created again, entry pads are only hidden
+        pads = [pad.frame for pad in self.pads.values()]
 
-        for w in ws:
-            w.destroy()
+        for w in frame.winfo_children():
+            if not w in pads:
+                w.destroy()
+
+        for pad in self.pads.values():
+            pad.hide()
 
         # Empty the box if type has change
         if self.box.type != typeCode:
@@ -1366,25 +1580,38 @@ class BoxElement():
             'type': self.box.type
         }))
 
-        for element in elements:
-            if (typeCode == 'SoloJump' or typeCode == 'ComboJump'):
-                comp = JumpElement(element, frame, self)
-
-            elif (typeCode == 'SoloSpin' or typeCode == 'ComboSpin'):
-                comp = SpinElement(element, frame, self)
+        comp = self.getPad(typeCode, frame)
 
-            elif (typeCode == 'Step'):
-                comp = StepElement(element, frame, self)
+        for element in elements:
+            comp.element = element
 
-            elif (typeCode == 'Choreo'):
-                comp = ChoreoElement(element, frame, self)
-                
             if element.id:
                 comp.display()
             
             else:
                 comp.form()
-    
+
+    # Entry pad of an element type. A pad is created once for the form and then reused for
+    # each element of the type, its buttons are only reset.
+    def getPad(self, typeCode, frame):
+
+        if (typeCode == 'SoloJump' or typeCode == 'ComboJump'):
+            padClass = JumpElement
+
+        elif (typeCode == 'SoloSpin' or typeCode == 'ComboSpin'):
+            padClass = SpinElement
+
+        elif (typeCode == 'Step'):
+            padClass = StepElement
+
+        elif (typeCode == 'Choreo'):
+            padClass = ChoreoElement
+
+        if not padClass in self.pads:
+            self.pads[padClass] = padClass(None, frame, self)
+
+        return self.pads[padClass]
+
 
 # Add a jump element
 class JumpElement():
@@ -1443,6 +1670,7 @@ class JumpElement():
         self.bas = bas
         self.check()
 
+    @tools.unitOfWork
     def check(self):
 
         if (self.rot == 'NJ' or (self.rot and self.jum and self.bas)):
@@ -1464,101 +1692,118 @@ class JumpElement():
 
             self.display()
 
+            # Next jump of the combo in the same pad
             if not prev_id and self.element.type == 'ComboJump':
-                comp = JumpElement(ProgramElement({
+                self.element = ProgramElement({
                     'box': self.element.box,
                     'program': self.element.program,
                     'type': self.element.type
-                }), self.root, self.parent)
-                comp.form()
+                })
+                self.form()
 
             self.parent.check()
 
+    # Show the pad for self.element. Buttons are created at the first call, then only reset.
     def form(self):
 
-        if self.frame:
-            self.frame.destroy()
+        if self.frame is None:
+            self.frame = Frame(self.root, bg="#0a1526")
 
-        self.frame = Frame(self.root, bg="#0a1526")
+            # Number of rotation
+            btns = ['NJ', 1, 2, 3, 4]
 
-        # Number of rotation
-        btns = ['NJ', 1, 2, 3, 4]
+            frame_rotation = Frame(self.frame, bg="#0a1526")
 
-        frame_rotation = Frame(self.frame, bg="#0a1526")
+            #Grid.rowconfigure(frame_rotation, 0, weight=1)
 
-        #Grid.rowconfigure(frame_rotation, 0, weight=1)
+            i = 0
 
-        i = 0
-
-        for btnLabel in btns:
-            self.btnsRot.append(Button(frame_rotation, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
-            self.btnsRot[i].config(command=lambda val=btnLabel: self.setRot(val))
-            self.btnsRot[i].grid(row=0, column=i, sticky="nsew", ipadx=8, ipady=8)
+            for btnLabel in btns:
+                self.btnsRot.append(Button(frame_rotation, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
+                self.btnsRot[i].config(command=lambda val=btnLabel: self.setRot(val))
+                self.btnsRot[i].grid(row=0, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            Grid.columnconfigure(frame_rotation, i, weight=1)
+                Grid.columnconfigure(frame_rotation, i, weight=1)
 
-            i += 1
+                i += 1
 
-        frame_rotation.pack()
+            frame_rotation.pack()
 
 
-        # Jump
-        btns = ['W', 'T', 'S', 'F', 'Lz', 'Lo', 'Th', 'A']
+            # Jump
+            btns = ['W', 'T', 'S', 'F', 'Lz', 'Lo', 'Th', 'A']
         
-        frame_jump = Frame(self.frame, bg="#0a1526")
+            frame_jump = Frame(self.frame, bg="#0a1526")
 
-        #Grid.rowconfigure(frame_jump, 1, weight=1)
+            #Grid.rowconfigure(frame_jump, 1, weight=1)
 
-        i = 0
+            i = 0
 
-        for btnLabel in btns:
-            self.btnsJum.append(Button(frame_jump, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
-            self.btnsJum[i].config(command=lambda val=btnLabel: self.setJum(val))
-            self.btnsJum[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
+            for btnLabel in btns:
+                self.btnsJum.append(Button(frame_jump, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
+                self.btnsJum[i].config(command=lambda val=btnLabel: self.setJum(val))
+                self.btnsJum[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            Grid.columnconfigure(frame_jump, i, weight=1)
+                Grid.columnconfigure(frame_jump, i, weight=1)
 
-            i += 1
+                i += 1
 
-        frame_jump.pack()
+            frame_jump.pack()
 
 
-        # Base value
-        btns = ['Base', '<', '<<', '<<<']
+            # Base value
+            btns = ['Base', '<', '<<', '<<<']
         
-        frame_base = Frame(self.frame, bg="#0a1526")
+            frame_base = Frame(self.frame, bg="#0a1526")
 
-        i = 0
+            i = 0
 
-        #Grid.rowconfigure(frame_base, 2, weight=1)
+            #Grid.rowconfigure(frame_base, 2, weight=1)
 
-        for btnLabel in btns:
-            self.btnsBas.append(Button(frame_base, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
-            self.btnsBas[i].config(command=lambda val=btnLabel: self.setBas(val))
-            self.btnsBas[i].grid(row=2, column=i, sticky="nsew", ipadx=8, ipady=8)
+            for btnLabel in btns:
+                self.btnsBas.append(Button(frame_base, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
+                self.btnsBas[i].config(command=lambda val=btnLabel: self.setBas(val))
+                self.btnsBas[i].grid(row=2, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            Grid.columnconfigure(frame_base, i, weight=1)
+                Grid.columnconfigure(frame_base, i, weight=1)
 
-            i += 1
+                i += 1
 
-        frame_base.pack()
+            frame_base.pack()
+
+        self.reset()
 
         self.frame.pack()
 
-    def display(self):
+    # Clear the selection of the pad
+    def reset(self):
+        self.rot = None
+        self.jum = None
+        self.bas = None
+
+        for btn in self.btnsRot + self.btnsJum + self.btnsBas:
+            btn.configure(bg="#dfe7e8")
+            btn.configure(activebackground="#dfe7e8")
+
+    # Hide the pad, it is kept for the next element
+    def hide(self):
         if self.frame:
-            self.frame.destroy()
+            self.frame.pack_forget()
 
-        self.frame = Frame(self.root, bg="#0a1526")
+    # Show the recorded element in place of the pad
+    def display(self):
+        self.hide()
+
+        frame = Frame(self.root, bg="#0a1526")
 
         base_code = ''
         if self.element.value_label.lower() != 'base':
             base_code = self.element.value_label
 
-        label = Label(self.frame, text=self.element.code+base_code+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
+        label = Label(frame, text=self.element.code+base_code+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
         label.pack(side=LEFT)
 
-        self.frame.pack()
+        frame.pack()
 
 
 # Add a jump element
@@ -1612,6 +1857,7 @@ class SpinElement():
 
         self.check()
 
+    @tools.unitOfWork
     def check(self, force=False):
 
         if (self.spi == 'NC' or (self.spi and force)):
@@ -1625,95 +1871,119 @@ class SpinElement():
             else:
                 self.element.code = self.spi
                 self.element.read()
-                self.element.bonus = ','.join(self.bon)
+                self.element.bonus_mask = BonusRules.toMask(self.bon)
             
             self.element.calculate()
             self.element.record()
 
             self.display()
 
+            # Next spin of the combo in the same pad
             if not prev_id and self.element.type == 'ComboSpin':
-                comp = SpinElement(ProgramElement({
+                self.element = ProgramElement({
                     'box': self.element.box,
                     'program': self.element.program,
                     'type': self.element.type
-                }), self.root, self.parent)
-                comp.form()
+                })
+                self.form()
 
             self.parent.check()
 
+    # Show the pad for self.element. Buttons are created at the first call, then only reset.
     def form(self):
 
-        if self.frame:
-            self.frame.destroy()
-
-        self.frame = Frame(self.root, bg="#0a1526")
+        if self.frame is None:
+            self.frame = Frame(self.root, bg="#0a1526")
 
-        # Spin
-        btns = ['NC', 'U', 'S', 'C', 'Br', 'H', 'In']
+            # Spin
+            btns = ['NC', 'U', 'S', 'C', 'Br', 'H', 'In']
         
-        frame_spin = Frame(self.frame, bg="#0a1526")
-
-        i = 0
+            frame_spin = Frame(self.frame, bg="#0a1526")
 
-        for btnLabel in btns:
-            self.btnsSpi.append(Button(frame_spin, text=btnLabel, font=("sans-serif", 11)))
+            i = 0
 
-            if btnLabel == 'NC':
-                self.btnsSpi[i].config(bg="red", fg="white")
+            for btnLabel in btns:
+                self.btnsSpi.append(Button(frame_spin, text=btnLabel, font=("sans-serif", 11)))
 
-            else:
-                self.btnsSpi[i].config(bg="#dfe7e8")
+                if btnLabel == 'NC':
+                    self.btnsSpi[i].config(bg="red", fg="white")
 
-            self.btnsSpi[i].config(command=lambda val=btnLabel: self.setSpi(val))
-            self.btnsSpi[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
+                else:
+                    self.btnsSpi[i].config(bg="#dfe7e8")
 
-            Grid.columnconfigure(frame_spin, i, weight=1)
+                self.btnsSpi[i].config(command=lambda val=btnLabel: self.setSpi(val))
+                self.btnsSpi[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            i += 1
+                Grid.columnconfigure(frame_spin, i, weight=1)
 
-        frame_spin.pack()
+                i += 1
 
+            frame_spin.pack()
 
-        # Bonus
-        btns = ['Fw', 'Sw', 'Bh', 'Ly', 'Biel', 'T', 'LO', 'Bry', 'DE', '6R', '4R', 'H']
 
-        if (self.element.type == 'ComboSpin'):
-            btns.append('SBC')
-            btns.append('DCH')
-            btns.append('BD')
+            # Bonus, the combo spin bonuses are only shown for combo spins (see reset())
+            btns = ['Fw', 'Sw', 'Bh', 'Ly', 'Biel', 'T', 'LO', 'Bry', 'DE', '6R', '4R', 'H', 'SBC', 'DCH', 'BD']
         
-        frame_bonus = Frame(self.frame, bg="#0a1526")
+            frame_bonus = Frame(self.frame, bg="#0a1526")
 
-        i = 0
+            i = 0
 
-        for btnLabel in btns:
-            self.btnsBon.append(Button(frame_bonus, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
-            self.btnsBon[i].config(command=lambda val=btnLabel: self.setBon(val))
-            self.btnsBon[i].grid(row=2, column=i, sticky="nsew", ipadx=8, ipady=8)
+            for btnLabel in btns:
+                self.btnsBon.append(Button(frame_bonus, text=btnLabel, font=("sans-serif", 11), bg="#dfe7e8"))
+                self.btnsBon[i].config(command=lambda val=btnLabel: self.setBon(val))
+                self.btnsBon[i].grid(row=2, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            Grid.columnconfigure(frame_bonus, i, weight=1)
+                Grid.columnconfigure(frame_bonus, i, weight=1)
 
-            i += 1
+                i += 1
+
+            frame_bonus.pack()
 
-        frame_bonus.pack()
+            btn = Button(self.frame, text="Confirmed", font=("sans-serif", 11), bg="green", fg="white")
+            btn.config(command=lambda val=True: self.check(val))
+            btn.pack(fill=X, ipadx=8, ipady=8)
 
-        btn = Button(self.frame, text="Confirmed", font=("sans-serif", 11), bg="green", fg="white")
-        btn.config(command=lambda val=True: self.check(val))
-        btn.pack(fill=X, ipadx=8, ipady=8)
+        self.reset()
 
         self.frame.pack()
 
-    def display(self):
+    # Clear the selection of the pad, show the bonuses of the element type
+    def reset(self):
+        self.spi = None
+        self.bon = []
+
+        for btn in self.btnsSpi:
+            if btn['text'] == 'NC':
+                btn.configure(bg="red", fg="white")
+            else:
+                btn.configure(bg="#dfe7e8", fg="black")
+
+            btn.configure(activebackground="#dfe7e8")
+
+        for btn in self.btnsBon:
+            btn.configure(bg="#dfe7e8")
+            btn.configure(activebackground="#dfe7e8")
+
+            if btn['text'] in ('SBC', 'DCH', 'BD') and self.element.type != 'ComboSpin':
+                btn.grid_remove()
+            else:
+                btn.grid()
+
+    # Hide the pad, it is kept for the next element
+    def hide(self):
         if self.frame:
-            self.frame.destroy()
+            self.frame.pack_forget()
 
-        self.frame = Frame(self.root, bg="#0a1526")
+    # Show the recorded element in place of the pad
+    def display(self):
+        self.hide()
+
+        frame = Frame(self.root, bg="#0a1526")
 
-        label = Label(self.frame, text=self.element.code+' '+self.element.bonus+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
+        label = Label(frame, text=self.element.code+' '+self.element.bonus+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
         label.pack(side=LEFT)
 
-        self.frame.pack()
+        frame.pack()
 
 # Add a step element
 class StepElement():
@@ -1745,6 +2015,7 @@ class StepElement():
         self.bas = bas
         self.check()
 
+    @tools.unitOfWork
     def check(self):
 
         if (self.bas):
@@ -1757,50 +2028,68 @@ class StepElement():
 
             self.parent.check()
 
+    # Show the pad for self.element. Buttons are created at the first call, then only reset.
     def form(self):
 
-        if self.frame:
-            self.frame.destroy()
-
-        self.frame = Frame(self.root, bg="#0a1526")
+        if self.frame is None:
+            self.frame = Frame(self.root, bg="#0a1526")
 
-        # Base value
-        btns = ['NSt', 'StB', 'St1', 'St2', 'St3', 'St4']
+            # Base value
+            btns = ['NSt', 'StB', 'St1', 'St2', 'St3', 'St4']
         
-        frame_step = Frame(self.frame, bg="#0a1526")
+            frame_step = Frame(self.frame, bg="#0a1526")
 
-        i = 0
+            i = 0
 
-        for btnLabel in btns:
-            self.btnsBas.append(Button(frame_step, text=btnLabel, font=("sans-serif", 11)))
+            for btnLabel in btns:
+                self.btnsBas.append(Button(frame_step, text=btnLabel, font=("sans-serif", 11)))
 
-            if btnLabel == 'NSt':
-                self.btnsBas[i].config(bg="red", fg="white")
+                if btnLabel == 'NSt':
+                    self.btnsBas[i].config(bg="red", fg="white")
 
-            else:
-                self.btnsBas[i].config(bg="#dfe7e8")
+                else:
+                    self.btnsBas[i].config(bg="#dfe7e8")
 
-            self.btnsBas[i].config(command=lambda val=btnLabel: self.setBas(val))
-            self.btnsBas[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
+                self.btnsBas[i].config(command=lambda val=btnLabel: self.setBas(val))
+                self.btnsBas[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            Grid.columnconfigure(frame_step, i, weight=1)
+                Grid.columnconfigure(frame_step, i, weight=1)
 
-            i += 1
+                i += 1
+
+            frame_step.pack()
 
-        frame_step.pack()
+        self.reset()
 
         self.frame.pack()
 
-    def display(self):
+    # Clear the selection of the pad
+    def reset(self):
+        self.bas = None
+
+        for btn in self.btnsBas:
+            if btn['text'] == 'NSt':
+                btn.configure(bg="red", fg="white")
+            else:
+                btn.configure(bg="#dfe7e8", fg="black")
+
+            btn.configure(activebackground="#dfe7e8")
+
+    # Hide the pad, it is kept for the next element
+    def hide(self):
         if self.frame:
-            self.frame.destroy()
+            self.frame.pack_forget()
 
-        self.frame = Frame(self.root, bg="#0a1526")
+    # Show the recorded element in place of the pad
+    def display(self):
+        self.hide()
+
+        frame = Frame(self.root, bg="#0a1526")
 
-        label = Label(self.frame, text=self.element.code+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
+        label = Label(frame, text=self.element.code+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
         label.pack(side=LEFT)
 
-        self.frame.pack()
+        frame.pack()
 
 
 # Add a choreo element
@@ -1833,6 +2122,7 @@ class ChoreoElement():
         self.bas = bas
         self.check()
 
+    @tools.unitOfWork
     def check(self):
 
         if (self.bas):
@@ -1845,50 +2135,68 @@ class ChoreoElement():
 
             self.parent.check()
 
+    # Show the pad for self.element. Buttons are created at the first call, then only reset.
     def form(self):
 
-        if self.frame:
-            self.frame.destroy()
-
-        self.frame = Frame(self.root, bg="#0a1526")
+        if self.frame is None:
+            self.frame = Frame(self.root, bg="#0a1526")
 
-        # Base value
-        btns = ['NChSt', 'ChSt']
+            # Base value
+            btns = ['NChSt', 'ChSt']
         
-        frame_step = Frame(self.frame, bg="#0a1526")
+            frame_step = Frame(self.frame, bg="#0a1526")
 
-        i = 0
+            i = 0
 
-        for btnLabel in btns:
-            self.btnsBas.append(Button(frame_step, text=btnLabel, font=("sans-serif", 11)))
+            for btnLabel in btns:
+                self.btnsBas.append(Button(frame_step, text=btnLabel, font=("sans-serif", 11)))
 
-            if btnLabel == 'NChSt':
-                self.btnsBas[i].config(bg="red", fg="white")
+                if btnLabel == 'NChSt':
+                    self.btnsBas[i].config(bg="red", fg="white")
 
-            else:
-                self.btnsBas[i].config(bg="#dfe7e8")
+                else:
+                    self.btnsBas[i].config(bg="#dfe7e8")
 
-            self.btnsBas[i].config(command=lambda val=btnLabel: self.setBas(val))
-            self.btnsBas[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
+                self.btnsBas[i].config(command=lambda val=btnLabel: self.setBas(val))
+                self.btnsBas[i].grid(row=1, column=i, sticky="nsew", ipadx=8, ipady=8)
 
-            Grid.columnconfigure(frame_step, i, weight=1)
+                Grid.columnconfigure(frame_step, i, weight=1)
 
-            i += 1
+                i += 1
 
-        frame_step.pack()
+            frame_step.pack()
+
+        self.reset()
 
         self.frame.pack()
 
-    def display(self):
+    # Clear the selection of the pad
+    def reset(self):
+        self.bas = None
+
+        for btn in self.btnsBas:
+            if btn['text'] == 'NChSt':
+                btn.configure(bg="red", fg="white")
+            else:
+                btn.configure(bg="#dfe7e8", fg="black")
+
+            btn.configure(activebackground="#dfe7e8")
+
+    # Hide the pad, it is kept for the next element
+    def hide(self):
         if self.frame:
-            self.frame.destroy()
+            self.frame.pack_forget()
 
-        self.frame = Frame(self.root, bg="#0a1526")
+    # Show the recorded element in place of the pad
+    def display(self):
+        self.hide()
+
+        frame = Frame(self.root, bg="#0a1526")
 
-        label = Label(self.frame, text=self.element.code+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
+        label = Label(frame, text=self.element.code+' ('+self.element.label+')', font=("sans-serif", 12), bg="#0a1526", fg="white", justify=LEFT)
         label.pack(side=LEFT)
 
-        self.frame.pack()
+        frame.pack()
 
 if __name__ == "__main__":
 
@@ -1898,17 +2206,19 @@ if __name__ == "__main__":
         os.makedirs(home_path+'/.rollartBV')
 
 
-    # Check database integrity before start
-    Category.database_integrity()
-    ElementType.database_integrity()
-    Element.database_integrity()
-    Program.database_integrity()
-    ProgramElement.database_integrity()
-    ProgramBox.database_integrity()
-    Session.database_integrity()
-    Skater.database_integrity()
+    # Check database integrity before start (skipped if database version is current)
+    Migration.database_integrity()
+
+    # Compile spin and step bonus rules
+    BonusRules.load()
 
     # Load the app
     rollart = RollartApp()
     rollart.home()
     rollart.window.mainloop()
+
+    # Send pending live score messages before leaving
+    rollart.liveScore.stop()
+
+    if rollart.scoreboard:
+        rollart.scoreboard.stop()
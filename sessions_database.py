@@ -22,6 +22,7 @@ from tkinter import *
 from motor.session import *
 from apps.list import *
 import tools
+from apps.window import *
 
 class SessionApp:
 
@@ -29,13 +30,15 @@ class SessionApp:
         self.parent = parent
         self.window = None
 
+    @tools.unitOfWork
     def open_session(self, session):
-        sessionOb = Session(session['id'])
+        sessionOb = Session.get(session['id'])
         sessionOb.open()
         self.parent.session = sessionOb
         self.parent.home()
-        self.window.destroy()
+        WindowManager.close('sessions')
     
+    @tools.unitOfWork
     def close_session(self, sessionOb):
         sessionOb.close()
         self.parent.session = None
@@ -62,19 +65,10 @@ class SessionApp:
             }
         ]
 
-        # Create main window
-        self.window = Tk()
+        # Dialog of the main window
+        self.window, build = WindowManager.open('sessions', "Sessions database - RollArt BV", "900x720", (500,360))
 
-        # Customizing self.window
-        self.window.title("Sessions database - RollArt BV")
-        self.window.geometry("900x720")
-        self.window.minsize(500,360)
-        self.window.config(background="#0a1526")
-
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
+        conn = tools.getDb()
         c = conn.cursor()
         c.row_factory = tools.dict_factory
         c.execute("SELECT * FROM `sessions` ORDER BY `id` DESC")
@@ -82,7 +76,4 @@ class SessionApp:
         data = c.fetchall()
 
         list = ListApp(window=self.window, title="Sessions database", data=data, labels=labels, className=Session, actions=actions)
-        list.display()
-
-        # display window
-        self.window.mainloop()
\ No newline at end of file
+        list.display()
\ No newline at end of file
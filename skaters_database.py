@@ -23,6 +23,7 @@ from apps.list import *
 from motor.category import *
 from motor.skater import *
 import tools
+from apps.window import *
 
 class SkaterApp:
 
@@ -61,19 +62,10 @@ class SkaterApp:
             'category': self.category.id
         }
 
-        # Create main window
-        self.window = Tk()
+        # Dialog of the main window
+        self.window, build = WindowManager.open('skaters_'+str(self.category.id), "Skaters database - Category "+self.category.name+" - RollArt BV", "1600x720", (1280,360))
 
-        # Customizing self.window
-        self.window.title("Skaters database - Category "+self.category.name+" - RollArt BV")
-        self.window.geometry("1600x720")
-        self.window.minsize(1280,360)
-        self.window.config(background="#0a1526")
-
-        home_path = str(Path.home())
-        db_path = home_path + '/.rollartBV/structure.db'
-
-        conn = sqlite3.connect(db_path)
+        conn = tools.getDb()
         c = conn.cursor()
         c.row_factory = tools.dict_factory
         c.execute("SELECT * FROM `skaters` WHERE `session` = ? AND `category` = ? ORDER BY `order`, `id` ASC", (self.parent.session.id, self.category.id))
@@ -81,7 +73,4 @@ class SkaterApp:
         data = c.fetchall()
 
         list = ListApp(window=self.window, title="Skaters database - Category "+self.category.name, data=data, labels=labels, className=Skater, default=default)
-        list.display()
-
-        # display window
-        self.window.mainloop()
\ No newline at end of file
+        list.display()
\ No newline at end of file
@@ -18,8 +18,92 @@
 # Guillaume MODARD <guillaumemodard@gmail.com>
 
 import sqlite3
+import atexit
+import configparser
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
 
+# Process wide database connection shared by every motor class and window.
+# It is opened at the first getDb() call and closed at exit.
+connection = None
+
+# Number of connections opened since start (used by benchmarks)
+connections_opened = 0
+
+# Depth of the running units of work (see transaction())
+transaction_depth = 0
+
+# Number of commits done since start (used by benchmarks)
+commits = 0
+
+# Functions called after a rollback to forget in memory copies of the data
+rollback_listeners = []
+
+# Application configuration, loaded at the first getConfig() call
+config = None
+
+# Default configuration values, overridden by ~/.rollartBV/config.ini
+DEFAULT_CONFIG = {
+    'live': {
+        # Live score HTTP endpoint, leave empty to disable publishing
+        'url': 'https://www.raiv.fr/wintercup2020/data.php',
+        # Network timeout in seconds
+        'timeout': '3',
+        # Maximum number of pending messages
+        'queue_size': '100',
+        # Messages of the same program sent within this delay (seconds) are merged
+        'window': '0.2',
+        # First and maximum delay (seconds) between two retries when the server is unreachable
+        'backoff': '1',
+        'backoff_max': '30'
+    },
+    'scoreboard': {
+        # Local scoreboard server for displays on the venue network (no authentication,
+        # disabled by default)
+        'enabled': 'no',
+        'host': '0.0.0.0',
+        'port': '8080'
+    },
+    'rules': {
+        # JSON file replacing the default spin and step bonus rules, empty for defaults
+        'bonus': ''
+    },
+    'database': {
+        # Durability profile, see DURABILITY_PROFILES
+        'profile': 'competition'
+    }
+}
+
+# Durability profiles of the database :
+#   journal_mode  SQLite journal mode, set when the database is opened
+#   synchronous   SQLite synchronous setting of the connection
+#   checkpoint    WAL checkpoint mode run between two skaters (None to let SQLite
+#                 checkpoint automatically)
+#
+# competition : WAL, a commit only syncs at checkpoints, the checkpoint is done
+#               after each confirmed skater. A power cut may lose the last
+#               actions, never corrupt the database.
+# paranoid    : WAL, every commit is synced, checkpoint after each skater.
+# legacy      : rollback journal, every commit is synced (SQLite default).
+DURABILITY_PROFILES = {
+    'competition': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'checkpoint': 'TRUNCATE'
+    },
+    'paranoid': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'checkpoint': 'TRUNCATE'
+    },
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'checkpoint': None
+    }
+}
+
 # dict_factory()
 # convert data to dict
 def dict_factory(cursor, row):
@@ -28,11 +112,128 @@ def dict_factory(cursor, row):
         d[col[0]] = row[idx]
     return d
 
-# getDb()
-# get database connection
-def getDb():
+# getDbPath()
+# get database file path
+def getDbPath():
     home_path = str(Path.home())
     db_path = home_path + '/.rollartBV/structure.db'
-    conn = sqlite3.connect(db_path)
 
-    return conn
\ No newline at end of file
+    return db_path
+
+# getDb()
+# get the shared database connection, open it if needed
+def getDb():
+    global connection, connections_opened
+
+    if connection is None:
+        connection = sqlite3.connect(getDbPath())
+        connections_opened += 1
+
+        profile = getProfile()
+
+        # PRAGMA values can't be bound, they come from DURABILITY_PROFILES only
+        connection.execute("PRAGMA journal_mode = %s" % profile['journal_mode'])
+        connection.execute("PRAGMA synchronous = %s" % profile['synchronous'])
+
+    return connection
+
+# getProfile()
+# get the durability profile selected in configuration
+def getProfile():
+    name = getConfig().get('database', 'profile')
+
+    if not name in DURABILITY_PROFILES:
+        print("Unknown database profile "+name+", competition profile is used")
+        name = 'competition'
+
+    return DURABILITY_PROFILES[name]
+
+# checkpoint()
+# copy the WAL content to the database file if the profile asks for it.
+# Nothing is done inside a unit of work.
+def checkpoint():
+    mode = getProfile()['checkpoint']
+
+    if mode and transaction_depth == 0:
+        getDb().execute("PRAGMA wal_checkpoint(%s)" % mode)
+
+# closeDb()
+# close the shared database connection
+def closeDb():
+    global connection
+
+    if connection is not None:
+        connection.close()
+        connection = None
+
+atexit.register(closeDb)
+
+# commit()
+# commit the shared connection. Inside a unit of work, nothing is done : all
+# writes are committed together at the end of the unit of work.
+def commit():
+    global commits
+
+    if transaction_depth == 0:
+        getDb().commit()
+        commits += 1
+
+# transaction()
+# unit of work : context manager grouping all the writes of one operator action
+# in one transaction, committed at the end of the outermost unit of work and
+# rolled back if an exception is raised.
+#
+#   with tools.transaction():
+#       element.record()
+#       program.record()
+@contextmanager
+def transaction():
+    global transaction_depth
+
+    transaction_depth += 1
+
+    try:
+        yield getDb()
+
+    except:
+        transaction_depth -= 1
+
+        if transaction_depth == 0:
+            getDb().rollback()
+
+            for listener in rollback_listeners:
+                listener()
+
+        raise
+
+    transaction_depth -= 1
+
+    if transaction_depth == 0:
+        commit()
+
+# unitOfWork(function)
+# decorator running a function (an interface action) in one unit of work
+def unitOfWork(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with transaction():
+            return function(*args, **kwargs)
+
+    return wrapper
+
+# onRollback(listener = function)
+# call a function after a rollback of a unit of work
+def onRollback(listener):
+    rollback_listeners.append(listener)
+
+# getConfig()
+# get application configuration (ConfigParser), missing values use DEFAULT_CONFIG
+def getConfig():
+    global config
+
+    if config is None:
+        config = configparser.ConfigParser()
+        config.read_dict(DEFAULT_CONFIG)
+        config.read(str(Path.home()) + '/.rollartBV/config.ini')
+
+    return config
@@ -19,7 +19,10 @@
 
 import sqlite3
 from tkinter import *
+import tools
+from apps.window import *
 from apps.list import *
+from motor.element_type import *
 
 def open_window():
 
@@ -34,19 +37,10 @@ def open_window():
         }
     ]
 
-    # Create main window
-    window = Tk()
+    # Dialog of the main window
+    window, build = WindowManager.open('types', "Types database - RollArt BV", "500x720", (480,360))
 
-    # Customizing window
-    window.title("Types database - RollArt BV")
-    window.geometry("500x720")
-    window.minsize(480,360)
-    window.config(background="#0a1526")
-
-    home_path = str(Path.home())
-    db_path = home_path + '/.rollartBV/structure.db'
-
-    conn = sqlite3.connect(db_path)
+    conn = tools.getDb()
     c = conn.cursor()
     c.row_factory = sqlite3.Row
     c.execute("SELECT * FROM `elements_types` ORDER BY `name`")
@@ -56,8 +50,11 @@ def open_window():
     list = ListApp(window=window, title="Types database", data=data, labels=labels, className=ElementType)
     list.display()
 
-    # display window
-    window.mainloop()
+    return window
 
 if __name__ == '__main__':
-    open_window()
+    window = open_window()
+
+    # Started alone : closing the list ends the program
+    window.protocol("WM_DELETE_WINDOW", WindowManager.getRoot().destroy)
+    WindowManager.getRoot().mainloop()